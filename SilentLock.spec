@@ -65,6 +65,10 @@ hiddenimports = [
     'configparser',
 ]
 
+# Optional X11 window backend (the 'x11' extra, python-xlib) for Linux builds
+if sys.platform.startswith('linux'):
+    hiddenimports += ['Xlib', 'Xlib.X', 'Xlib.display', 'Xlib.error']
+
 a = Analysis(
     ['main.py'],
     pathex=[str(project_dir), str(src_dir)],
@@ -23,7 +23,9 @@ try:
     from src.startup_manager import AutoStartService
     from src.security_hardening import get_security_manager, SecurityHardening
     from src.audit_logger import AuditLogger
+    from src.audit_anomaly import AuditAnomalyDetector
     from src.splash_screen import SplashScreen
+    from src.logging_config import configure_logging, default_log_file, shutdown_logging
 except ImportError as e:
     print(f"Import error: {e}")
     print("Please ensure all dependencies are installed:")
@@ -40,6 +42,7 @@ class SilentLockApp:
         self.auto_start_service = AutoStartService()
         self.security_manager = None
         self.audit_logger = None
+        self.anomaly_detector = None
         self.db_manager = None
     
     def start(self):
@@ -78,6 +81,10 @@ class SilentLockApp:
             print("Initializing audit logging...")
             self.audit_logger = AuditLogger(self.db_manager)
             
+            # Watch authentication and access events as they are written
+            self.anomaly_detector = AuditAnomalyDetector(self.audit_logger)
+            self.anomaly_detector.start()
+            
             # Log application startup
             self.audit_logger.log_system_event(
                 event_type="application_start",
@@ -115,7 +122,7 @@ class SilentLockApp:
             
             # Start GUI main loop
             self.gui.run()
-            
+        
         except Exception as e:
             error_msg = f"Failed to start SilentLock: {e}"
             print(error_msg)
@@ -195,13 +202,19 @@ class SilentLockApp:
                 self.security_manager.stop_monitoring()
                 print("✓ Security monitoring stopped")
             
+            # Flush pending audit rows and close the audit database
+            if self.anomaly_detector:
+                self.anomaly_detector.stop()
+            if self.audit_logger:
+                self.audit_logger.close()
+            
             # Close database connection
             if self.db_manager:
                 self.db_manager.close_connection()
             
             self.is_running = False
             print("SilentLock closed successfully.")
-            
+        
         except Exception as e:
             print(f"Error during shutdown: {e}")
             if self.audit_logger:
@@ -211,8 +224,10 @@ class SilentLockApp:
                     success=False,
                     error_message=str(e)
                 )
+                self.audit_logger.close()
         
         finally:
+            shutdown_logging()
             sys.exit(0)
 
 
@@ -228,6 +243,9 @@ def main():
         print("Error: Python 3.8 or higher is required!")
         sys.exit(1)
     
+    # Detector diagnostics go through the logging facade (console + log file)
+    configure_logging(log_file=default_log_file())
+    
     # Show splash screen during initialization
     splash = SplashScreen()
     
@@ -241,7 +259,7 @@ def main():
         
         # Start main application
         app.start()
-        
+    
     except Exception as e:
         print(f"Error during startup: {e}")
         try:
@@ -129,6 +129,10 @@ setup(
         "zxcvbn>=4.4.28",
         "fido2>=1.1.3",
     ],
+    extras_require={
+        # X11 window backend; without it the detector runs on the in-memory backend
+        "x11": ["python-xlib>=0.33"],
+    },
     keywords="password manager security encryption windows",
     project_urls={
         "Bug Reports": f"{APP_URL}/issues",
@@ -11,7 +11,7 @@ import re
 import hashlib
 import requests
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple, Any
 from .admin_auth import AdminAuthenticator
 from .admin_profile_gui import AdminProfileGUI
@@ -22,9 +22,33 @@ import zxcvbn
 class AdminPasswordReviewGUI:
     """Administrator interface for password review and management."""
     
-    def __init__(self, db_manager, parent=None):
+    # Audit rows fetched per page when browsing the audit log
+    AUDIT_PAGE_SIZE = 200
+    
+    # Audit log filter choices mapped to audit_log event categories
+    AUDIT_EVENT_CATEGORIES = {
+        "Login": "AUTHENTICATION",
+        "Password Access": "DATA_ACCESS",
+        "Password Modified": "CONFIGURATION",
+        "Security Alert": "SECURITY"
+    }
+    
+    # Delay used to coalesce live audit rows into one tree update; while
+    # nothing is written the check backs off to AUDIT_TAIL_IDLE_MS
+    AUDIT_TAIL_INTERVAL_MS = 250
+    AUDIT_TAIL_IDLE_MS = 2000
+    
+    # Audit log time range choices mapped to look-back windows
+    AUDIT_TIME_RANGES = {
+        "Last 24 Hours": timedelta(hours=24),
+        "Last 7 Days": timedelta(days=7),
+        "Last 30 Days": timedelta(days=30)
+    }
+    
+    def __init__(self, db_manager, parent=None, audit_logger=None):
         self.db_manager = db_manager
         self.parent = parent
+        self.audit_logger = audit_logger
         self.admin_auth = AdminAuthenticator(db_manager)
         self.admin_session = None
         self.admin_window = None
@@ -35,6 +59,17 @@ class AdminPasswordReviewGUI:
         self.breach_data = {}
         self.password_analysis = {}
         
+        # Audit log paging state (keyset cursor into audit_log)
+        self._audit_next_after_id = None
+        self._audit_loading = False
+        self._audit_page_queued = False  # a scroll already queued the next page
+        
+        # Live audit tail (rows pushed by the audit writer)
+        self._audit_subscription = None
+        self._audit_tail_ready = threading.Event()  # set by the audit writer thread
+        self._audit_tail_poll = None  # Tk after() id of the main-thread poll loop
+        self._audit_tail_delay = self.AUDIT_TAIL_INTERVAL_MS
+        
         # Load pwned passwords hash database (first 5 chars of SHA1)
         self.pwned_hashes = set()
         self._load_breach_database()
@@ -222,6 +257,7 @@ class AdminPasswordReviewGUI:
                 recovery_code=recovery_code,
                 email_otp=email_otp
             )
+            self._log_admin_authentication(auth_result, totp_code, recovery_code, email_otp)
             
             if auth_result['success']:
                 self.admin_session = auth_result['session_token']
@@ -247,6 +283,30 @@ class AdminPasswordReviewGUI:
         except Exception as e:
             self.admin_error_label.config(text=f"Authentication error: {str(e)}")
     
+    def _log_admin_authentication(self, auth_result, totp_code, recovery_code, email_otp):
+        """Record an admin login attempt; feeds the audit anomaly rules."""
+        if not self.audit_logger or auth_result.get('requires_totp') or auth_result.get('requires_email_otp'):
+            return  # Prompting for a second factor is not an attempt
+        
+        error = auth_result.get('error')
+        if auth_result['success'] or error == 'Invalid credentials':
+            auth_type = 'admin_login'
+        elif recovery_code:
+            auth_type = 'recovery_code'
+        elif email_otp and not totp_code:
+            auth_type = 'email_otp'
+        elif totp_code:
+            auth_type = 'totp'
+        else:
+            auth_type = 'admin_login'
+        
+        self.audit_logger.log_authentication(
+            user_id=auth_result.get('admin_id', 'admin'), username='admin',
+            auth_type=auth_type, auth_method='password',
+            success=auth_result['success'], failure_reason=error,
+            mfa_used=bool(totp_code or recovery_code or email_otp)
+        )
+    
     def _send_email_otp(self):
         """Send email OTP for admin login."""
         try:
@@ -945,12 +1005,12 @@ class AdminPasswordReviewGUI:
             self.audit_tree.column(col, width=150, minwidth=100)
             self.audit_tree.heading(col, text=col)
         
-        # Scrollbar for audit log
-        audit_scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=self.audit_tree.yview)
-        self.audit_tree.configure(yscrollcommand=audit_scrollbar.set)
+        # Scrollbar for audit log (fetches the next page near the bottom)
+        self.audit_scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=self.audit_tree.yview)
+        self.audit_tree.configure(yscrollcommand=self._on_audit_scroll)
         
         self.audit_tree.pack(side='left', fill='both', expand=True)
-        audit_scrollbar.pack(side='right', fill='y')
+        self.audit_scrollbar.pack(side='right', fill='y')
         
         # Export button
         export_frame = tk.Frame(audit_frame, bg='#f8f9fa')
@@ -960,6 +1020,10 @@ class AdminPasswordReviewGUI:
             export_frame, text="📤 Export Audit Log", command=self._export_audit_log,
             bg='#6c757d', fg='white', padx=15, pady=5, relief='flat'
         ).pack(side='right')
+        
+        # Load the first page, then follow new rows as they are written
+        self._filter_audit_log()
+        self._start_audit_tail()
     
     def _create_system_config_tab(self):
         """Create system configuration tab."""
@@ -1087,13 +1151,230 @@ class AdminPasswordReviewGUI:
     
     def _filter_audit_log(self):
         """Filter audit log entries."""
-        # Placeholder
-        pass
+        for item in self.audit_tree.get_children():
+            self.audit_tree.delete(item)
+        
+        self._audit_next_after_id = None
+        self._load_audit_page(first_page=True)
+    
+    def _get_audit_filters(self) -> Dict[str, Any]:
+        """Translate the audit tab filter widgets into query filters."""
+        filters = {}
+        
+        look_back = self.AUDIT_TIME_RANGES.get(self.time_range_var.get())
+        if look_back:
+            filters['start_date'] = datetime.now() - look_back
+        
+        category = self.AUDIT_EVENT_CATEGORIES.get(self.event_type_var.get())
+        if category:
+            filters['event_category'] = category
+        
+        return filters
+    
+    def _load_audit_page(self, first_page: bool = False):
+        """Append the next page of audit rows to the audit tree."""
+        if not self.audit_logger or self._audit_loading:
+            return
+        if not first_page and self._audit_next_after_id is None:
+            self._audit_page_queued = False
+            return  # Reached the end of the log
+        
+        self._audit_loading = True
+        try:
+            page = self.audit_logger.query_audit_logs(
+                columns=('timestamp', 'event_type', 'user_id', 'username',
+                         'action', 'resource_name', 'ip_address'),
+                after_id=self._audit_next_after_id,
+                page_size=self.AUDIT_PAGE_SIZE,
+                **self._get_audit_filters()
+            )
+            
+            for record in page["rows"]:
+                self._insert_audit_row(record)
+            
+            self._audit_next_after_id = page["next_after_id"]
+            
+        except Exception as e:
+            print(f"Error loading audit log page: {e}")
+        finally:
+            self._audit_loading = False
+            self._audit_page_queued = False
+    
+    def _insert_audit_row(self, record, index='end'):
+        """Insert one audit record into the audit tree."""
+        details = record['action'] or ''
+        if record['resource_name']:
+            details = f"{details}: {record['resource_name']}"
+        
+        self.audit_tree.insert('', index, iid=str(record['id']), values=(
+            record['timestamp'] or '',
+            record['event_type'] or '',
+            record['username'] or record['user_id'] or '',
+            details,
+            record['ip_address'] or ''
+        ))
+    
+    def _start_audit_tail(self):
+        """Subscribe to newly written audit rows and start polling for them."""
+        if not self.audit_logger or self._audit_subscription:
+            return
+        self._audit_tail_ready.clear()
+        self._audit_subscription = self.audit_logger.subscribe(on_available=self._on_audit_tail_available)
+        self._audit_tail_delay = self.AUDIT_TAIL_INTERVAL_MS
+        self._audit_tail_poll = self.admin_window.after(self._audit_tail_delay, self._poll_audit_tail)
+    
+    def _stop_audit_tail(self):
+        """Stop following new audit rows."""
+        if self._audit_subscription:
+            self._audit_subscription.close()
+            self._audit_subscription = None
+        if self._audit_tail_poll is not None:
+            try:
+                self.admin_window.after_cancel(self._audit_tail_poll)
+            except Exception:
+                pass
+            self._audit_tail_poll = None
+    
+    def _on_audit_tail_available(self, subscription):
+        """Called from the audit writer thread when new rows are buffered.
+        
+        Tk must only be touched from the main thread, and Tk offers no
+        portable way for another thread to wake its event loop (file
+        handlers are Unix-only), so this just raises a flag for the
+        ``_poll_audit_tail`` timer.
+        """
+        self._audit_tail_ready.set()
+    
+    def _poll_audit_tail(self):
+        """Main-thread timer: apply buffered rows whenever the writer flagged some.
+        
+        Checks every AUDIT_TAIL_INTERVAL_MS while rows keep arriving and
+        doubles the gap up to AUDIT_TAIL_IDLE_MS while the log is quiet.
+        """
+        self._audit_tail_poll = None
+        if not self._audit_subscription or not self.admin_window:
+            return
+        if self._audit_tail_ready.is_set():
+            self._audit_tail_ready.clear()
+            self._apply_audit_tail()
+            self._audit_tail_delay = self.AUDIT_TAIL_INTERVAL_MS
+        else:
+            self._audit_tail_delay = min(self._audit_tail_delay * 2, self.AUDIT_TAIL_IDLE_MS)
+        self._audit_tail_poll = self.admin_window.after(self._audit_tail_delay, self._poll_audit_tail)
+    
+    def _apply_audit_tail(self):
+        """Insert all buffered live rows that match the current filters."""
+        if not self._audit_subscription or not self.admin_window:
+            return
+        
+        filters = self._get_audit_filters()
+        start_date = filters.get('start_date')
+        start = start_date.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if start_date else None
+        
+        for record in self._audit_subscription.drain():
+            if filters.get('event_category') and record['event_category'] != filters['event_category']:
+                continue
+            if start and (record['timestamp'] or '') < start:
+                continue
+            if self.audit_tree.exists(str(record['id'])):
+                continue
+            self._insert_audit_row(record, index=0)
+        
+        # Rows that arrived while we were inserting get the next poll
+        if self._audit_subscription.pending():
+            self._audit_tail_ready.set()
+    
+    def _on_audit_scroll(self, first, last):
+        """Keep the scrollbar in sync and fetch another page near the bottom."""
+        self.audit_scrollbar.set(first, last)
+        
+        # One page per scroll: the rows it inserts fire this callback again
+        if float(last) >= 0.98 and self._audit_next_after_id is not None and not self._audit_page_queued:
+            self._audit_page_queued = True
+            self.admin_window.after_idle(self._load_audit_page)
     
     def _export_audit_log(self):
-        """Export audit log."""
-        # Placeholder
-        pass
+        """Stream the filtered audit log to a CSV or JSONL file."""
+        if not self.audit_logger:
+            messagebox.showerror("Export Error", "Audit logging is not available.")
+            return
+        
+        output_path = filedialog.asksaveasfilename(
+            parent=self.admin_window,
+            title="Export Audit Log",
+            defaultextension=".csv",
+            initialfile=f"silentlock_audit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("Compressed CSV", "*.csv.gz"),
+                ("JSON Lines", "*.jsonl"),
+                ("Compressed JSON Lines", "*.jsonl.gz")
+            ]
+        )
+        if not output_path:
+            return
+        
+        export_format = "jsonl" if ".jsonl" in output_path.lower() else "csv"
+        filters = self._get_audit_filters()
+        cancel_event = threading.Event()
+        
+        # Progress dialog
+        progress_window = tk.Toplevel(self.admin_window)
+        progress_window.title("Exporting Audit Log")
+        progress_window.geometry("400x130")
+        progress_window.transient(self.admin_window)
+        progress_window.resizable(False, False)
+        
+        status_label = tk.Label(progress_window, text="Preparing export...", font=('Arial', 10))
+        status_label.pack(pady=(15, 5))
+        
+        progress_bar = ttk.Progressbar(progress_window, length=350, mode='determinate')
+        progress_bar.pack(pady=5)
+        
+        tk.Button(
+            progress_window, text="Cancel", command=cancel_event.set,
+            bg='#6c757d', fg='white', padx=15, relief='flat'
+        ).pack(pady=5)
+        
+        def update_progress(written, total):
+            if not progress_window.winfo_exists():
+                return
+            progress_bar['maximum'] = max(total, 1)
+            progress_bar['value'] = written
+            status_label.config(text=f"Exported {written:,} of {total:,} entries")
+        
+        def finish(result, error=None):
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            if error:
+                messagebox.showerror("Export Error", f"Failed to export audit log: {error}")
+            elif result["cancelled"]:
+                messagebox.showwarning("Export Cancelled",
+                                       f"Export stopped after {result['rows_written']:,} entries.")
+            else:
+                messagebox.showinfo(
+                    "Export Complete",
+                    f"Exported {result['rows_written']:,} audit entries to:\n{output_path}\n\n"
+                    f"Final chain hash:\n{result['final_chain_hash'] or 'n/a'}"
+                )
+        
+        def run_export():
+            try:
+                result = self.audit_logger.export_audit_logs(
+                    output_path,
+                    export_format=export_format,
+                    progress_callback=lambda written, total: progress_window.after(
+                        0, update_progress, written, total),
+                    cancel_event=cancel_event,
+                    exported_by="admin",
+                    **filters
+                )
+                progress_window.after(0, finish, result)
+            except Exception as e:
+                print(f"Error exporting audit log: {e}")
+                progress_window.after(0, finish, None, e)
+        
+        threading.Thread(target=run_export, daemon=True).start()
     
     def _save_config(self):
         """Save configuration settings."""
@@ -1328,6 +1609,7 @@ class AdminPasswordReviewGUI:
     
     def _on_admin_window_close(self):
         """Handle admin window close."""
+        self._stop_audit_tail()
         if self.admin_window:
             self.admin_window.destroy()
             self.admin_window = None
\ No newline at end of file
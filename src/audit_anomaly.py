@@ -0,0 +1,278 @@
+"""
+Streaming anomaly detection for SilentLock audit events.
+Evaluates authentication and access events as the audit writer commits them,
+using fixed-size sliding-window counters instead of periodic audit queries.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class SlidingWindowCounter:
+    """Event count over a trailing time window, kept in a ring of time buckets.
+    
+    Adding an event and reading a count touch at most ``bucket_count``
+    buckets, a constant chosen at construction, so both are O(1) per event.
+    """
+    
+    __slots__ = ('bucket_seconds', 'bucket_count', '_counts', '_stamps')
+    
+    def __init__(self, window_seconds: float, bucket_count: int = 30):
+        self.bucket_count = bucket_count
+        self.bucket_seconds = window_seconds / bucket_count
+        self._counts = [0] * bucket_count
+        self._stamps = [-1] * bucket_count
+    
+    def add(self, now: float, amount: int = 1):
+        """Record ``amount`` events at time ``now``."""
+        tick = int(now // self.bucket_seconds)
+        slot = tick % self.bucket_count
+        if self._stamps[slot] != tick:
+            self._stamps[slot] = tick
+            self._counts[slot] = 0
+        self._counts[slot] += amount
+    
+    def count(self, now: float, buckets: int = None, offset: int = 0) -> int:
+        """Events in the last ``buckets`` buckets, skipping the newest ``offset``."""
+        buckets = buckets or self.bucket_count
+        tick = int(now // self.bucket_seconds)
+        total = 0
+        for back in range(offset, min(offset + buckets, self.bucket_count)):
+            slot = (tick - back) % self.bucket_count
+            if self._stamps[slot] == tick - back:
+                total += self._counts[slot]
+        return total
+
+
+class AnomalyRule:
+    """Threshold or rate-of-change rule over a stream of audit events."""
+    
+    def __init__(self, name: str, event_type: str, threshold: int,
+                 window_seconds: float, actions: Sequence[str] = None,
+                 success: Optional[bool] = None, per_user: bool = True,
+                 rate_factor: float = None, severity: str = "MEDIUM",
+                 cooldown_seconds: float = None, description: str = ""):
+        """
+        Args:
+            name: Rule identifier, used as the security event type
+            event_type: audit_log event_type the rule watches
+            threshold: Events in the window needed to fire (minimum count
+                when ``rate_factor`` is set)
+            window_seconds: Length of the sliding window
+            actions: Optional audit_log actions to restrict the rule to
+            success: Only count successful (True) or failed (False) events
+            per_user: Keep a separate counter for each user_id
+            rate_factor: Fire when the current window holds this many times
+                more events than the window before it
+            severity: Severity passed to the security audit entry
+            cooldown_seconds: Minimum time between alerts for the same key
+            description: Human readable summary for alerts
+        """
+        self.name = name
+        self.event_type = event_type
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.actions = frozenset(actions) if actions else None
+        self.success = success
+        self.per_user = per_user
+        self.rate_factor = rate_factor
+        self.severity = severity
+        self.cooldown_seconds = window_seconds if cooldown_seconds is None else cooldown_seconds
+        self.description = description
+    
+    def matches(self, record) -> bool:
+        """Check whether an audit record counts towards this rule."""
+        if self.actions is not None and record['action'] not in self.actions:
+            return False
+        if self.success is not None and bool(record['success']) != self.success:
+            return False
+        return True
+
+
+# Rules applied when no custom rules are given
+DEFAULT_ANOMALY_RULES = [
+    AnomalyRule(
+        "repeated_login_failures", "authentication", threshold=5, window_seconds=60,
+        success=False, severity="HIGH",
+        description="Repeated failed logins within a minute"
+    ),
+    AnomalyRule(
+        "repeated_otp_failures", "authentication", threshold=3, window_seconds=300,
+        actions=("otp", "totp", "email_otp", "recovery_code"), success=False, severity="HIGH",
+        description="Repeated failed one-time-password checks"
+    ),
+    AnomalyRule(
+        "password_export_burst", "password_access", threshold=20, window_seconds=3600,
+        actions=("export", "bulk_export"), severity="MEDIUM",
+        description="Unusually many password exports within an hour"
+    ),
+    AnomalyRule(
+        "password_copy_burst", "password_access", threshold=100, window_seconds=3600,
+        actions=("copy",), severity="LOW",
+        description="Unusually many passwords copied to the clipboard within an hour"
+    ),
+    AnomalyRule(
+        "password_access_surge", "password_access", threshold=30, window_seconds=300,
+        per_user=False, rate_factor=5.0, severity="MEDIUM",
+        description="Password access rate jumped compared to the previous window"
+    ),
+]
+
+
+class AuditAnomalyDetector:
+    """Online anomaly detector subscribed to the audit writer's live feed."""
+    
+    def __init__(self, audit_logger, rules: List[AnomalyRule] = None,
+                 on_anomaly: Callable = None, log_to_audit: bool = True,
+                 max_tracked_users: int = 1000, clock: Callable = time.time):
+        self.audit_logger = audit_logger
+        self.rules = list(DEFAULT_ANOMALY_RULES if rules is None else rules)
+        self.log_to_audit = log_to_audit
+        self.max_tracked_users = max_tracked_users
+        self.clock = clock
+        self.lock = threading.Lock()
+        
+        self._callbacks = [on_anomaly] if on_anomaly else []
+        self._rules_by_type = {}
+        for rule in self.rules:
+            self._rules_by_type.setdefault(rule.event_type, []).append(rule)
+        
+        # (rule name, user key) -> counter, least recently used first
+        self._counters = OrderedDict()
+        self._last_alert = {}
+        
+        self.events_seen = 0
+        self.anomalies_raised = 0
+        self._subscription = None
+    
+    def start(self):
+        """Start receiving committed audit events."""
+        if self._subscription is None:
+            self._subscription = self.audit_logger.subscribe(on_available=self._on_events_available)
+    
+    def stop(self):
+        """Stop receiving audit events."""
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+    
+    def add_callback(self, callback: Callable):
+        """Register a callback invoked with each anomaly dict."""
+        self._callbacks.append(callback)
+    
+    def _on_events_available(self, subscription):
+        """Drain newly committed events on the audit writer thread."""
+        for record in subscription.drain():
+            self.process_event(record)
+    
+    def process_event(self, record) -> List[Dict]:
+        """Update counters for one audit record and return any anomalies raised."""
+        rules = self._rules_by_type.get(record['event_type'])
+        if not rules:
+            return []
+        
+        now = self.clock()
+        anomalies = []
+        with self.lock:
+            self.events_seen += 1
+            for rule in rules:
+                if not rule.matches(record):
+                    continue
+                
+                user_key = (record['user_id'] or record['username'] or 'unknown') if rule.per_user else '*'
+                counter = self._get_counter(rule, user_key)
+                counter.add(now)
+                
+                anomaly = self._evaluate(rule, user_key, counter, now)
+                if anomaly:
+                    anomalies.append(anomaly)
+        
+        for anomaly in anomalies:
+            self._raise(anomaly)
+        return anomalies
+    
+    def _get_counter(self, rule: AnomalyRule, user_key: str) -> SlidingWindowCounter:
+        """Fetch or create the counter for a rule/user pair (LRU bounded)."""
+        key = (rule.name, user_key)
+        counter = self._counters.get(key)
+        if counter is None:
+            # Rate-of-change rules keep two windows: current and previous
+            window = rule.window_seconds * (2 if rule.rate_factor else 1)
+            counter = SlidingWindowCounter(window, bucket_count=60 if rule.rate_factor else 30)
+            self._counters[key] = counter
+            if len(self._counters) > self.max_tracked_users * len(self.rules):
+                evicted, _ = self._counters.popitem(last=False)
+                self._last_alert.pop(evicted, None)
+        else:
+            self._counters.move_to_end(key)
+        return counter
+    
+    def _evaluate(self, rule: AnomalyRule, user_key: str,
+                  counter: SlidingWindowCounter, now: float) -> Optional[Dict]:
+        """Check a rule against its counter after an update."""
+        if rule.rate_factor:
+            half = counter.bucket_count // 2
+            current = counter.count(now, buckets=half)
+            previous = counter.count(now, buckets=half, offset=half)
+            fired = current >= rule.threshold and current >= rule.rate_factor * max(previous, 1)
+        else:
+            current = counter.count(now)
+            previous = None
+            fired = current >= rule.threshold
+        
+        if not fired:
+            return None
+        
+        key = (rule.name, user_key)
+        last = self._last_alert.get(key)
+        if last is not None and now - last < rule.cooldown_seconds:
+            return None
+        self._last_alert[key] = now
+        
+        return {
+            "rule": rule.name,
+            "description": rule.description,
+            "severity": rule.severity,
+            "user_id": None if user_key == '*' else user_key,
+            "count": current,
+            "previous_count": previous,
+            "window_seconds": rule.window_seconds,
+            "timestamp": now
+        }
+    
+    def _raise(self, anomaly: Dict):
+        """Record an anomaly in the security audit and notify callbacks."""
+        with self.lock:
+            self.anomalies_raised += 1
+        
+        if self.log_to_audit and self.audit_logger:
+            self.audit_logger.log_security_event(
+                event_type=anomaly["rule"],
+                severity_level=anomaly["severity"],
+                threat_type="ANOMALY",
+                detection_method="STREAMING_ANOMALY_DETECTOR",
+                affected_systems=[anomaly["user_id"]] if anomaly["user_id"] else None,
+                mitigation_actions=[
+                    f"{anomaly['count']} events in {anomaly['window_seconds']}s: {anomaly['description']}"
+                ]
+            )
+        
+        for callback in self._callbacks:
+            try:
+                callback(anomaly)
+            except Exception as e:
+                print(f"Error in anomaly callback: {e}")
+    
+    def get_status(self) -> Dict:
+        """Get detector statistics."""
+        with self.lock:
+            return {
+                "running": self._subscription is not None,
+                "rules": [rule.name for rule in self.rules],
+                "events_seen": self.events_seen,
+                "anomalies_raised": self.anomalies_raised,
+                "tracked_counters": len(self._counters),
+                "dropped_events": self._subscription.dropped if self._subscription else 0
+            }
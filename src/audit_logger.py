@@ -1,26 +1,192 @@
 """
 Comprehensive Audit Logging System for SilentLock
 Tracks all administrative actions, password access, security events, and system changes.
+
+Audit events live in their own SQLite file (``audit.db`` next to the credential
+vault) with a dedicated writer connection, WAL journaling and group commits, so
+bursts of audit writes never compete with credential saves for the vault's
+write lock. The vault is only ATTACHed for cross-database reports.
 """
 
+import csv
+import gzip
 import json
 import hashlib
 import sqlite3
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+import queue
+from collections import deque
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Union, Iterator, Sequence, Callable
 import os
 import socket
 import platform
 
 
+# Audit tables owned by the audit database (and migrated out of the vault)
+AUDIT_TABLES = [
+    'audit_log',
+    'admin_audit',
+    'password_audit',
+    'security_audit',
+    'auth_audit',
+    'config_audit',
+    'compliance_audit'
+]
+
+# Valid values for PRAGMA synchronous on the audit database
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# Selectable audit_log columns (also the whitelist for column projection)
+AUDIT_LOG_COLUMNS = (
+    'id', 'timestamp', 'session_id', 'event_type', 'event_category',
+    'user_id', 'username', 'action', 'resource_type', 'resource_id',
+    'resource_name', 'old_values', 'new_values', 'ip_address', 'user_agent',
+    'hostname', 'process_id', 'success', 'error_message', 'risk_level',
+    'additional_data', 'hash_verification'
+)
+
+# audit_log columns stored as JSON text
+AUDIT_JSON_FIELDS = ('old_values', 'new_values', 'additional_data')
+
+
+def _to_db_timestamp(value: datetime) -> str:
+    """Convert a datetime to the UTC format SQLite's CURRENT_TIMESTAMP stores."""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class AuditRecord(Mapping):
+    """Read-only audit row that decodes its JSON columns on first access."""
+    
+    __slots__ = ('_columns', '_values', '_decoded')
+    
+    def __init__(self, columns: Dict[str, int], values: Sequence):
+        self._columns = columns
+        self._values = values
+        self._decoded = {}
+    
+    def __getitem__(self, key):
+        value = self._values[self._columns[key]]
+        if key not in AUDIT_JSON_FIELDS or not value:
+            return value
+        
+        if key not in self._decoded:
+            try:
+                self._decoded[key] = json.loads(value)
+            except (TypeError, ValueError):
+                self._decoded[key] = value
+        return self._decoded[key]
+    
+    def __iter__(self):
+        return iter(self._columns)
+    
+    def __len__(self):
+        return len(self._columns)
+    
+    def raw(self, key: str):
+        """Return the stored column value without JSON decoding."""
+        return self._values[self._columns[key]]
+    
+    def __repr__(self):
+        return f"AuditRecord({dict(zip(self._columns, self._values))!r})"
+
+
+class AuditSubscription:
+    """Bounded in-process feed of newly committed audit_log rows.
+    
+    The audit writer appends records after each committed batch. When the
+    buffer is full the oldest records are discarded and counted in
+    ``dropped``, so a slow consumer can never stall the writer.
+    """
+    
+    def __init__(self, audit_logger, max_buffer: int = 1000,
+                 on_available: Callable = None, event_categories: Sequence[str] = None):
+        self._audit_logger = audit_logger
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self.on_available = on_available
+        self.event_categories = set(event_categories) if event_categories else None
+        self.dropped = 0
+        self.closed = False
+    
+    def _publish(self, records: List['AuditRecord']):
+        """Append records from the writer thread and signal the consumer."""
+        with self._lock:
+            was_empty = not self._buffer
+            for record in records:
+                if self.event_categories and record['event_category'] not in self.event_categories:
+                    continue
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.dropped += 1
+                self._buffer.append(record)
+            became_available = was_empty and bool(self._buffer)
+        
+        # Only the empty -> non-empty transition notifies, so bursts coalesce
+        if became_available and self.on_available:
+            try:
+                self.on_available(self)
+            except Exception as e:
+                print(f"Error in audit subscription callback: {e}")
+    
+    def drain(self, max_items: int = None) -> List['AuditRecord']:
+        """Remove and return buffered records, oldest first."""
+        with self._lock:
+            if max_items is None or max_items >= len(self._buffer):
+                records = list(self._buffer)
+                self._buffer.clear()
+            else:
+                records = [self._buffer.popleft() for _ in range(max_items)]
+        return records
+    
+    def pending(self) -> int:
+        """Number of records waiting to be drained."""
+        with self._lock:
+            return len(self._buffer)
+    
+    def close(self):
+        """Stop receiving records."""
+        if not self.closed:
+            self.closed = True
+            self._audit_logger.unsubscribe(self)
+
+
 class AuditLogger:
     """Comprehensive audit logging system for security and compliance tracking."""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, audit_db_path: str = None,
+                 synchronous: str = "NORMAL", batch_size: int = 100,
+                 flush_interval: float = 0.25, migration_batch_size: int = 500):
         self.db_manager = db_manager
         self.session_id = self._generate_session_id()
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
+        
+        # Audit database lives next to the credential vault by default
+        vault_path = getattr(db_manager, 'db_path', None)
+        if audit_db_path is None:
+            vault_dir = os.path.dirname(os.path.abspath(vault_path)) if vault_path else os.getcwd()
+            audit_db_path = os.path.join(vault_dir, 'audit.db')
+        self.audit_db_path = audit_db_path
+        self.vault_db_path = vault_path
+        
+        # Durability policy for the audit file (independent of the vault)
+        synchronous = (synchronous or "NORMAL").upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+        self.synchronous = synchronous
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.migration_batch_size = max(1, migration_batch_size)
+        
+        # Batched writer state
+        self._write_queue = queue.Queue()
+        self._writer_thread = None
+        self._closed = False
+        
+        # Live tail subscribers fed by the writer after each commit
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
         
         # System information
         self.hostname = socket.gethostname()
@@ -30,19 +196,29 @@ class AuditLogger:
         # Initialize audit database
         self._init_audit_db()
         
+        # Start the writer (migrates legacy rows before draining new events)
+        self._start_writer()
+        
         # Log system startup
         self.log_system_event(
             event_type="system_startup",
             details={"hostname": self.hostname, "platform": self.platform_info, "pid": self.process_id}
         )
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the audit database."""
+        conn = sqlite3.connect(self.audit_db_path, timeout=30)
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+    
     def _init_audit_db(self):
         """Initialize audit logging database tables."""
         conn = None
         try:
-            conn = self.db_manager.get_cursor()
-            if conn is None:
-                return
+            conn = self._connect()
+            
+            # WAL lets report queries read while the writer appends
+            conn.execute("PRAGMA journal_mode=WAL")
             
             cursor = conn.cursor()
             
@@ -198,6 +374,20 @@ class AuditLogger:
                 )
             ''')
             
+            # Indexes backing the filtered, id-ordered audit_log queries
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_audit_log_category
+                ON audit_log (event_category, id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_audit_log_user
+                ON audit_log (user_id, id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp
+                ON audit_log (timestamp)
+            ''')
+            
             conn.commit()
             
         except Exception as e:
@@ -205,7 +395,249 @@ class AuditLogger:
         finally:
             if conn:
                 conn.close()
+
+    def _start_writer(self):
+        """Start the background thread that group-commits audit rows."""
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="AuditWriter", daemon=True
+        )
+        self._writer_thread.start()
+
+    def _writer_loop(self):
+        """Drain queued audit rows and commit them in batches."""
+        conn = None
+        try:
+            conn = self._connect()
+            self._migrate_legacy_audit_rows(conn)
+        except Exception as e:
+            print(f"Error starting audit writer: {e}")
+            if conn is None:
+                return
+
+        stopping = False
+        while not stopping:
+            try:
+                item = self._write_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            markers = []
+            while True:
+                if item is None:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(conn, batch)
+
+            # Flush markers are released only after the rows ahead of them commit
+            for marker in markers:
+                marker.set()
+
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]):
+        """Insert a batch of queued rows in a single transaction."""
+        committed = []
+        try:
+            with conn:
+                for table, row in batch:
+                    try:
+                        columns = ', '.join(row.keys())
+                        placeholders = ', '.join('?' for _ in row)
+                        cursor = conn.execute(
+                            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                            tuple(row.values())
+                        )
+                        if table == 'audit_log':
+                            committed.append((cursor.lastrowid, row))
+                    except sqlite3.Error as e:
+                        print(f"Error writing audit row to {table}: {e}")
+        except Exception as e:
+            print(f"Error committing audit batch: {e}")
+            return
+        
+        if committed and self._subscribers:
+            self._publish(committed)
+    
+    def _publish(self, committed: List[tuple]):
+        """Hand freshly committed audit_log rows to live subscribers."""
+        timestamp = _to_db_timestamp(datetime.now())
+        column_index = {col: index for index, col in enumerate(AUDIT_LOG_COLUMNS)}
+        records = []
+        for row_id, row in committed:
+            values = dict(row, id=row_id, timestamp=timestamp)
+            records.append(AuditRecord(column_index, tuple(values.get(col) for col in AUDIT_LOG_COLUMNS)))
+        
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        
+        for subscription in subscribers:
+            subscription._publish(records)
+    
+    def subscribe(self, on_available: Callable = None, max_buffer: int = 1000,
+                  event_categories: Sequence[str] = None) -> AuditSubscription:
+        """Subscribe to audit_log rows as they are committed.
+        
+        ``on_available`` is called from the writer thread whenever the
+        subscription's buffer goes from empty to non-empty; consumers then
+        ``drain()`` everything that has accumulated in one go.
+        """
+        subscription = AuditSubscription(self, max_buffer, on_available, event_categories)
+        with self._subscribers_lock:
+            self._subscribers.append(subscription)
+        return subscription
     
+    def unsubscribe(self, subscription: AuditSubscription):
+        """Remove a live tail subscription."""
+        with self._subscribers_lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        subscription.closed = True
+
+    def _enqueue(self, table: str, row: Dict) -> bool:
+        """Queue a row for the batched audit writer."""
+        if self._closed or table not in AUDIT_TABLES:
+            return False
+        self._write_queue.put((table, row))
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every audit row queued so far has been committed."""
+        if self._closed or not self._writer_thread or not self._writer_thread.is_alive():
+            return False
+        marker = threading.Event()
+        self._write_queue.put(marker)
+        return marker.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending audit rows and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._write_queue.put(None)
+            self._writer_thread.join(timeout)
+
+    def _migrate_legacy_audit_rows(self, conn: sqlite3.Connection):
+        """Move audit rows left in the credential vault into the audit database.
+
+        Rows are copied in id order, ``migration_batch_size`` at a time, and get
+        new ids in the audit database. Each copied row's legacy id is recorded in
+        ``legacy_audit_migration`` in the same transaction, and only recorded
+        rows are deleted from the vault, so an interrupted migration resumes
+        without losing or duplicating rows. Any insert error aborts the
+        migration and leaves the remaining vault rows in place. A legacy table
+        is dropped once it is empty.
+        """
+        if not self.vault_db_path or not os.path.exists(self.vault_db_path):
+            return
+        if os.path.abspath(self.vault_db_path) == os.path.abspath(self.audit_db_path):
+            return
+
+        vault = None
+        try:
+            vault = sqlite3.connect(self.vault_db_path, timeout=30)
+            existing = {
+                row[0] for row in vault.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+            if not existing.intersection(AUDIT_TABLES):
+                return
+
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS legacy_audit_migration (
+                        table_name TEXT NOT NULL,
+                        legacy_id INTEGER NOT NULL,
+                        new_id INTEGER NOT NULL,
+                        PRIMARY KEY (table_name, legacy_id)
+                    )
+                ''')
+
+            for table in AUDIT_TABLES:
+                if table not in existing:
+                    continue
+
+                audit_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                legacy_columns = [row[1] for row in vault.execute(f"PRAGMA table_info({table})")]
+                columns = [col for col in legacy_columns if col in audit_columns and col != 'id']
+                column_list = ', '.join(columns)
+                placeholders = ', '.join('?' for _ in columns)
+
+                migrated = 0
+                while True:
+                    rows = vault.execute(
+                        f"SELECT id, {column_list} FROM {table} ORDER BY id LIMIT ?",
+                        (self.migration_batch_size,)
+                    ).fetchall()
+                    if not rows:
+                        break
+
+                    copied = []
+                    try:
+                        with conn:
+                            for row in rows:
+                                legacy_id = row[0]
+                                if conn.execute(
+                                    "SELECT 1 FROM legacy_audit_migration WHERE table_name = ? AND legacy_id = ?",
+                                    (table, legacy_id)
+                                ).fetchone() is None:
+                                    cursor = conn.execute(
+                                        f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})",
+                                        row[1:]
+                                    )
+                                    conn.execute(
+                                        "INSERT INTO legacy_audit_migration (table_name, legacy_id, new_id) "
+                                        "VALUES (?, ?, ?)",
+                                        (table, legacy_id, cursor.lastrowid)
+                                    )
+                                    migrated += 1
+                                copied.append(legacy_id)
+                    except sqlite3.Error as e:
+                        print(f"Aborting audit migration of {table}: {e}; "
+                              f"{len(rows)} rows left in the vault")
+                        return
+
+                    with vault:
+                        vault.executemany(
+                            f"DELETE FROM {table} WHERE id = ?",
+                            [(legacy_id,) for legacy_id in copied]
+                        )
+
+                with vault:
+                    vault.execute(f"DROP TABLE IF EXISTS {table}")
+
+                if migrated:
+                    print(f"Migrated {migrated} rows from {table} to audit database")
+
+        except Exception as e:
+            print(f"Error migrating legacy audit rows: {e}")
+        finally:
+            if vault:
+                vault.close()
+
+    @contextmanager
+    def _vault_attached(self, conn: sqlite3.Connection):
+        """Temporarily ATTACH the credential vault as ``vault`` for cross-database reports."""
+        conn.execute("ATTACH DATABASE ? AS vault", (self.vault_db_path,))
+        try:
+            yield conn
+        finally:
+            conn.execute("DETACH DATABASE vault")
+
     def _generate_session_id(self) -> str:
         """Generate unique session identifier."""
         import secrets
@@ -223,57 +655,39 @@ class AuditLogger:
                         ip_address: str = None, success: bool = True,
                         risk_assessment: str = "LOW") -> bool:
         """Log administrative actions."""
-        conn = None
         try:
-            with self.lock:
-                conn = self.db_manager.get_cursor()
-                if conn is None:
-                    return False
-                
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO admin_audit 
-                    (admin_session_id, admin_user_id, action_type, target_user_id,
-                     affected_resource, action_details, privilege_level, ip_address,
-                     success, risk_assessment)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    self.session_id,
-                    admin_user_id,
-                    action_type,
-                    target_user_id,
-                    affected_resource,
-                    json.dumps(action_details) if action_details else None,
-                    privilege_level,
-                    ip_address,
-                    success,
-                    risk_assessment
-                ))
-                
-                conn.commit()
-                
-                # Also log in main audit table
-                self._log_main_audit(
-                    event_type="admin_action",
-                    event_category="ADMINISTRATION",
-                    user_id=admin_user_id,
-                    action=action_type,
-                    resource_type="admin_resource",
-                    resource_id=affected_resource,
-                    ip_address=ip_address,
-                    success=success,
-                    risk_level=risk_assessment.upper(),
-                    additional_data=action_details
-                )
-                
-                return True
+            queued = self._enqueue('admin_audit', {
+                'admin_session_id': self.session_id,
+                'admin_user_id': admin_user_id,
+                'action_type': action_type,
+                'target_user_id': target_user_id,
+                'affected_resource': affected_resource,
+                'action_details': json.dumps(action_details) if action_details else None,
+                'privilege_level': privilege_level,
+                'ip_address': ip_address,
+                'success': success,
+                'risk_assessment': risk_assessment
+            })
+            if not queued:
+                return False
+            
+            # Also log in main audit table
+            return self._log_main_audit(
+                event_type="admin_action",
+                event_category="ADMINISTRATION",
+                user_id=admin_user_id,
+                action=action_type,
+                resource_type="admin_resource",
+                resource_id=affected_resource,
+                ip_address=ip_address,
+                success=success,
+                risk_level=risk_assessment.upper(),
+                additional_data=action_details
+            )
                 
         except Exception as e:
             print(f"Error logging admin action: {e}")
             return False
-        finally:
-            if conn:
-                conn.close()
     
     def log_password_access(self, user_id: str, password_id: int, site_name: str,
                            access_type: str, access_method: str = "GUI",
@@ -283,54 +697,43 @@ class AuditLogger:
                            risk_indicators: List[str] = None) -> bool:
         """Log password access events."""
         try:
-            with self.lock:
-                cursor = self.db_manager.get_cursor()
-                
-                cursor.execute('''
-                    INSERT INTO password_audit 
-                    (user_id, password_id, site_name, access_type, access_method,
-                     ip_address, user_agent, success, auto_fill, copy_to_clipboard,
-                     export_action, risk_indicators)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    user_id,
-                    password_id,
-                    site_name,
-                    access_type,
-                    access_method,
-                    ip_address,
-                    user_agent,
-                    success,
-                    auto_fill,
-                    copy_to_clipboard,
-                    export_action,
-                    json.dumps(risk_indicators) if risk_indicators else None
-                ))
-                
-                cursor.connection.commit()
-                
-                # Also log in main audit table
-                self._log_main_audit(
-                    event_type="password_access",
-                    event_category="DATA_ACCESS",
-                    user_id=user_id,
-                    action=access_type,
-                    resource_type="password",
-                    resource_id=str(password_id),
-                    resource_name=site_name,
-                    ip_address=ip_address,
-                    success=success,
-                    risk_level="MEDIUM" if export_action or copy_to_clipboard else "LOW",
-                    additional_data={
-                        "access_method": access_method,
-                        "auto_fill": auto_fill,
-                        "copy_to_clipboard": copy_to_clipboard,
-                        "export_action": export_action,
-                        "risk_indicators": risk_indicators
-                    }
-                )
-                
-                return True
+            queued = self._enqueue('password_audit', {
+                'user_id': user_id,
+                'password_id': password_id,
+                'site_name': site_name,
+                'access_type': access_type,
+                'access_method': access_method,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'success': success,
+                'auto_fill': auto_fill,
+                'copy_to_clipboard': copy_to_clipboard,
+                'export_action': export_action,
+                'risk_indicators': json.dumps(risk_indicators) if risk_indicators else None
+            })
+            if not queued:
+                return False
+            
+            # Also log in main audit table
+            return self._log_main_audit(
+                event_type="password_access",
+                event_category="DATA_ACCESS",
+                user_id=user_id,
+                action=access_type,
+                resource_type="password",
+                resource_id=str(password_id),
+                resource_name=site_name,
+                ip_address=ip_address,
+                success=success,
+                risk_level="MEDIUM" if export_action or copy_to_clipboard else "LOW",
+                additional_data={
+                    "access_method": access_method,
+                    "auto_fill": auto_fill,
+                    "copy_to_clipboard": copy_to_clipboard,
+                    "export_action": export_action,
+                    "risk_indicators": risk_indicators
+                }
+            )
                 
         except Exception as e:
             print(f"Error logging password access: {e}")
@@ -343,45 +746,35 @@ class AuditLogger:
                           mitigation_actions: List[str] = None) -> bool:
         """Log security events and threats."""
         try:
-            with self.lock:
-                cursor = self.db_manager.get_cursor()
-                
-                cursor.execute('''
-                    INSERT INTO security_audit 
-                    (event_type, severity_level, source_ip, threat_type,
-                     detection_method, affected_systems, mitigation_actions)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    event_type,
-                    severity_level,
-                    source_ip,
-                    threat_type,
-                    detection_method,
-                    json.dumps(affected_systems) if affected_systems else None,
-                    json.dumps(mitigation_actions) if mitigation_actions else None
-                ))
-                
-                cursor.connection.commit()
-                
-                # Also log in main audit table
-                risk_level = "CRITICAL" if severity_level == "HIGH" else severity_level
-                self._log_main_audit(
-                    event_type="security_event",
-                    event_category="SECURITY",
-                    action=event_type,
-                    resource_type="system",
-                    ip_address=source_ip,
-                    success=True,
-                    risk_level=risk_level,
-                    additional_data={
-                        "threat_type": threat_type,
-                        "detection_method": detection_method,
-                        "affected_systems": affected_systems,
-                        "mitigation_actions": mitigation_actions
-                    }
-                )
-                
-                return True
+            queued = self._enqueue('security_audit', {
+                'event_type': event_type,
+                'severity_level': severity_level,
+                'source_ip': source_ip,
+                'threat_type': threat_type,
+                'detection_method': detection_method,
+                'affected_systems': json.dumps(affected_systems) if affected_systems else None,
+                'mitigation_actions': json.dumps(mitigation_actions) if mitigation_actions else None
+            })
+            if not queued:
+                return False
+            
+            # Also log in main audit table
+            risk_level = "CRITICAL" if severity_level == "HIGH" else severity_level
+            return self._log_main_audit(
+                event_type="security_event",
+                event_category="SECURITY",
+                action=event_type,
+                resource_type="system",
+                ip_address=source_ip,
+                success=True,
+                risk_level=risk_level,
+                additional_data={
+                    "threat_type": threat_type,
+                    "detection_method": detection_method,
+                    "affected_systems": affected_systems,
+                    "mitigation_actions": mitigation_actions
+                }
+            )
                 
         except Exception as e:
             print(f"Error logging security event: {e}")
@@ -394,53 +787,42 @@ class AuditLogger:
                           risk_score: int = 0, blocked: bool = False) -> bool:
         """Log authentication attempts."""
         try:
-            with self.lock:
-                cursor = self.db_manager.get_cursor()
-                
-                cursor.execute('''
-                    INSERT INTO auth_audit 
-                    (user_id, username, auth_type, auth_method, ip_address,
-                     user_agent, success, failure_reason, session_id,
-                     mfa_used, risk_score, blocked)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    user_id,
-                    username,
-                    auth_type,
-                    auth_method,
-                    ip_address,
-                    user_agent,
-                    success,
-                    failure_reason,
-                    self.session_id,
-                    mfa_used,
-                    risk_score,
-                    blocked
-                ))
-                
-                cursor.connection.commit()
-                
-                # Also log in main audit table
-                risk_level = "HIGH" if blocked or risk_score > 70 else ("MEDIUM" if risk_score > 30 else "LOW")
-                self._log_main_audit(
-                    event_type="authentication",
-                    event_category="AUTHENTICATION",
-                    user_id=user_id,
-                    username=username,
-                    action=auth_type,
-                    ip_address=ip_address,
-                    success=success,
-                    error_message=failure_reason,
-                    risk_level=risk_level,
-                    additional_data={
-                        "auth_method": auth_method,
-                        "mfa_used": mfa_used,
-                        "risk_score": risk_score,
-                        "blocked": blocked
-                    }
-                )
-                
-                return True
+            queued = self._enqueue('auth_audit', {
+                'user_id': user_id,
+                'username': username,
+                'auth_type': auth_type,
+                'auth_method': auth_method,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'success': success,
+                'failure_reason': failure_reason,
+                'session_id': self.session_id,
+                'mfa_used': mfa_used,
+                'risk_score': risk_score,
+                'blocked': blocked
+            })
+            if not queued:
+                return False
+            
+            # Also log in main audit table
+            risk_level = "HIGH" if blocked or risk_score > 70 else ("MEDIUM" if risk_score > 30 else "LOW")
+            return self._log_main_audit(
+                event_type="authentication",
+                event_category="AUTHENTICATION",
+                user_id=user_id,
+                username=username,
+                action=auth_type,
+                ip_address=ip_address,
+                success=success,
+                error_message=failure_reason,
+                risk_level=risk_level,
+                additional_data={
+                    "auth_method": auth_method,
+                    "mfa_used": mfa_used,
+                    "risk_score": risk_score,
+                    "blocked": blocked
+                }
+            )
                 
         except Exception as e:
             print(f"Error logging authentication: {e}")
@@ -452,48 +834,38 @@ class AuditLogger:
                          impact_assessment: str = None) -> bool:
         """Log configuration changes."""
         try:
-            with self.lock:
-                cursor = self.db_manager.get_cursor()
-                
-                cursor.execute('''
-                    INSERT INTO config_audit 
-                    (admin_user_id, config_category, config_key, old_value,
-                     new_value, change_reason, approval_required, impact_assessment)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    admin_user_id,
-                    config_category,
-                    config_key,
-                    str(old_value) if old_value is not None else None,
-                    str(new_value) if new_value is not None else None,
-                    change_reason,
-                    approval_required,
-                    impact_assessment
-                ))
-                
-                cursor.connection.commit()
-                
-                # Also log in main audit table
-                self._log_main_audit(
-                    event_type="config_change",
-                    event_category="CONFIGURATION",
-                    user_id=admin_user_id,
-                    action="modify_config",
-                    resource_type="configuration",
-                    resource_id=config_key,
-                    resource_name=f"{config_category}.{config_key}",
-                    old_values={"value": old_value},
-                    new_values={"value": new_value},
-                    success=True,
-                    risk_level="HIGH" if approval_required else "MEDIUM",
-                    additional_data={
-                        "config_category": config_category,
-                        "change_reason": change_reason,
-                        "impact_assessment": impact_assessment
-                    }
-                )
-                
-                return True
+            queued = self._enqueue('config_audit', {
+                'admin_user_id': admin_user_id,
+                'config_category': config_category,
+                'config_key': config_key,
+                'old_value': str(old_value) if old_value is not None else None,
+                'new_value': str(new_value) if new_value is not None else None,
+                'change_reason': change_reason,
+                'approval_required': approval_required,
+                'impact_assessment': impact_assessment
+            })
+            if not queued:
+                return False
+            
+            # Also log in main audit table
+            return self._log_main_audit(
+                event_type="config_change",
+                event_category="CONFIGURATION",
+                user_id=admin_user_id,
+                action="modify_config",
+                resource_type="configuration",
+                resource_id=config_key,
+                resource_name=f"{config_category}.{config_key}",
+                old_values={"value": old_value},
+                new_values={"value": new_value},
+                success=True,
+                risk_level="HIGH" if approval_required else "MEDIUM",
+                additional_data={
+                    "config_category": config_category,
+                    "change_reason": change_reason,
+                    "impact_assessment": impact_assessment
+                }
+            )
                 
         except Exception as e:
             print(f"Error logging config change: {e}")
@@ -503,18 +875,17 @@ class AuditLogger:
                         success: bool = True, error_message: str = None) -> bool:
         """Log system-level events."""
         try:
-            with self.lock:
-                return self._log_main_audit(
-                    event_type=event_type,
-                    event_category="SYSTEM",
-                    action=event_type,
-                    resource_type="system",
-                    hostname=self.hostname,
-                    success=success,
-                    error_message=error_message,
-                    risk_level="LOW",
-                    additional_data=details
-                )
+            return self._log_main_audit(
+                event_type=event_type,
+                event_category="SYSTEM",
+                action=event_type,
+                resource_type="system",
+                hostname=self.hostname,
+                success=success,
+                error_message=error_message,
+                risk_level="LOW",
+                additional_data=details
+            )
                 
         except Exception as e:
             print(f"Error logging system event: {e}")
@@ -529,14 +900,7 @@ class AuditLogger:
                        success: bool = True, error_message: str = None,
                        risk_level: str = "LOW", additional_data: Dict = None) -> bool:
         """Log to main audit table."""
-        conn = None
         try:
-            conn = self.db_manager.get_cursor()
-            if conn is None:
-                return False
-            
-            cursor = conn.cursor()
-            
             # Prepare audit data
             audit_data = {
                 "session_id": self.session_id,
@@ -563,86 +927,262 @@ class AuditLogger:
             # Calculate hash verification
             audit_data["hash_verification"] = self._calculate_hash_verification(audit_data)
             
-            cursor.execute('''
-                INSERT INTO audit_log 
-                (session_id, event_type, event_category, user_id, username,
-                 action, resource_type, resource_id, resource_name,
-                 old_values, new_values, ip_address, user_agent,
-                 hostname, process_id, success, error_message,
-                 risk_level, additional_data, hash_verification)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', tuple(audit_data.values()))
-            
-            conn.commit()
-            return True
+            return self._enqueue('audit_log', audit_data)
             
         except Exception as e:
             print(f"Error logging main audit: {e}")
             return False
-        finally:
-            if conn:
-                conn.close()
     
-    def get_audit_logs(self, event_category: str = None, user_id: str = None,
-                      start_date: datetime = None, end_date: datetime = None,
-                      limit: int = 1000, risk_level: str = None,
-                      success_only: bool = None) -> List[Dict]:
-        """Retrieve audit logs with filtering."""
-        try:
-            cursor = self.db_manager.get_cursor()
-            
-            # Build query with filters
-            query = "SELECT * FROM audit_log WHERE 1=1"
-            params = []
-            
-            if event_category:
-                query += " AND event_category = ?"
+    def _build_audit_filters(self, event_category: str = None, user_id: str = None,
+                             start_date: datetime = None, end_date: datetime = None,
+                             risk_level: str = None, success_only: bool = None,
+                             event_types: Sequence[str] = None) -> tuple:
+        """Build the WHERE clause shared by the audit_log query methods."""
+        clauses = []
+        params = []
+        
+        if event_category:
+            if isinstance(event_category, (list, tuple, set)):
+                clauses.append(f"event_category IN ({', '.join('?' for _ in event_category)})")
+                params.extend(event_category)
+            else:
+                clauses.append("event_category = ?")
                 params.append(event_category)
+        
+        if event_types:
+            clauses.append(f"event_type IN ({', '.join('?' for _ in event_types)})")
+            params.extend(event_types)
+        
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        
+        if start_date:
+            clauses.append("timestamp >= ?")
+            params.append(_to_db_timestamp(start_date))
+        
+        if end_date:
+            clauses.append("timestamp <= ?")
+            params.append(_to_db_timestamp(end_date))
+        
+        if risk_level:
+            clauses.append("risk_level = ?")
+            params.append(risk_level)
+        
+        if success_only is not None:
+            clauses.append("success = ?")
+            params.append(success_only)
+        
+        where = " AND ".join(clauses) if clauses else "1=1"
+        return where, params
+    
+    def _select_columns(self, columns: Sequence[str] = None) -> List[str]:
+        """Validate a column projection, always including the id."""
+        if not columns:
+            return list(AUDIT_LOG_COLUMNS)
+        
+        unknown = [col for col in columns if col not in AUDIT_LOG_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown audit_log columns: {', '.join(unknown)}")
+        
+        selected = [col for col in columns if col != 'id']
+        return ['id'] + selected
+    
+    def query_audit_logs(self, columns: Sequence[str] = None, after_id: int = None,
+                         page_size: int = 100, descending: bool = True,
+                         **filters) -> Dict[str, Any]:
+        """Fetch one keyset-paginated page of audit_log rows.
+        
+        Only ``columns`` are selected and all filters are evaluated by SQLite.
+        Pass the returned ``next_after_id`` back as ``after_id`` to get the next
+        page; it is None once the log is exhausted. Rows are ``AuditRecord``
+        objects whose JSON columns are decoded only when accessed.
+        """
+        conn = None
+        try:
+            selected = self._select_columns(columns)
+            where, params = self._build_audit_filters(**filters)
             
-            if user_id:
-                query += " AND user_id = ?"
-                params.append(user_id)
-            
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date.isoformat())
-            
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date.isoformat())
-            
-            if risk_level:
-                query += " AND risk_level = ?"
-                params.append(risk_level)
+            if after_id is not None:
+                where += " AND id < ?" if descending else " AND id > ?"
+                params.append(after_id)
             
-            if success_only is not None:
-                query += " AND success = ?"
-                params.append(success_only)
+            order = "DESC" if descending else "ASC"
+            query = (f"SELECT {', '.join(selected)} FROM audit_log WHERE {where} "
+                     f"ORDER BY id {order} LIMIT ?")
+            params.append(page_size)
             
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
+            self.flush()
+            conn = self._connect()
+            rows = conn.execute(query, params).fetchall()
             
-            cursor.execute(query, params)
-            results = cursor.fetchall()
+            column_index = {col: index for index, col in enumerate(selected)}
+            records = [AuditRecord(column_index, row) for row in rows]
             
-            # Convert to dictionary format
-            columns = [desc[0] for desc in cursor.description]
-            logs = []
+            return {
+                "rows": records,
+                "next_after_id": records[-1]["id"] if len(records) == page_size else None
+            }
             
-            for result in results:
-                log_entry = dict(zip(columns, result))
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error querying audit logs: {e}")
+            return {"rows": [], "next_after_id": None}
+        finally:
+            if conn:
+                conn.close()
+    
+    def iter_audit_logs(self, columns: Sequence[str] = None, after_id: int = None,
+                        batch_size: int = 500, descending: bool = False,
+                        **filters) -> Iterator[AuditRecord]:
+        """Stream audit_log rows from a single cursor, ``batch_size`` at a time.
+        
+        Memory use is bounded by the batch size regardless of how many rows
+        match, which makes this the building block for exports.
+        """
+        selected = self._select_columns(columns)
+        where, params = self._build_audit_filters(**filters)
+        
+        if after_id is not None:
+            where += " AND id < ?" if descending else " AND id > ?"
+            params.append(after_id)
+        
+        order = "DESC" if descending else "ASC"
+        query = f"SELECT {', '.join(selected)} FROM audit_log WHERE {where} ORDER BY id {order}"
+        column_index = {col: index for index, col in enumerate(selected)}
+        
+        self.flush()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield AuditRecord(column_index, row)
+        finally:
+            conn.close()
+    
+    def count_audit_logs(self, **filters) -> int:
+        """Count audit_log rows matching the query filters."""
+        where, params = self._build_audit_filters(**filters)
+        
+        self.flush()
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM audit_log WHERE {where}", params).fetchone()[0]
+        finally:
+            conn.close()
+    
+    def export_audit_logs(self, output_path: str, export_format: str = "csv",
+                          compress: bool = None, batch_size: int = 1000,
+                          progress_callback: Callable = None,
+                          cancel_event: threading.Event = None,
+                          exported_by: str = "system", **filters) -> Dict:
+        """Stream matching audit_log rows to a CSV or JSONL file.
+        
+        Rows are read with ``iter_audit_logs`` and written one at a time, so
+        memory use does not grow with the size of the export. Each row carries
+        its stored ``hash_verification`` plus a ``chain_hash`` linking it to
+        the previous exported row:
+        
+            chain_hash = sha256(previous_chain_hash + canonical JSON of the row)
+        
+        where the canonical JSON is the exported row without ``chain_hash``,
+        with sorted keys. The first row chains from 64 zeros, so any removed,
+        reordered or edited row changes every following hash.
+        
+        ``progress_callback(written, total)`` is called after every batch.
+        Output is gzip-compressed when ``compress`` is true or, by default,
+        when ``output_path`` ends in ``.gz``.
+        """
+        export_format = export_format.lower()
+        if export_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported audit export format: {export_format}")
+        if compress is None:
+            compress = output_path.lower().endswith(".gz")
+        
+        result = {
+            "path": output_path,
+            "format": export_format,
+            "compressed": compress,
+            "rows_written": 0,
+            "final_chain_hash": None,
+            "cancelled": False
+        }
+        
+        total = self.count_audit_logs(**filters)
+        chain_hash = "0" * 64
+        written = 0
+        
+        opener = gzip.open if compress else open
+        with opener(output_path, "wt", encoding="utf-8", newline="") as output:
+            writer = None
+            if export_format == "csv":
+                writer = csv.writer(output)
+                writer.writerow(AUDIT_LOG_COLUMNS + ("chain_hash",))
+            
+            for record in self.iter_audit_logs(batch_size=batch_size, **filters):
+                row = {col: record.raw(col) for col in AUDIT_LOG_COLUMNS}
+                canonical = json.dumps(row, sort_keys=True, default=str)
+                chain_hash = hashlib.sha256((chain_hash + canonical).encode()).hexdigest()
                 
-                # Parse JSON fields
-                for json_field in ['old_values', 'new_values', 'additional_data']:
-                    if log_entry.get(json_field):
-                        try:
-                            log_entry[json_field] = json.loads(log_entry[json_field])
-                        except:
-                            pass
+                if writer:
+                    writer.writerow([row[col] for col in AUDIT_LOG_COLUMNS] + [chain_hash])
+                else:
+                    row["chain_hash"] = chain_hash
+                    output.write(json.dumps(row, default=str) + "\n")
                 
-                logs.append(log_entry)
+                written += 1
+                if written % batch_size == 0:
+                    if progress_callback:
+                        progress_callback(written, total)
+                    if cancel_event is not None and cancel_event.is_set():
+                        result["cancelled"] = True
+                        break
+        
+        if progress_callback and not result["cancelled"]:
+            progress_callback(written, total)
+        
+        result["rows_written"] = written
+        result["final_chain_hash"] = chain_hash if written else None
+        
+        self.log_admin_action(
+            admin_user_id=exported_by,
+            action_type="audit_export",
+            affected_resource=os.path.basename(output_path),
+            action_details={
+                "format": export_format,
+                "compressed": compress,
+                "rows_written": written,
+                "final_chain_hash": result["final_chain_hash"],
+                "cancelled": result["cancelled"]
+            },
+            risk_assessment="MEDIUM"
+        )
+        
+        return result
+    
+    def get_audit_logs(self, event_category: str = None, user_id: str = None,
+                      start_date: datetime = None, end_date: datetime = None,
+                      limit: int = 1000, risk_level: str = None,
+                      success_only: bool = None) -> List[Dict]:
+        """Retrieve audit logs with filtering."""
+        try:
+            page = self.query_audit_logs(
+                page_size=limit,
+                event_category=event_category,
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                risk_level=risk_level,
+                success_only=success_only
+            )
             
-            return logs
+            # Materialize with JSON fields decoded for existing callers
+            return [dict(record) for record in page["rows"]]
             
         except Exception as e:
             print(f"Error retrieving audit logs: {e}")
@@ -651,8 +1191,11 @@ class AuditLogger:
     def get_security_events(self, severity_level: str = None,
                            resolved: bool = None, limit: int = 100) -> List[Dict]:
         """Retrieve security events."""
+        conn = None
         try:
-            cursor = self.db_manager.get_cursor()
+            self.flush()
+            conn = self._connect()
+            cursor = conn.cursor()
             
             query = "SELECT * FROM security_audit WHERE 1=1"
             params = []
@@ -695,18 +1238,25 @@ class AuditLogger:
         except Exception as e:
             print(f"Error retrieving security events: {e}")
             return []
+        finally:
+            if conn:
+                conn.close()
     
+
     def generate_audit_report(self, report_type: str = "summary",
                              start_date: datetime = None,
                              end_date: datetime = None) -> Dict:
         """Generate comprehensive audit report."""
+        conn = None
         try:
             if not start_date:
                 start_date = datetime.now() - timedelta(days=30)
             if not end_date:
                 end_date = datetime.now()
             
-            cursor = self.db_manager.get_cursor()
+            self.flush()
+            conn = self._connect()
+            cursor = conn.cursor()
             
             # Base report structure
             report = {
@@ -726,7 +1276,7 @@ class AuditLogger:
                 FROM audit_log 
                 WHERE timestamp BETWEEN ? AND ?
                 GROUP BY event_category
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             activity_summary = dict(cursor.fetchall())
             report["summary"]["activity_by_category"] = activity_summary
@@ -737,7 +1287,7 @@ class AuditLogger:
                 FROM audit_log 
                 WHERE timestamp BETWEEN ? AND ?
                 GROUP BY risk_level
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             risk_summary = dict(cursor.fetchall())
             report["summary"]["risk_distribution"] = risk_summary
@@ -747,7 +1297,7 @@ class AuditLogger:
                 SELECT COUNT(*) as failed_events
                 FROM audit_log 
                 WHERE timestamp BETWEEN ? AND ? AND success = 0
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             failed_count = cursor.fetchone()[0]
             report["summary"]["failed_events"] = failed_count
@@ -760,7 +1310,7 @@ class AuditLogger:
                 GROUP BY user_id
                 ORDER BY activity_count DESC
                 LIMIT 10
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             top_users = cursor.fetchall()
             report["summary"]["most_active_users"] = [
@@ -774,7 +1324,7 @@ class AuditLogger:
                 FROM security_audit 
                 WHERE timestamp BETWEEN ? AND ?
                 GROUP BY severity_level
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             security_summary = dict(cursor.fetchall())
             report["summary"]["security_events"] = security_summary
@@ -785,7 +1335,7 @@ class AuditLogger:
                 FROM admin_audit 
                 WHERE timestamp BETWEEN ? AND ?
                 GROUP BY action_type
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             admin_summary = dict(cursor.fetchall())
             report["summary"]["admin_actions"] = admin_summary
@@ -796,7 +1346,7 @@ class AuditLogger:
                 FROM password_audit 
                 WHERE timestamp BETWEEN ? AND ?
                 GROUP BY access_type
-            ''', (start_date.isoformat(), end_date.isoformat()))
+            ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
             
             password_summary = dict(cursor.fetchall())
             report["summary"]["password_access"] = password_summary
@@ -821,36 +1371,62 @@ class AuditLogger:
                     SELECT * FROM auth_audit 
                     WHERE timestamp BETWEEN ? AND ? AND success = 0
                     ORDER BY timestamp DESC LIMIT 20
-                ''', (start_date.isoformat(), end_date.isoformat()))
+                ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
                 
                 failed_auth = cursor.fetchall()
                 columns = [desc[0] for desc in cursor.description]
                 report["details"]["failed_authentications"] = [
                     dict(zip(columns, row)) for row in failed_auth
                 ]
-            
+
+                # Password access per stored credential (joins the vault)
+                if self.vault_db_path and os.path.exists(self.vault_db_path):
+                    with self._vault_attached(conn):
+                        cursor.execute('''
+                            SELECT c.id, c.site_name, c.username, COUNT(pa.id) as access_count,
+                                   MAX(pa.timestamp) as last_access
+                            FROM password_audit pa
+                            JOIN vault.credentials c ON c.id = pa.password_id
+                            WHERE pa.timestamp BETWEEN ? AND ?
+                            GROUP BY c.id
+                            ORDER BY access_count DESC
+                            LIMIT 20
+                        ''', (_to_db_timestamp(start_date), _to_db_timestamp(end_date)))
+
+                        columns = [desc[0] for desc in cursor.description]
+                        report["details"]["credential_access"] = [
+                            dict(zip(columns, row)) for row in cursor.fetchall()
+                        ]
+
             return report
             
         except Exception as e:
             print(f"Error generating audit report: {e}")
             return {"error": str(e)}
+        finally:
+            if conn:
+                conn.close()
     
+
     def verify_audit_integrity(self, start_date: datetime = None,
                               end_date: datetime = None) -> Dict:
         """Verify audit log integrity using hash verification."""
+        conn = None
         try:
-            cursor = self.db_manager.get_cursor()
+            self.flush()
+            conn = self._connect()
+            cursor = conn.cursor()
             
             query = "SELECT * FROM audit_log WHERE hash_verification IS NOT NULL"
             params = []
             
             if start_date:
                 query += " AND timestamp >= ?"
-                params.append(start_date.isoformat())
+                params.append(_to_db_timestamp(start_date))
             
             if end_date:
                 query += " AND timestamp <= ?"
-                params.append(end_date.isoformat())
+                params.append(_to_db_timestamp(end_date))
             
             cursor.execute(query, params)
             logs = cursor.fetchall()
@@ -890,17 +1466,24 @@ class AuditLogger:
         except Exception as e:
             print(f"Error verifying audit integrity: {e}")
             return {"error": str(e)}
+        finally:
+            if conn:
+                conn.close()
     
+
     def cleanup_old_logs(self, retention_days: int = 365) -> int:
         """Clean up old audit logs based on retention policy."""
+        conn = None
         try:
             cutoff_date = datetime.now() - timedelta(days=retention_days)
-            cursor = self.db_manager.get_cursor()
+            self.flush()
+            conn = self._connect()
+            cursor = conn.cursor()
             
             # Count logs to be deleted
             cursor.execute('''
                 SELECT COUNT(*) FROM audit_log WHERE timestamp < ?
-            ''', (cutoff_date.isoformat(),))
+            ''', (_to_db_timestamp(cutoff_date),))
             
             count_to_delete = cursor.fetchone()[0]
             
@@ -918,10 +1501,10 @@ class AuditLogger:
             for table in tables:
                 cursor.execute(f'''
                     DELETE FROM {table} WHERE timestamp < ?
-                ''', (cutoff_date.isoformat(),))
+                ''', (_to_db_timestamp(cutoff_date),))
                 total_deleted += cursor.rowcount
             
-            cursor.connection.commit()
+            conn.commit()
             
             # Log the cleanup action
             self.log_system_event(
@@ -937,4 +1520,7 @@ class AuditLogger:
             
         except Exception as e:
             print(f"Error cleaning up old logs: {e}")
-            return 0
\ No newline at end of file
+            return 0
+        finally:
+            if conn:
+                conn.close()
@@ -0,0 +1,211 @@
+"""
+Credential typing for SilentLock's autofill.
+Waits for the target window to take focus instead of sleeping a fixed time,
+paces keystrokes per application and learns that pacing from how fills go.
+"""
+
+import threading
+import time
+from typing import Callable, Dict
+
+from .logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class PynputKeyboard:
+    """Keyboard backend that types through pynput."""
+    
+    def __init__(self):
+        from pynput.keyboard import Controller, Key
+        self._controller = Controller()
+        self._key = Key
+    
+    def select_all(self):
+        self._controller.press(self._key.ctrl)
+        self._controller.press('a')
+        self._controller.release('a')
+        self._controller.release(self._key.ctrl)
+    
+    def type_text(self, text: str):
+        self._controller.type(text)
+    
+    def press_tab(self):
+        self._controller.press(self._key.tab)
+        self._controller.release(self._key.tab)
+
+
+class FakeKeyboard:
+    """Keyboard backend that records actions instead of typing (for tests)."""
+    
+    def __init__(self, clock: Callable = time.monotonic):
+        self.clock = clock
+        self.actions = []  # (time, action, length of typed text)
+    
+    def select_all(self):
+        self.actions.append((self.clock(), 'select_all', 0))
+    
+    def type_text(self, text: str):
+        self.actions.append((self.clock(), 'type', len(text)))
+    
+    def press_tab(self):
+        self.actions.append((self.clock(), 'tab', 0))
+
+
+class TimingProfile:
+    """Delays used when filling one application, adjusted after each fill."""
+    
+    MIN_DELAY = 0.02
+    MAX_DELAY = 0.5
+    
+    def __init__(self, settle_delay: float = 0.1, field_delay: float = 0.1,
+                 focus_timeout: float = 3.0):
+        self.settle_delay = settle_delay   # after the window has focus
+        self.field_delay = field_delay     # around the Tab between fields
+        self.focus_timeout = focus_timeout
+        self.successes = 0
+        self.failures = 0
+    
+    def record(self, success: bool):
+        """Speed up after a good fill, back off after a bad one."""
+        factor = 0.8 if success else 1.5
+        self.settle_delay = min(max(self.settle_delay * factor, self.MIN_DELAY), self.MAX_DELAY)
+        self.field_delay = min(max(self.field_delay * factor, self.MIN_DELAY), self.MAX_DELAY)
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+    
+    def to_dict(self) -> Dict:
+        return {
+            'settle_delay': round(self.settle_delay, 3),
+            'field_delay': round(self.field_delay, 3),
+            'successes': self.successes,
+            'failures': self.failures
+        }
+
+
+class AutofillEngine:
+    """Types a username and password into a target window.
+    
+    The fill starts as soon as the target window is in the foreground (as
+    reported by ``notify_foreground`` or the ``foreground`` callable), with
+    a timeout instead of a fixed sleep, and stops if focus moves elsewhere
+    so keystrokes never land in another window. Per-application delays
+    shrink after fills reported as logging in (``report_result``) and grow
+    after failed or aborted ones.
+    """
+    
+    FOCUS_RECHECK = 0.05
+    
+    def __init__(self, keyboard=None, foreground: Callable = None):
+        """
+        Args:
+            keyboard: Backend with select_all, type_text and press_tab;
+                PynputKeyboard is created on first use when omitted
+            foreground: Optional callable returning the foreground window
+        """
+        self.keyboard = keyboard
+        self.foreground = foreground
+        self.profiles = {}  # application name -> TimingProfile
+        self._foreground_hwnd = None
+        self._condition = threading.Condition()
+        
+        self.fills = 0
+        self.aborted = 0
+        self.last_latency = None
+    
+    def notify_foreground(self, hwnd):
+        """Window event hook: ``hwnd`` is now the foreground window."""
+        with self._condition:
+            self._foreground_hwnd = hwnd
+            self._condition.notify_all()
+    
+    def _current_foreground(self):
+        if self.foreground is not None:
+            try:
+                return self.foreground()
+            except Exception:
+                pass
+        return self._foreground_hwnd
+    
+    def wait_for_foreground(self, hwnd, timeout: float) -> bool:
+        """Block until ``hwnd`` is the foreground window or ``timeout`` passes.
+        
+        Wakes on ``notify_foreground``; with a ``foreground`` callable it also
+        re-checks every FOCUS_RECHECK seconds in case an event was missed.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._current_foreground() != hwnd:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if self.foreground is not None:
+                    remaining = min(remaining, self.FOCUS_RECHECK)
+                self._condition.wait(remaining)
+            return True
+    
+    def _has_focus(self, hwnd) -> bool:
+        return hwnd is None or self._current_foreground() == hwnd
+    
+    def get_profile(self, app: str) -> TimingProfile:
+        profile = self.profiles.get(app)
+        if profile is None:
+            profile = self.profiles[app] = TimingProfile()
+        return profile
+    
+    def report_result(self, app: str, success: bool):
+        """Feed back whether a fill for ``app`` actually worked."""
+        self.get_profile(app).record(success)
+    
+    def fill(self, username: str, password: str, hwnd=None, app: str = "") -> Dict:
+        """Fill ``username``, Tab, ``password`` into ``hwnd``.
+        
+        Returns a dict with 'filled', 'latency' (seconds from the call until
+        the password was typed) and, when aborted, 'reason'. Typing is not
+        proof the fill worked; the caller reports that via ``report_result``.
+        """
+        profile = self.get_profile(app)
+        started = time.monotonic()
+        keyboard = self.keyboard = self.keyboard or PynputKeyboard()
+        
+        def abort(reason: str) -> Dict:
+            self.aborted += 1
+            profile.record(False)
+            logger.warning("Auto-fill for %s stopped: %s", app or 'window', reason)
+            return {'filled': False, 'reason': reason, 'latency': time.monotonic() - started}
+        
+        if hwnd is not None and not self.wait_for_foreground(hwnd, profile.focus_timeout):
+            return abort("target window did not get focus")
+        time.sleep(profile.settle_delay)
+        
+        steps = (
+            keyboard.select_all,
+            lambda: keyboard.type_text(username),
+            lambda: time.sleep(profile.field_delay),
+            keyboard.press_tab,
+            lambda: time.sleep(profile.field_delay),
+        )
+        for step in steps:
+            if not self._has_focus(hwnd):
+                return abort("focus moved to another window")
+            step()
+        
+        if not self._has_focus(hwnd):
+            return abort("focus moved to another window")
+        keyboard.type_text(password)
+        
+        latency = time.monotonic() - started
+        self.fills += 1
+        self.last_latency = latency
+        return {'filled': True, 'latency': latency}
+    
+    def get_stats(self) -> Dict:
+        return {
+            'fills': self.fills,
+            'aborted': self.aborted,
+            'last_latency': self.last_latency,
+            'profiles': {app: profile.to_dict() for app, profile in self.profiles.items()}
+        }
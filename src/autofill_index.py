@@ -0,0 +1,212 @@
+"""
+In-memory autofill index for SilentLock's form detector.
+Maps hosts to stored credentials (ids and usernames only, never passwords)
+so autofill lookups don't scan and decrypt the credential table.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from .site_resolver import extract_domain
+
+
+class _DomainNode:
+    """One label in the reversed-label domain trie."""
+    
+    __slots__ = ('children', 'ids')
+    
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+def host_labels(value: str) -> Optional[List[str]]:
+    """Return the reversed labels of a host ('a.example.com' -> ['com', 'example', 'a']).
+    
+    Returns None for values that aren't host-like, such as plain site names.
+    """
+    if not value:
+        return None
+    host = extract_domain(value.strip()).strip('.')
+    if ' ' in host or '.' not in host:
+        return None
+    labels = [label for label in host.split('.') if label]
+    if len(labels) < 2:
+        return None
+    labels.reverse()
+    return labels
+
+
+class AutofillIndex:
+    """Host -> credential index built once after unlock.
+    
+    Hosts are stored in a trie keyed by reversed labels, so a lookup for
+    ``login.example.com`` walks ``com -> example -> login`` and also finds
+    credentials saved for ``example.com``. Plain site names are kept in a
+    hash as a fallback. Entries carry ids and usernames only; the password
+    is decrypted separately for the credential the user picks.
+    """
+    
+    def __init__(self):
+        self._root = _DomainNode()
+        self._names = {}     # lowercased site name / single-label host -> set of ids
+        self._entries = {}   # id -> entry dict
+        self._keys = {}      # (site_url, username) -> id
+        self.credential_db = None
+        self.lock = threading.RLock()
+        
+        self.builds = 0
+        self.lookups = 0
+        self.hits = 0
+    
+    def attach(self, credential_db):
+        """Build the index from ``credential_db`` and follow its changes."""
+        self.detach()
+        self.credential_db = credential_db
+        if hasattr(credential_db, 'add_change_listener'):
+            credential_db.add_change_listener(self.apply_change)
+        self.rebuild()
+    
+    def detach(self):
+        """Stop following the database and forget all entries."""
+        if self.credential_db is not None and hasattr(self.credential_db, 'remove_change_listener'):
+            self.credential_db.remove_change_listener(self.apply_change)
+        self.credential_db = None
+        self.clear()
+    
+    def rebuild(self):
+        """Reload all entries from the attached database."""
+        rows = self.credential_db.list_credential_index() if self.credential_db else []
+        with self.lock:
+            self.clear()
+            for row in rows:
+                self.add(row)
+            self.builds += 1
+    
+    def clear(self):
+        with self.lock:
+            self._root = _DomainNode()
+            self._names = {}
+            self._entries = {}
+            self._keys = {}
+    
+    def add(self, row: Dict):
+        """Index a credential given its id, site_name, site_url and username."""
+        entry = {
+            'id': row['id'],
+            'site_name': row.get('site_name', ''),
+            'site_url': row.get('site_url', ''),
+            'username': row.get('username', '')
+        }
+        with self.lock:
+            # INSERT OR REPLACE gives an updated credential a new id
+            self.remove_by_key(entry['site_url'], entry['username'])
+            self._entries[entry['id']] = entry
+            self._keys[(entry['site_url'], entry['username'])] = entry['id']
+            
+            labels = host_labels(entry['site_url'])
+            if labels:
+                node = self._root
+                for label in labels:
+                    node = node.children.setdefault(label, _DomainNode())
+                node.ids.add(entry['id'])
+            else:
+                self._names.setdefault(entry['site_url'].strip().lower(), set()).add(entry['id'])
+            
+            if entry['site_name']:
+                self._names.setdefault(entry['site_name'].strip().lower(), set()).add(entry['id'])
+    
+    def remove_by_key(self, site_url: str, username: str):
+        """Drop the credential stored for ``(site_url, username)``, if any."""
+        with self.lock:
+            credential_id = self._keys.pop((site_url, username), None)
+            entry = self._entries.pop(credential_id, None)
+            if entry is None:
+                return
+            
+            labels = host_labels(entry['site_url'])
+            if labels:
+                path = [self._root]
+                for label in labels:
+                    node = path[-1].children.get(label)
+                    if node is None:
+                        break
+                    path.append(node)
+                else:
+                    path[-1].ids.discard(credential_id)
+                    # Prune labels that no longer lead anywhere
+                    for parent, label in zip(reversed(path[:-1]), reversed(labels)):
+                        child = parent.children[label]
+                        if child.ids or child.children:
+                            break
+                        del parent.children[label]
+            
+            for name in (entry['site_url'].strip().lower(), entry['site_name'].strip().lower()):
+                ids = self._names.get(name)
+                if ids:
+                    ids.discard(credential_id)
+                    if not ids:
+                        del self._names[name]
+    
+    def apply_change(self, action: str, details: Dict):
+        """Change listener registered with the credential database.
+        
+        Also applies changes made through another connection to the same
+        database (see detector_process).
+        """
+        try:
+            if action == 'stored':
+                self.add(details)
+            elif action == 'deleted':
+                self.remove_by_key(details.get('site_url', ''), details.get('username', ''))
+            else:
+                self.rebuild()
+        except Exception as e:
+            print(f"Error updating autofill index: {e}")
+    
+    def _match_host(self, value: str) -> set:
+        """Ids stored for the host or any of its parent domains."""
+        labels = host_labels(value)
+        if not labels:
+            return set()
+        matches = set()
+        node = self._root
+        for depth, label in enumerate(labels, 1):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if depth >= 2:  # Never match on a bare TLD
+                matches.update(node.ids)
+        return matches
+    
+    def lookup(self, site_url: str = "", site_name: str = "") -> List[Dict]:
+        """Return credential entries (without passwords) for a site."""
+        with self.lock:
+            self.lookups += 1
+            ids = self._match_host(site_url)
+            if not ids and site_name:
+                ids = self._match_host(site_name)
+            if not ids:
+                for value in (site_url, site_name):
+                    if value:
+                        ids = set(self._names.get(value.strip().lower(), ()))
+                        if ids:
+                            break
+            if ids:
+                self.hits += 1
+            entries = [dict(self._entries[credential_id]) for credential_id in ids]
+        
+        entries.sort(key=lambda entry: (entry['site_name'], entry['username']))
+        return entries
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'entries': len(self._entries),
+                'builds': self.builds,
+                'lookups': self.lookups,
+                'hits': self.hits
+            }
@@ -7,7 +7,7 @@ import sqlite3
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from .security import SecurityManager
 
 
@@ -23,6 +23,7 @@ class DatabaseManager:
         
         self.db_path = db_path
         self.security = SecurityManager()
+        self._change_listeners = []
         self._init_database()
     
     def _init_database(self):
@@ -159,6 +160,12 @@ class DatabaseManager:
             credential_id = cursor.lastrowid
             conn.commit()
             conn.close()
+            
+            if credential_id:
+                self._notify_change('stored', {
+                    'id': credential_id, 'site_name': site_name,
+                    'site_url': site_url, 'username': username
+                })
             return credential_id if credential_id else 0
             
         except Exception as e:
@@ -401,6 +408,8 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            
+            self._notify_change('deleted', {'site_url': site_url, 'username': username})
             return True
             
         except Exception as e:
@@ -450,6 +459,45 @@ class DatabaseManager:
             print(f"Error searching credentials: {e}")
             return []
     
+    def list_credential_index(self) -> List[Dict]:
+        """List credential ids, sites and usernames without decrypting anything."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, site_name, site_url, username
+                FROM credentials ORDER BY site_name, username
+            ''')
+            
+            results = cursor.fetchall()
+            conn.close()
+            
+            return [
+                {'id': credential_id, 'site_name': site_name, 'site_url': site_url, 'username': username}
+                for credential_id, site_name, site_url, username in results
+            ]
+            
+        except Exception as e:
+            print(f"Error listing credentials: {e}")
+            return []
+    
+    def add_change_listener(self, callback: Callable):
+        """Call ``callback(action, details)`` after a credential is stored or deleted."""
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback: Callable):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change(self, action: str, details: Dict):
+        for callback in list(self._change_listeners):
+            try:
+                callback(action, details)
+            except Exception as e:
+                print(f"Error in credential change listener: {e}")
+    
     def get_cursor(self):
         """Get database cursor for direct SQL operations."""
         try:
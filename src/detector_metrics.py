@@ -0,0 +1,165 @@
+"""
+Latency instrumentation for SilentLock's form detector.
+Keeps a fixed-bucket histogram per processing stage, cheap enough to record
+on every event, and writes periodic JSON snapshots for field diagnosis.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+# Stages recorded by the detector
+STAGE_KEY_QUEUE = 'key_queue'                    # keystroke enqueue -> dequeue
+STAGE_WINDOW_ANALYSIS = 'window_analysis'
+STAGE_TITLE_PARSE = 'title_parse'
+STAGE_PROCESS_LOOKUP = 'process_lookup'
+STAGE_AUTOFILL_LOOKUP = 'autofill_lookup'
+STAGE_PROMPT_DISPLAY = 'prompt_display'          # trigger event -> prompt shown
+STAGE_VERIFICATION = 'verification_to_save'      # capture -> verified login
+
+# Bucket upper bounds in milliseconds; the last bucket is open ended
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250,
+                    500, 1000, 2500, 5000, 10000)
+
+SNAPSHOT_FILE_NAME = 'detector_metrics.json'
+# Overrides where the periodic snapshot is written
+SNAPSHOT_FILE_ENV_VAR = 'SILENTLOCK_METRICS_FILE'
+
+
+class LatencyHistogram:
+    """Counts samples into fixed log-spaced buckets; percentiles are bucket bounds."""
+    
+    __slots__ = ('counts', 'count', 'total', 'max')
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+    
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (ms) of the bucket holding the ``fraction`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max, 3),
+            'buckets': {
+                (f"<={bound}" if index < len(BUCKET_BOUNDS_MS) else f">{BUCKET_BOUNDS_MS[-1]}"): count
+                for index, (bound, count) in enumerate(zip(BUCKET_BOUNDS_MS + (None,), self.counts))
+                if count
+            }
+        }
+
+
+class DetectorMetrics:
+    """Per-stage latency histograms for one detector."""
+    
+    def __init__(self):
+        self._histograms = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+    
+    def record(self, stage: str, seconds: float):
+        with self.lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.record(max(seconds, 0.0))
+    
+    @contextmanager
+    def timed(self, stage: str):
+        """``with metrics.timed(STAGE_TITLE_PARSE): ...`` records the block's duration."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+    
+    def reset(self):
+        with self.lock:
+            self._histograms = {}
+            self.started = time.time()
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {stage: histogram.to_dict() for stage, histogram in sorted(self._histograms.items())}
+
+
+def write_snapshot(path: str, status: Dict):
+    """Write ``status`` as JSON to ``path`` (temporary file + rename)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(status, snapshot_time=time.time()), f, indent=1, default=str)
+    os.replace(temp_path, path)
+
+
+def default_snapshot_file() -> Optional[str]:
+    """Snapshot file from SILENTLOCK_METRICS_FILE, else next to the credential database."""
+    if os.environ.get(SNAPSHOT_FILE_ENV_VAR):
+        return os.environ[SNAPSHOT_FILE_ENV_VAR]
+    app_data = os.path.expandvars(r'%APPDATA%\SilentLock')
+    if '%' in app_data:
+        return None
+    return os.path.join(app_data, SNAPSHOT_FILE_NAME)
+
+
+class SnapshotWriter:
+    """Rewrites a snapshot file every ``interval`` seconds using a scheduler."""
+    
+    def __init__(self, scheduler, status: Callable, path: str, interval: float = 60.0):
+        self.scheduler = scheduler
+        self.status = status
+        self.path = path
+        self.interval = interval
+        self._call = None
+        self.writes = 0
+    
+    def start(self):
+        if self.path and self._call is None:
+            self._call = self.scheduler.call_later(self.interval, self._write, name="metrics-snapshot")
+    
+    def stop(self):
+        call, self._call = self._call, None
+        if call is not None:
+            call.cancel()
+    
+    def write_now(self):
+        try:
+            write_snapshot(self.path, self.status())
+            self.writes += 1
+        except Exception as e:
+            print(f"Error writing detector metrics snapshot: {e}")
+    
+    def _write(self):
+        self.write_now()
+        self._call = self.scheduler.call_later(self.interval, self._write, name="metrics-snapshot")
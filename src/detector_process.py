@@ -0,0 +1,332 @@
+"""
+Optional out-of-process mode for SilentLock's form detector.
+Runs the detector (input hooks, window monitoring, credential lookups) in a
+child process so it doesn't share a GIL with the Tk GUI, and talks to it
+over a multiprocessing pipe.
+
+Messages are tuples whose first item is the message kind:
+
+    GUI -> detector                      detector -> GUI
+    ('stop',)                            ('ready', pid)
+    ('set', name, value)                 ('error', message)
+    ('status', request_id)               ('capture', seq, credential_data)
+    ('saved', seq, success)              ('usage', credential_id, action, details)
+    ('credentials_changed', action,      ('status', request_id, status)
+     details)                            ('stopped',)
+
+The child opens its own DatabaseManager, which doesn't see the GUI's saves
+and deletes; 'credentials_changed' forwards them so its autofill index
+stays current.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from .logging_config import configure_logging, get_logger
+from .window_registry import get_window_registry
+
+
+logger = get_logger(__name__)
+
+# Set to 1 to run the detector in its own process
+DETECTOR_PROCESS_ENV_VAR = "SILENTLOCK_DETECTOR_PROCESS"
+
+# Detector attributes the GUI may change while monitoring
+CONFIGURABLE_SETTINGS = frozenset(['monitor_all_apps'])
+
+
+def detector_process_enabled() -> bool:
+    """True when the detector should run in a separate process."""
+    return os.environ.get(DETECTOR_PROCESS_ENV_VAR, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def default_detector_factory(on_login_detected: Callable, credential_db, master_password, enhanced: bool):
+    """Build the same detector the GUI uses in-process."""
+    if enhanced:
+        from .enhanced_login_detector import EnhancedLoginFormDetector
+        return EnhancedLoginFormDetector(
+            on_login_detected=on_login_detected,
+            credential_db=credential_db,
+            master_password=master_password
+        )
+    from .form_detector import LoginFormDetector
+    return LoginFormDetector(
+        on_login_detected=on_login_detected,
+        credential_db=credential_db,
+        master_password=master_password
+    )
+
+
+def run_detector_worker(conn, config: Dict):
+    """Child process entry point: run a detector and serve the pipe until told to stop."""
+    configure_logging(level=config.get('log_level'), log_file=config.get('log_file'))
+    
+    # The GUI's windows live in the parent process
+    get_window_registry().register_pid(config.get('parent_pid'))
+    
+    send_lock = threading.Lock()
+    waiters = {}  # seq -> [threading.Event, result]
+    sequence = itertools.count(1)
+    ready = threading.Event()
+    
+    def send(*message):
+        try:
+            with send_lock:
+                conn.send(message)
+        except (OSError, EOFError, ValueError):
+            pass  # GUI went away; the receive loop notices and stops
+    
+    def on_login_detected(credential_data):
+        # Blocks the calling detector thread until the GUI has handled the save
+        ready.wait()
+        seq = next(sequence)
+        waiter = waiters[seq] = [threading.Event(), False]
+        send('capture', seq, credential_data)
+        waiter[0].wait(config.get('capture_timeout', 300))
+        waiters.pop(seq, None)
+        return waiter[1]
+    
+    credential_db = None
+    detector = None
+    try:
+        if config.get('db_path'):
+            from .database import DatabaseManager
+            credential_db = DatabaseManager(config['db_path'])
+        
+        factory = config.get('detector_factory') or default_detector_factory
+        detector = factory(on_login_detected, credential_db, config.get('master_password'),
+                           config.get('enhanced', True))
+        base_detector = getattr(detector, 'base_detector', detector)
+        base_detector.monitor_all_apps = config.get('monitor_all_apps', True)
+        
+        tracker = getattr(detector, 'realtime_tracker', None)
+        if tracker is not None:
+            tracker.add_callback(lambda entry: send(
+                'usage', entry['credential_id'], entry['action'], entry['details']
+            ))
+        
+        detector.start_monitoring()
+    except Exception as e:
+        send('error', f"Detector failed to start: {e}")
+        conn.close()
+        return
+    
+    send('ready', os.getpid())
+    ready.set()
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break  # GUI process exited
+            
+            kind = message[0]
+            if kind == 'stop':
+                break
+            elif kind == 'saved':
+                waiter = waiters.get(message[1])
+                if waiter:
+                    waiter[1] = bool(message[2])
+                    waiter[0].set()
+            elif kind == 'set':
+                if message[1] in CONFIGURABLE_SETTINGS:
+                    setattr(base_detector, message[1], message[2])
+            elif kind == 'status':
+                try:
+                    status = base_detector.get_monitoring_status()
+                except Exception as e:
+                    status = {'error': str(e)}
+                send('status', message[1], status)
+            elif kind == 'credentials_changed':
+                autofill_index = getattr(base_detector, 'autofill_index', None)
+                if autofill_index is not None:
+                    autofill_index.apply_change(message[1], message[2])
+            else:
+                logger.warning("⚠️ Unknown detector message: %s", kind)
+    finally:
+        ready.set()
+        for waiter in list(waiters.values()):
+            waiter[0].set()
+        try:
+            detector.stop_monitoring()
+        except Exception as e:
+            logger.error("Error stopping detector: %s", e)
+        if credential_db is not None:
+            credential_db.close_connection()
+        send('stopped')
+        conn.close()
+
+
+class DetectorProcessProxy:
+    """GUI-side stand-in for a detector running in a child process.
+    
+    Keeps the in-process API: ``on_login_detected(credential_data)`` is called
+    in this process for every capture and its return value is sent back as
+    the save result. Usage events are replayed into ``realtime_tracker``.
+    Changes made through ``credential_db`` (the GUI's DatabaseManager) are
+    forwarded to the child.
+    """
+    
+    def __init__(self, on_login_detected: Callable = None, db_path: str = None, master_password=None,
+                 enhanced: bool = True, monitor_all_apps: bool = True, realtime_tracker=None,
+                 detector_factory: Callable = None, start_timeout: float = 30.0, credential_db=None):
+        self.on_login_detected = on_login_detected
+        self.realtime_tracker = realtime_tracker
+        self.credential_db = credential_db
+        if db_path is None and credential_db is not None:
+            db_path = getattr(credential_db, 'db_path', None)
+        self.start_timeout = start_timeout
+        self._config = {
+            'db_path': db_path,
+            'master_password': master_password,
+            'enhanced': enhanced,
+            'monitor_all_apps': monitor_all_apps,
+            'detector_factory': detector_factory
+        }
+        self._monitor_all_apps = monitor_all_apps
+        
+        self.process = None
+        self.child_pid = None
+        self.is_monitoring = False
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._reader = None
+        self._status_requests = {}  # request_id -> [threading.Event, status]
+        self._request_ids = itertools.count(1)
+        
+        self.captures = 0
+    
+    def _send(self, *message) -> bool:
+        try:
+            with self._send_lock:
+                self._conn.send(message)
+            return True
+        except (AttributeError, OSError, EOFError, ValueError):
+            return False
+    
+    def start_monitoring(self):
+        """Start the detector process and wait until it is monitoring."""
+        if self.is_monitoring:
+            return
+        
+        # spawn: a clean interpreter, no forked Tk or listener state
+        context = multiprocessing.get_context('spawn')
+        parent_conn, child_conn = context.Pipe()
+        config = dict(self._config, parent_pid=os.getpid(), monitor_all_apps=self._monitor_all_apps)
+        self.process = context.Process(target=run_detector_worker, args=(child_conn, config),
+                                       daemon=True, name="silentlock-detector")
+        self.process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        
+        if not parent_conn.poll(self.start_timeout):
+            self._terminate()
+            raise RuntimeError("detector process did not start")
+        message = parent_conn.recv()
+        if message[0] != 'ready':
+            self._terminate()
+            raise RuntimeError(message[1] if message[0] == 'error' else f"unexpected message {message[0]}")
+        
+        self.child_pid = message[1]
+        get_window_registry().register_pid(self.child_pid)
+        if self.credential_db is not None:
+            self.credential_db.add_change_listener(self._forward_credential_change)
+        self.is_monitoring = True
+        self._reader = threading.Thread(target=self._read_messages, daemon=True, name="detector-pipe")
+        self._reader.start()
+        logger.info("🚀 Detector running in process %s", self.child_pid)
+    
+    def _read_messages(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            
+            kind = message[0]
+            if kind == 'capture':
+                # The save handler may show a dialog; don't hold up the pipe
+                threading.Thread(target=self._handle_capture, args=message[1:],
+                                 daemon=True, name=f"capture-{message[1]}").start()
+            elif kind == 'usage':
+                if self.realtime_tracker is not None:
+                    self.realtime_tracker.add_usage(*message[1:])
+            elif kind == 'status':
+                request = self._status_requests.get(message[1])
+                if request:
+                    request[1] = message[2]
+                    request[0].set()
+            elif kind == 'error':
+                logger.error("Detector process error: %s", message[1])
+            elif kind == 'stopped':
+                break
+        
+        self.is_monitoring = False
+        for request in list(self._status_requests.values()):
+            request[0].set()
+    
+    def _handle_capture(self, seq: int, credential_data: Dict):
+        self.captures += 1
+        result = False
+        try:
+            if self.on_login_detected:
+                result = self.on_login_detected(credential_data)
+        except Exception as e:
+            logger.error("Error in capture handler: %s", e)
+        self._send('saved', seq, bool(result))
+    
+    def stop_monitoring(self, timeout: float = 5.0):
+        """Ask the detector process to stop, terminating it if it doesn't."""
+        if self.process is None:
+            return
+        self._send('stop')
+        self.process.join(timeout)
+        self._terminate()
+        logger.info("⏹️ Detector process stopped")
+    
+    def _forward_credential_change(self, action: str, details: Dict):
+        """Change listener on the GUI's database: replay the change in the child."""
+        self._send('credentials_changed', action, details)
+    
+    def _terminate(self):
+        if self.credential_db is not None:
+            self.credential_db.remove_change_listener(self._forward_credential_change)
+        process, self.process = self.process, None
+        if process is not None and process.is_alive():
+            process.terminate()
+            process.join(1.0)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self.child_pid:
+            get_window_registry().unregister_pid(self.child_pid)
+            self.child_pid = None
+        self.is_monitoring = False
+    
+    @property
+    def monitor_all_apps(self) -> bool:
+        return self._monitor_all_apps
+    
+    @monitor_all_apps.setter
+    def monitor_all_apps(self, value: bool):
+        self._monitor_all_apps = bool(value)
+        self._send('set', 'monitor_all_apps', self._monitor_all_apps)
+    
+    def get_monitoring_status(self, timeout: float = 2.0) -> Dict:
+        """Fetch the detector's monitoring status from the child process."""
+        request_id = next(self._request_ids)
+        request = self._status_requests[request_id] = [threading.Event(), None]
+        try:
+            if not self._send('status', request_id) or not request[0].wait(timeout) or request[1] is None:
+                return {'is_monitoring': False, 'error': 'detector process not responding'}
+            status = dict(request[1])
+            status['detector_pid'] = self.child_pid
+            return status
+        finally:
+            self._status_requests.pop(request_id, None)
+    
+    def get_realtime_tracker(self):
+        return self.realtime_tracker
@@ -0,0 +1,406 @@
+"""
+Record and replay harness for SilentLock's login form detector.
+Captures sanitized input and window event streams from a live detector and
+feeds them back through the fake window source on a virtual clock, so
+detector changes can be measured and regression-tested without a desktop.
+"""
+
+import gzip
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .window_events import FakeWindowSource, TITLE_CHANGED
+
+
+RECORDING_FORMAT = "silentlock-replay"
+RECORDING_VERSION = 1
+
+# Characters kept verbatim because the detector treats them specially
+KEPT_CHARACTERS = frozenset('@.-_')
+
+# Base of the virtual wall clock, so replayed timestamps look like real ones
+VIRTUAL_EPOCH = 1700000000.0
+
+
+def sanitize_char(char: str) -> str:
+    """Reduce a typed character to its class: 'a'/'A' letters, '0' digits, '#' other."""
+    if char in KEPT_CHARACTERS:
+        return char
+    if char.isalpha():
+        return 'A' if char.isupper() else 'a'
+    if char.isdigit():
+        return '0'
+    return '#'
+
+
+def _open_recording(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+
+def load_recording(path: str) -> List[Dict]:
+    """Read the events of a recording written by DetectorRecorder."""
+    with _open_recording(path, 'r') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != RECORDING_FORMAT:
+            raise ValueError(f"Not a detector recording: {path}")
+        if header.get('version', 0) > RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.get('version')}")
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class DetectorRecorder:
+    """Writes a compact, sanitized event stream to a JSON lines file.
+    
+    Each line holds one event with its offset ``t`` in seconds from the start
+    of the recording. Window events keep handle, title and process name; key
+    events keep only the key class (see ``sanitize_char``) or the name of a
+    special key; clicks keep the button and press state but no coordinates.
+    """
+    
+    def __init__(self, path: str, clock: Callable = time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.started_at = clock()
+        self.events_recorded = 0
+        self.lock = threading.Lock()
+        self._file = _open_recording(path, 'w')
+        self._write({'format': RECORDING_FORMAT, 'version': RECORDING_VERSION,
+                     'created': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    
+    def _write(self, record: Dict):
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+        with self.lock:
+            if self._file:
+                self._file.write(line + '\n')
+    
+    def _record(self, event: str, **fields):
+        fields = {key: value for key, value in fields.items() if value is not None}
+        self._write(dict(t=round(self.clock() - self.started_at, 4), e=event, **fields))
+        self.events_recorded += 1
+    
+    def record_window(self, hwnd: int, kind: str, title: str = None,
+                      process_name: str = None, pid: int = None):
+        self._record('w', h=hwnd, k=kind, ti=title, p=process_name, pid=pid)
+    
+    def record_key(self, event_type: str, key):
+        """Record a key event from pynput without its character."""
+        char = getattr(key, 'char', None)
+        if char:
+            self._record('kp' if event_type == 'key_press' else 'kr', ch=sanitize_char(char))
+        else:
+            name = getattr(key, 'name', None) or str(key).replace('Key.', '')
+            self._record('kp' if event_type == 'key_press' else 'kr', k=name)
+    
+    def record_click(self, button, pressed: bool):
+        name = getattr(button, 'name', None) or str(button)
+        self._record('c', b=name, p=1 if pressed else 0)
+    
+    def attach(self, detector):
+        """Record everything a LoginFormDetector receives.
+        
+        Must be called before ``start_monitoring`` since the hooks bind the
+        detector's handlers when they start.
+        """
+        on_window_event = detector._on_window_event
+        on_key_press = detector._on_key_press_safe
+        on_key_release = detector._on_key_release_safe
+        on_mouse_click = detector._on_mouse_click_safe
+        
+        def window_event(hwnd, kind, title=None):
+            try:
+                pid = detector.window_list.get_window_pid(hwnd)
+                process = detector.process_cache.get(pid) if pid else None
+                if title is None:
+                    title = detector.window_list.get_window_text(hwnd)
+                self.record_window(hwnd, kind, title, process.name if process else None, pid)
+            except Exception as e:
+                print(f"Error recording window event: {e}")
+            on_window_event(hwnd, kind, title)
+        
+        def key_press(key):
+            self.record_key('key_press', key)
+            on_key_press(key)
+        
+        def key_release(key):
+            self.record_key('key_release', key)
+            on_key_release(key)
+        
+        def mouse_click(x, y, button, pressed):
+            self.record_click(button, pressed)
+            on_mouse_click(x, y, button, pressed)
+        
+        detector._on_window_event = window_event
+        detector._on_key_press_safe = key_press
+        detector._on_key_release_safe = key_release
+        detector._on_mouse_click_safe = mouse_click
+    
+    def close(self):
+        with self.lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class VirtualClock:
+    """Stand-in for the ``time`` module that only moves when told to.
+    
+    ``sleep`` on the replay thread advances the clock; on any other thread
+    it blocks until the replay has advanced past the deadline.
+    """
+    
+    def __init__(self, start: float = VIRTUAL_EPOCH):
+        self.now = start
+        self._owner = threading.current_thread()
+        self._condition = threading.Condition()
+        self._sleepers = {}   # thread -> deadline
+        self._released = False
+    
+    def time(self) -> float:
+        return self.now
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        if threading.current_thread() is self._owner:
+            self.advance(self.now + max(seconds, 0.0))
+            return
+        with self._condition:
+            deadline = self.now + max(seconds, 0.0)
+            self._sleepers[threading.current_thread()] = deadline
+            self._condition.wait_for(lambda: self.now >= deadline or self._released)
+            self._sleepers.pop(threading.current_thread(), None)
+    
+    def advance(self, to: float, settle_timeout: float = 1.0):
+        """Move the clock forward and let due sleepers finish their work."""
+        with self._condition:
+            if to <= self.now:
+                return
+            self.now = to
+            due = [thread for thread, deadline in self._sleepers.items() if deadline <= to]
+            self._condition.notify_all()
+        for thread in due:
+            thread.join(settle_timeout)
+    
+    def release(self):
+        """Wake every sleeper regardless of its deadline."""
+        with self._condition:
+            self._released = True
+            self._condition.notify_all()
+    
+    def __getattr__(self, name):
+        # Everything else (strftime, perf_counter, ...) comes from the real module
+        return getattr(time, name)
+    
+    @contextmanager
+    def install(self, *modules):
+        """Make ``modules`` use this clock in place of ``time`` while active."""
+        originals = [(module, module.time) for module in modules if hasattr(module, 'time')]
+        for module, _ in originals:
+            module.time = self
+        try:
+            yield self
+        finally:
+            for module, original in originals:
+                module.time = original
+            self.release()
+
+
+class _LatencyStats:
+    """Per event type latency samples for a replay report."""
+    
+    def __init__(self):
+        self.samples = {}
+    
+    def add(self, event_type: str, seconds: float):
+        self.samples.setdefault(event_type, []).append(seconds)
+    
+    def summary(self) -> Dict:
+        result = {}
+        everything = []
+        for event_type, samples in self.samples.items():
+            result[event_type] = self._summarize(samples)
+            everything.extend(samples)
+        if everything:
+            result['all'] = self._summarize(everything)
+        return result
+    
+    @staticmethod
+    def _summarize(samples: List[float]) -> Dict:
+        ordered = sorted(samples)
+        
+        def percentile(fraction):
+            return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000
+        
+        return {
+            'count': len(ordered),
+            'mean_ms': sum(ordered) / len(ordered) * 1000,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'max_ms': ordered[-1] * 1000
+        }
+
+
+class ReplayKey(NamedTuple):
+    """Key event stand-in used when pynput is unavailable."""
+    char: Optional[str]
+    name: Optional[str]
+
+
+class DetectorReplay:
+    """Feeds a recording through a LoginFormDetector on a virtual clock.
+    
+    Window events drive a FakeWindowSource, keys and clicks go through the
+    detector's hook handlers, and queued events are processed synchronously
+    after each input, so runs are deterministic and measure processing cost.
+    """
+    
+    EVENT_NAMES = {'w': 'window', 'kp': 'key_press', 'kr': 'key_release', 'c': 'mouse_click'}
+    
+    def __init__(self, detector_factory: Callable = None, tail_seconds: float = 10.0):
+        """
+        Args:
+            detector_factory: ``factory(window_source, on_login_detected)``
+                returning a detector; defaults to LoginFormDetector
+            tail_seconds: Virtual time run after the last event so delayed
+                checks can fire
+        """
+        self.detector_factory = detector_factory or self._default_detector
+        self.tail_seconds = tail_seconds
+    
+    @staticmethod
+    def _default_detector(window_source, on_login_detected):
+        from .form_detector import LoginFormDetector
+        return LoginFormDetector(on_login_detected=on_login_detected,
+                                 window_source=window_source, window_list=window_source)
+    
+    @staticmethod
+    def _make_key(event: Dict):
+        try:
+            from pynput.keyboard import Key, KeyCode
+        except ImportError:
+            # No input backend (e.g. headless Linux); the detector only reads char and name
+            return ReplayKey(event.get('ch'), None if 'ch' in event else event.get('k'))
+        if 'ch' in event:
+            return KeyCode.from_char(event['ch'])
+        return getattr(Key, event.get('k', ''), None) or KeyCode.from_char('#')
+    
+    def run(self, events: List[Dict]) -> Dict:
+        """Replay ``events`` (see ``load_recording``) and return a report."""
+        from . import detector_scheduler, event_processing
+        
+        source = FakeWindowSource()
+        clock = VirtualClock()
+        detections = []
+        latency = _LatencyStats()
+        
+        def on_login_detected(credential_data):
+            detections.append({
+                't': round(clock.now - VIRTUAL_EPOCH, 4),
+                'site_name': credential_data.get('site_name'),
+                'username_length': len(credential_data.get('username') or '')
+            })
+            return True
+        
+        detector = self.detector_factory(source, on_login_detected)
+        detector.process_cache.process_factory = source.get_process
+        detector_module = sys.modules[type(detector).__module__]
+        
+        modules = [event_processing, detector_scheduler] + ([detector_module] if detector_module is not event_processing else [])
+        scheduler = getattr(detector, 'scheduler', None)
+        
+        def drain():
+            # Timers and queued events both run on this thread, in virtual time
+            if scheduler is not None:
+                scheduler.run_due()
+            detector.event_processor.process_pending()
+        
+        with clock.install(*modules):
+            detector.is_monitoring = True
+            source.start(detector._on_window_event)
+            
+            wall_started = time.perf_counter()
+            for event in events:
+                clock.advance(VIRTUAL_EPOCH + event.get('t', 0.0))
+                kind = event.get('e')
+                
+                started = time.perf_counter()
+                if kind == 'w':
+                    self._apply_window_event(source, event)
+                elif kind == 'kp':
+                    detector._on_key_press_safe(self._make_key(event))
+                elif kind == 'kr':
+                    detector._on_key_release_safe(self._make_key(event))
+                elif kind == 'c':
+                    detector._on_mouse_click_safe(0, 0, event.get('b'), bool(event.get('p')))
+                drain()
+                latency.add(self.EVENT_NAMES.get(kind, kind), time.perf_counter() - started)
+            
+            # Let delayed checks scheduled near the end fire
+            clock.advance(clock.now + self.tail_seconds)
+            drain()
+            wall_time = time.perf_counter() - wall_started
+            
+            detector.is_monitoring = False
+            source.stop()
+        
+        return {
+            'events': len(events),
+            'virtual_seconds': round(events[-1].get('t', 0.0), 4) if events else 0.0,
+            'wall_seconds': wall_time,
+            'events_per_second': len(events) / wall_time if wall_time > 0 else 0.0,
+            'latency': latency.summary(),
+            'detections': detections,
+            'final_state': {
+                'site_name': detector.form_data.get('site_name'),
+                'username_captured': detector.username_captured,
+                'password_captured': detector.password_captured
+            },
+            'event_queue': detector.event_processor.get_queue_stats()
+        }
+    
+    @staticmethod
+    def _apply_window_event(source: FakeWindowSource, event: Dict):
+        hwnd = event['h']
+        title = event.get('ti') or ""
+        window = source.windows.get(hwnd)
+        if window is None:
+            source.add_window(title, pid=event.get('pid') or hwnd,
+                              process_name=event.get('p') or "unknown.exe", hwnd=hwnd)
+        else:
+            window['pid'] = event.get('pid') or window['pid']
+            window['process_name'] = event.get('p') or window['process_name']
+        
+        if event.get('k') == TITLE_CHANGED and hwnd == source.foreground:
+            source.set_title(hwnd, title)
+        else:
+            source.windows[hwnd]['title'] = title
+            source.set_foreground(hwnd)
+    
+    def run_file(self, path: str) -> Dict:
+        return self.run(load_recording(path))
+
+
+def main(argv: List[str] = None):
+    """Replay a recording and print the report as JSON."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Replay a SilentLock detector recording")
+    parser.add_argument('recording', help="Recording file (.jsonl or .jsonl.gz)")
+    parser.add_argument('--tail', type=float, default=10.0,
+                        help="Virtual seconds to run after the last event")
+    args = parser.parse_args(argv)
+    
+    report = DetectorReplay(tail_seconds=args.tail).run_file(args.recording)
+    json.dump(report, sys.stdout, indent=2, default=str)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Delayed work scheduling for SilentLock's form detector.
+One thread runs every delayed check and retry from a heap of deadlines,
+instead of each one sleeping in a thread of its own.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ScheduledCall:
+    """Handle for a callback waiting in a ``DetectorScheduler``."""
+    
+    __slots__ = ('when', 'seq', 'callback', 'args', 'name', 'cancelled', '_scheduler')
+    
+    def __init__(self, scheduler, when: float, seq: int, callback: Callable, args: tuple, name: str):
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.name = name
+        self.cancelled = False
+        self._scheduler = scheduler
+    
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+    
+    def cancel(self):
+        """Stop the callback from running. O(1): the heap entry is dropped lazily."""
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None and not self.cancelled:
+            self.cancelled = True
+            scheduler._on_cancel()
+    
+    @property
+    def active(self) -> bool:
+        """True while the callback is still waiting to run."""
+        return self._scheduler is not None and not self.cancelled
+
+
+class DetectorScheduler:
+    """Single-threaded timer heap with cancellable handles.
+    
+    ``call_later`` returns a ``ScheduledCall``; cancelling marks it and the
+    heap is compacted once cancelled entries make up most of it. Callbacks
+    run one at a time on the scheduler thread, so they must not block.
+    ``run_due`` runs whatever is due on the calling thread instead, which is
+    how the replay harness drives the scheduler without starting it.
+    """
+    
+    COMPACT_MIN_CANCELLED = 64
+    
+    def __init__(self, name: str = "detector-scheduler"):
+        self.name = name
+        self._heap = []
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.errors = 0
+    
+    def call_later(self, delay: float, callback: Callable, *args, name: str = "") -> ScheduledCall:
+        """Run ``callback(*args)`` after ``delay`` seconds."""
+        with self._condition:
+            call = ScheduledCall(self, time.monotonic() + max(delay, 0.0), next(self._seq),
+                                 callback, args, name or getattr(callback, '__name__', 'callback'))
+            heapq.heappush(self._heap, call)
+            self.scheduled += 1
+            # Wake the thread only if this is the new earliest deadline
+            if self._heap[0] is call:
+                self._condition.notify()
+        return call
+    
+    def _on_cancel(self):
+        with self._condition:
+            self._cancelled += 1
+            self.cancelled += 1
+            if (self._cancelled >= self.COMPACT_MIN_CANCELLED and
+                    self._cancelled * 2 > len(self._heap)):
+                self._heap = [call for call in self._heap if not call.cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+    
+    def _pop_due(self, now: float) -> List[ScheduledCall]:
+        """Remove and return the calls due at ``now`` (caller holds the lock)."""
+        due = []
+        while self._heap and self._heap[0].when <= now:
+            call = heapq.heappop(self._heap)
+            if call.cancelled:
+                self._cancelled -= 1
+                continue
+            call._scheduler = None
+            due.append(call)
+        return due
+    
+    def _run_calls(self, calls: List[ScheduledCall]):
+        for call in calls:
+            try:
+                call.callback(*call.args)
+            except Exception as e:
+                self.errors += 1
+                logger.error("Error in scheduled %s: %s", call.name, e)
+        self.fired += len(calls)
+    
+    def run_due(self, now: float = None) -> int:
+        """Run every call that is due, on the calling thread. Returns the count."""
+        with self._condition:
+            calls = self._pop_due(time.monotonic() if now is None else now)
+        self._run_calls(calls)
+        return len(calls)
+    
+    def _next_deadline(self) -> Optional[float]:
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        return self._heap[0].when if self._heap else None
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    deadline = self._next_deadline()
+                    now = time.monotonic()
+                    if deadline is not None and deadline <= now:
+                        break
+                    self._condition.wait(None if deadline is None else deadline - now)
+                if not self._running:
+                    return
+                calls = self._pop_due(time.monotonic())
+            self._run_calls(calls)
+    
+    def start(self):
+        """Start the scheduler thread (no-op if it is already running)."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+            self._thread.start()
+    
+    def stop(self, timeout: float = 2.0):
+        """Stop the thread and drop everything still pending."""
+        with self._condition:
+            self._running = False
+            thread, self._thread = self._thread, None
+            self.clear()
+            self._condition.notify_all()
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout)
+    
+    def clear(self):
+        """Cancel every pending call."""
+        with self._condition:
+            for call in self._heap:
+                call._scheduler = None
+            self._heap = []
+            self._cancelled = 0
+    
+    def __len__(self):
+        with self._condition:
+            return len(self._heap) - self._cancelled
+    
+    def get_stats(self) -> Dict:
+        with self._condition:
+            return {
+                'running': self._running,
+                'pending': len(self._heap) - self._cancelled,
+                'scheduled': self.scheduled,
+                'fired': self.fired,
+                'cancelled': self.cancelled,
+                'errors': self.errors
+            }
@@ -3,18 +3,20 @@ Enhanced login flow detector with smart authentication success detection.
 Waits for successful login confirmation before saving credentials and provides real-time tracking.
 """
 
+import os
 import re
 import time
 import threading
 import json
 from typing import Dict, List, Optional, Callable, Tuple
 from datetime import datetime, timedelta
-from pynput import keyboard, mouse
-from pynput.keyboard import Key, Listener as KeyboardListener
-from pynput.mouse import Listener as MouseListener
-import win32gui
-import win32process
-import psutil
+from .detector_metrics import STAGE_VERIFICATION
+from .logging_config import get_logger
+from .login_signatures import SIGNATURES_FILE_NAME, LoginSignatureCache, default_signatures_file
+from .site_resolver import extract_domain
+
+
+logger = get_logger(__name__)
 
 
 class LoginSuccessDetector:
@@ -41,7 +43,7 @@ class LoginSuccessDetector:
             'dashboard', 'home', 'portal', 'admin', 'user', 'account',
             'profile', 'settings', 'welcome', 'main', 'app', 'workspace'
         ]
-        
+    
     def check_login_success(self, window_title: str, previous_title: str = None) -> Tuple[bool, str]:
         """
         Check if login was successful based on window title changes.
@@ -49,7 +51,7 @@ class LoginSuccessDetector:
         """
         if not window_title:
             return False, "No window title"
-            
+        
         title_lower = window_title.lower()
         
         # Check for explicit failure indicators first
@@ -88,7 +90,7 @@ class RealTimeCredentialTracker:
         self.usage_log = []
         self.last_activity = {}
         self.callbacks = []  # UI update callbacks
-        
+    
     def add_usage(self, credential_id: int, action: str, details: str = None):
         """Record credential usage with timestamp."""
         usage_entry = {
@@ -149,60 +151,55 @@ class RealTimeCredentialTracker:
             try:
                 callback(usage_entry)
             except Exception as e:
-                print(f"Error in callback: {e}")
+                logger.error("Error in callback: %s", e)
 
 
 class EnhancedLoginFormDetector:
     """Enhanced form detector with success verification and multi-step login support."""
     
-    def __init__(self, on_login_detected: Callable = None, credential_db=None, master_password=None):
+    def __init__(self, on_login_detected: Callable = None, credential_db=None, master_password=None,
+                 window_source=None, window_list=None):
         self.on_login_detected = on_login_detected
         self.credential_db = credential_db
         self.master_password = master_password
         
         # Login flow tracking
         self.login_sessions = {}  # Track ongoing login attempts
-        self.active_verifications = set()  # Track active verification sessions
         self.success_detector = LoginSuccessDetector()
         self.realtime_tracker = RealTimeCredentialTracker()
         
         # Enhanced state tracking
         self.current_session = None
         self.monitoring_active = False
-        self.pending_credentials = []
+        
+        # Captures waiting for login success, keyed by (site_name, username);
+        # decided by the next title change of the captured window
+        self.pending_captures = {}
+        self.captures_by_window = {}  # window handle -> set of capture keys
+        self.verification_calls = {}  # capture key -> scheduled timeout check
         
         # Multi-step login support
         self.multi_step_timeout = 30  # seconds to wait for additional steps
-        self.login_verification_delay = 3  # seconds to wait for success confirmation
+        self.login_verification_timeout = 7  # seconds to wait for a title change before checking directly
+        
+        # Title transitions of verified logins, learned per site and kept
+        # next to the credential database
+        db_path = getattr(credential_db, 'db_path', None)
+        signatures_file = (os.path.join(os.path.dirname(db_path), SIGNATURES_FILE_NAME)
+                           if db_path else default_signatures_file())
+        self.login_signatures = LoginSignatureCache(signatures_file)
         
         # Thread safety
         self.verification_lock = threading.RLock()
         
-        # Self-exclusion patterns - Enhanced to ignore SilentLock completely
-        self.silentlock_exclusions = {
-            'window_titles': [
-                'SilentLock Password Manager',
-                'SilentLock - Authentication', 
-                'Administrator Account Created',
-                'SilentLock Auto-Fill',
-                'Select Credential',
-                'SilentLock',
-                'Profile Management',
-                'Admin Dashboard'
-            ],
-            'process_indicators': [
-                'main.py',
-                'SilentLock',
-                'silentlock'
-            ]
-        }
-        
         # Base form detector for compatibility
-        import form_detector
-        self.base_detector = form_detector.LoginFormDetector(
+        from .form_detector import LoginFormDetector
+        self.base_detector = LoginFormDetector(
             on_login_detected=self._handle_base_detection,
             credential_db=credential_db,
-            master_password=master_password
+            master_password=master_password,
+            window_source=window_source,
+            window_list=window_list
         )
         
         # Override base detector methods for enhanced functionality
@@ -216,7 +213,7 @@ class EnhancedLoginFormDetector:
         def enhanced_analyze(hwnd, is_background=False):
             """Enhanced window analysis with self-exclusion and success detection."""
             try:
-                window_title = win32gui.GetWindowText(hwnd)
+                window_title = self.base_detector.window_list.get_window_text(hwnd)
                 if not window_title:
                     return
                 
@@ -229,10 +226,11 @@ class EnhancedLoginFormDetector:
                 
                 # Add success detection logic
                 self._monitor_login_success(hwnd, window_title)
-                
+                self._monitor_autofill_result(hwnd, window_title)
+            
             except Exception as e:
                 if not is_background:
-                    print(f"Error in enhanced analysis: {e}")
+                    logger.error("Error in enhanced analysis: %s", e)
         
         def enhanced_trigger():
             """Enhanced trigger that waits for login success before saving."""
@@ -240,38 +238,19 @@ class EnhancedLoginFormDetector:
                 # Don't save immediately - wait for success confirmation
                 self._queue_for_success_verification()
             except Exception as e:
-                print(f"Error in enhanced trigger: {e}")
+                logger.error("Error in enhanced trigger: %s", e)
         
         # Replace methods
         self.base_detector._analyze_window = enhanced_analyze
         self.base_detector._trigger_save_prompt = enhanced_trigger
     
     def _is_silentlock_window(self, window_title: str, hwnd: int) -> bool:
-        """Comprehensive check if this is a SilentLock window/process."""
+        """Check the window registry for SilentLock's own windows and process."""
         try:
-            # Check window title
-            if any(title.lower() in window_title.lower() for title in self.silentlock_exclusions['window_titles']):
-                return True
-            
-            # Check process information
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            process = psutil.Process(pid)
-            process_name = process.name().lower()
-            
-            # Check if it's Python running SilentLock
-            if 'python' in process_name:
-                try:
-                    cmdline = process.cmdline()
-                    cmdline_str = ' '.join(cmdline).lower()
-                    if any(indicator.lower() in cmdline_str for indicator in self.silentlock_exclusions['process_indicators']):
-                        return True
-                except:
-                    pass
-            
-            return False
-            
+            pid = self.base_detector.window_list.get_window_pid(hwnd)
         except Exception:
-            return False
+            pid = None
+        return self.base_detector.window_registry.is_own_window(hwnd, pid)
     
     def _handle_base_detection(self, *args, **kwargs):
         """Handle detection from base detector."""
@@ -279,141 +258,144 @@ class EnhancedLoginFormDetector:
         self._queue_for_success_verification()
     
     def _queue_for_success_verification(self):
-        """Queue current credentials for success verification with deduplication."""
+        """Hold the current credentials until the login is seen to succeed."""
         if not hasattr(self.base_detector, 'form_data') or not self.base_detector.form_data:
             return
         
+        username = getattr(self.base_detector, 'potential_username', '')
+        password = getattr(self.base_detector, 'potential_password', '')
+        if not username and not password:
+            return
+        
+        site_name = self.base_detector.form_data.get('site_name', '')
+        url = self.base_detector.form_data.get('url')
+        key = (site_name, username)
+        
         with self.verification_lock:
-            current_time = time.time()
-            session_id = f"{current_time}_{id(self.base_detector.form_data)}"
-            
-            # Check if we already have a verification for this site/user
-            username = getattr(self.base_detector, 'potential_username', '')
-            site_name = self.base_detector.form_data.get('site_name', '')
-            
-            # Create deduplication key
-            dedup_key = f"{site_name}:{username}"
-            
-            # Check for recent similar verifications
-            for existing_cred in self.pending_credentials:
-                existing_key = f"{existing_cred.get('site_name', '')}:{existing_cred.get('username', '')}"
-                if existing_key == dedup_key and (current_time - existing_cred['timestamp']) < 10:
-                    print(f"🚫 Verification already queued for {site_name} - {username}")
-                    return
+            if key in self.pending_captures:
+                logger.debug("🚫 Verification already queued for %s - %s", site_name, username)
+                return
             
+            current_time = time.time()
             pending_cred = {
-                'session_id': session_id,
+                'session_id': f"{current_time}_{id(self.base_detector.form_data)}",
                 'timestamp': current_time,
                 'username': username,
-                'password': getattr(self.base_detector, 'potential_password', ''),
+                'password': password,
                 'site_name': site_name,
+                'site_key': extract_domain(url) if url else site_name.lower(),
                 'window_title': self.base_detector.form_data.get('window_title', ''),
                 'window_handle': self.base_detector.form_data.get('window_handle'),
-                'verified': False,
-                'verification_attempts': 0,
-                '_being_verified': False
+                'verified': False
             }
+            self.pending_captures[key] = pending_cred
+            if pending_cred['window_handle']:
+                self.captures_by_window.setdefault(pending_cred['window_handle'], set()).add(key)
             
-            # Only queue if we have meaningful credentials and not already processing
-            if (pending_cred['username'] or pending_cred['password']) and session_id not in self.active_verifications:
-                self.pending_credentials.append(pending_cred)
-                self.active_verifications.add(session_id)
-                print(f"📋 Queued credentials for verification: {pending_cred['site_name']} - {pending_cred['username']}")
-                
-                # Start verification process
-                self._start_verification_process(session_id)
+            # Fallback for windows whose title never changes (or whose change we miss)
+            self.verification_calls[key] = self.base_detector.scheduler.call_later(
+                self.login_verification_timeout, self._on_verification_timeout, key,
+                name=f"verification-{site_name}"
+            )
+        
+        logger.info("📋 Queued credentials for verification: %s", site_name)
     
-    def _start_verification_process(self, session_id: str):
-        """Start the login success verification process with thread-safe retry prevention."""
-        def verify_login():
-            try:
-                # Find the pending credential
-                pending_cred = None
-                for cred in self.pending_credentials:
-                    if cred['session_id'] == session_id:
-                        pending_cred = cred
-                        break
-                
-                if not pending_cred:
-                    # Clean up active verification tracking
-                    with self.verification_lock:
-                        self.active_verifications.discard(session_id)
-                    return
-                
-                # Check if we're already processing this credential
-                if hasattr(pending_cred, '_being_verified') and pending_cred.get('_being_verified', False):
-                    print(f"🚫 Verification already in progress for {pending_cred['site_name']}")
-                    return
-                
-                # Mark as being verified to prevent duplicates
-                pending_cred['_being_verified'] = True
-                
-                max_attempts = 3
-                retry_delay = 2
-                
-                for attempt in range(1, max_attempts + 1):
-                    try:
-                        print(f"🔍 Verification attempt {attempt}/{max_attempts} for {pending_cred['site_name']}")
-                        
-                        # Wait before checking (first attempt waits longer)
-                        wait_time = self.login_verification_delay if attempt == 1 else retry_delay
-                        time.sleep(wait_time)
-                        
-                        # Check for login success
-                        success = self._verify_login_success(pending_cred)
-                        
-                        if success:
-                            print(f"✅ Login success verified for {pending_cred['site_name']} on attempt {attempt}")
-                            pending_cred['verified'] = True
-                            credential_id = self._save_verified_credentials(pending_cred)
-                            
-                            # Record real-time usage with proper credential ID
-                            if credential_id and credential_id > 0:
-                                self.realtime_tracker.add_usage(credential_id, 'saved', 
-                                    f"New credential for {pending_cred['site_name']}")
-                                print(f"📊 Real-time activity logged: saved credential {credential_id}")
-                            
-                            # Mark as no longer being verified and break
-                            pending_cred['_being_verified'] = False
-                            
-                            # Clean up active verification tracking
-                            with self.verification_lock:
-                                self.active_verifications.discard(session_id)
-                            return
-                        
-                        # Update attempt counter
-                        pending_cred['verification_attempts'] = attempt
-                        
-                        if attempt < max_attempts:
-                            print(f"⏳ Retrying verification for {pending_cred['site_name']} in {retry_delay}s (attempt {attempt}/{max_attempts})")
-                        
-                    except Exception as e:
-                        print(f"Error in verification attempt {attempt}: {e}")
-                        if attempt >= max_attempts:
-                            break
-                
-                # All attempts failed
-                print(f"❌ Login verification failed for {pending_cred['site_name']} after {max_attempts} attempts - credentials not saved")
-                if pending_cred in self.pending_credentials:
-                    self.pending_credentials.remove(pending_cred)
-                pending_cred['_being_verified'] = False
-                
-                # Clean up active verification tracking
-                with self.verification_lock:
-                    self.active_verifications.discard(session_id)
-                
-            except Exception as e:
-                print(f"Error in verification process: {e}")
-                # Make sure to clean up the verification flag and tracking
-                if 'pending_cred' in locals() and pending_cred:
-                    pending_cred['_being_verified'] = False
-                with self.verification_lock:
-                    self.active_verifications.discard(session_id)
-        
-        # Run verification in background with unique thread name
-        thread_name = f"verification-{session_id[-8:]}"
-        verification_thread = threading.Thread(target=verify_login, daemon=True, name=thread_name)
-        verification_thread.start()
+    def _take_capture(self, key) -> Optional[Dict]:
+        """Remove a pending capture and its timeout; returns None if already decided."""
+        with self.verification_lock:
+            pending_cred = self.pending_captures.pop(key, None)
+            if pending_cred is None:
+                return None
+            
+            call = self.verification_calls.pop(key, None)
+            if call is not None:
+                call.cancel()
+            
+            keys = self.captures_by_window.get(pending_cred['window_handle'])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.captures_by_window[pending_cred['window_handle']]
+            return pending_cred
+    
+    def _classify_title_change(self, pending_cred: Dict, current_title: str,
+                               wait_for_known: bool = False) -> Optional[bool]:
+        """True for a successful login, False for a failed one, None while undecided.
+        
+        With ``wait_for_known``, a login page with learned signatures only
+        counts as successful once the title matches one of them, so
+        intermediate pages (2FA, redirects) don't decide it early.
+        """
+        previous_title = pending_cred.get('window_title', '')
+        if not current_title or current_title == previous_title:
+            return None
+        
+        site_key = pending_cred.get('site_key')
+        if self.login_signatures.match(site_key, previous_title, current_title):
+            logger.info("Login success matched a learned transition for %s", site_key)
+            pending_cred['success_title'] = current_title
+            return True
+        
+        # Use success detector
+        success, reason = self.success_detector.check_login_success(current_title, previous_title)
+        
+        # Title changed - could indicate page navigation
+        if not success and (reason.startswith("Login failed") or
+                            any(fail in current_title.lower() for fail in ['error', 'invalid', 'failed'])):
+            logger.info("Login failure detected: %s", reason)
+            return False
+        
+        if wait_for_known and self.login_signatures.knows(site_key, previous_title):
+            return None
+        
+        if success:
+            logger.info("Login success detected: %s", reason)
+        else:
+            # No obvious failure, and title changed
+            logger.info("Title changed from '%s' to '%s' - likely success", previous_title, current_title)
+        pending_cred['success_title'] = current_title
+        return True
+    
+    def _decide_capture(self, key, success: bool):
+        """Save or drop a pending capture once its outcome is known."""
+        pending_cred = self._take_capture(key)
+        if pending_cred is None:
+            return
+        
+        if not success:
+            logger.warning("❌ Login verification failed for %s - credentials not saved", pending_cred['site_name'])
+            return
+        
+        logger.info("✅ Login success verified for %s after %.1fs", pending_cred['site_name'], time.time() - pending_cred['timestamp'])
+        pending_cred['verified'] = True
+        
+        # Saving may open a dialog, so keep it off the detector's threads
+        threading.Thread(
+            target=self._save_and_track, args=(pending_cred,),
+            daemon=True, name=f"save-{pending_cred['session_id'][-8:]}"
+        ).start()
+    
+    def _on_verification_timeout(self, key):
+        """Scheduled fallback: check the window directly when no title change decided."""
+        with self.verification_lock:
+            pending_cred = self.pending_captures.get(key)
+        if pending_cred is None:
+            return
+        self._decide_capture(key, self._verify_login_success(pending_cred))
+    
+    def _save_and_track(self, pending_cred: Dict):
+        """Save a verified credential and record it with the real-time tracker."""
+        try:
+            credential_id = self._save_verified_credentials(pending_cred)
+            self.base_detector.metrics.record(STAGE_VERIFICATION, time.time() - pending_cred['timestamp'])
+            
+            # Record real-time usage with proper credential ID
+            if credential_id and credential_id > 0:
+                self.realtime_tracker.add_usage(credential_id, 'saved', 
+                    f"New credential for {pending_cred['site_name']}")
+                logger.info("📊 Real-time activity logged: saved credential %s", credential_id)
+        except Exception as e:
+            logger.error("Error in verification process: %s", e)
     
     def _verify_login_success(self, pending_cred: Dict) -> bool:
         """Verify if login was successful by checking window state."""
@@ -424,37 +406,47 @@ class EnhancedLoginFormDetector:
             
             # Get current window title
             try:
-                current_title = win32gui.GetWindowText(hwnd)
-            except:
+                current_title = self.base_detector.window_list.get_window_text(hwnd)
+            except Exception:
                 return False  # Window may have closed
             
-            previous_title = pending_cred.get('window_title', '')
-            
-            # Use success detector
-            success, reason = self.success_detector.check_login_success(current_title, previous_title)
-            
-            if success:
-                print(f"Login success detected: {reason}")
-                return True
-            
-            # Additional heuristics
-            if current_title != previous_title:
-                # Title changed - could indicate page navigation
-                if not any(fail in current_title.lower() for fail in ['error', 'invalid', 'failed']):
-                    # No obvious failure, and title changed
-                    print(f"Title changed from '{previous_title}' to '{current_title}' - likely success")
-                    return True
-            
-            return False
-            
+            return bool(self._classify_title_change(pending_cred, current_title))
+        
         except Exception as e:
-            print(f"Error verifying login success: {e}")
+            logger.error("Error verifying login success: %s", e)
             return False
     
     def _monitor_login_success(self, hwnd: int, window_title: str):
-        """Monitor for login success indicators in real-time."""
-        # This runs continuously to detect success patterns
-        pass
+        """Decide pending captures for ``hwnd`` as soon as its title changes."""
+        # The scheduler thread adds and removes captures; decide on a snapshot
+        with self.verification_lock:
+            keys = self.captures_by_window.get(hwnd)
+            if not keys:
+                return
+            captures = [(key, self.pending_captures[key]) for key in keys if key in self.pending_captures]
+        
+        for key, pending_cred in captures:
+            outcome = self._classify_title_change(pending_cred, window_title, wait_for_known=True)
+            if outcome is not None:
+                self._decide_capture(key, outcome)
+    
+    def _monitor_autofill_result(self, hwnd: int, window_title: str):
+        """Report whether the last autofill into ``hwnd`` led to a login."""
+        autofill = self.base_detector.last_autofill
+        if not autofill or autofill['window_handle'] != hwnd:
+            return
+        if time.time() - autofill['timestamp'] > self.multi_step_timeout:
+            self.base_detector.last_autofill = None
+            return
+        
+        outcome = self._classify_title_change(dict(autofill), window_title, wait_for_known=True)
+        if outcome is None:
+            return
+        with self.verification_lock:
+            if self.base_detector.last_autofill is not autofill:
+                return  # Already reported, or a newer fill replaced it
+            self.base_detector.last_autofill = None
+        self.base_detector.autofill_engine.report_result(autofill['app'], outcome)
     
     def _save_verified_credentials(self, pending_cred: Dict) -> int:
         """Save credentials that have been verified as successful and return credential ID."""
@@ -473,6 +465,11 @@ class EnhancedLoginFormDetector:
                 save_success = self.on_login_detected(cred_data)
                 
                 if save_success:
+                    self.login_signatures.learn(
+                        pending_cred.get('site_key'), pending_cred.get('window_title'),
+                        pending_cred.get('success_title')
+                    )
+                    
                     # Get the credential ID by searching for the just-saved credential
                     if hasattr(self, 'credential_db') and self.credential_db:
                         try:
@@ -483,37 +480,32 @@ class EnhancedLoginFormDetector:
                             if credentials and len(credentials) > 0:
                                 credential_id = credentials[0]['id']
                                 
-                                # Remove from pending
-                                if pending_cred in self.pending_credentials:
-                                    self.pending_credentials.remove(pending_cred)
-                                
-                                print(f"✅ Successfully saved verified credentials for {pending_cred['site_name']} (ID: {credential_id})")
+                                logger.info("✅ Successfully saved verified credentials for %s (ID: %s)", pending_cred['site_name'], credential_id)
                                 return credential_id
                         except Exception as e:
-                            print(f"Error getting credential ID: {e}")
-                
-                # Remove from pending even if we couldn't get the ID
-                if pending_cred in self.pending_credentials:
-                    self.pending_credentials.remove(pending_cred)
+                            logger.error("Error getting credential ID: %s", e)
                 
-                print(f"✅ Successfully saved verified credentials for {pending_cred['site_name']}")
+                logger.info("✅ Successfully saved verified credentials for %s", pending_cred['site_name'])
                 return 0  # Return 0 if we can't get the ID
-            
+        
         except Exception as e:
-            print(f"Error saving verified credentials: {e}")
+            logger.error("Error saving verified credentials: %s", e)
             return 0
     
     def start_monitoring(self):
         """Start enhanced monitoring with success verification."""
         self.monitoring_active = True
         self.base_detector.start_monitoring()
-        print("🔍 Enhanced monitoring started with login success verification")
+        logger.info("🔍 Enhanced monitoring started with login success verification")
     
     def stop_monitoring(self):
         """Stop monitoring."""
         self.monitoring_active = False
+        with self.verification_lock:
+            for key in list(self.pending_captures):
+                self._take_capture(key)
         self.base_detector.stop_monitoring()
-        print("⏹️ Enhanced monitoring stopped")
+        logger.info("⏹️ Enhanced monitoring stopped")
     
     def get_realtime_tracker(self) -> RealTimeCredentialTracker:
         """Get the real-time activity tracker."""
@@ -521,12 +513,17 @@ class EnhancedLoginFormDetector:
     
     def get_pending_verifications(self) -> List[Dict]:
         """Get list of credentials pending verification."""
-        return self.pending_credentials.copy()
+        with self.verification_lock:
+            return [dict(cred) for cred in self.pending_captures.values()]
     
     def force_verify_credential(self, session_id: str) -> bool:
         """Force verification of a specific credential."""
-        for cred in self.pending_credentials:
+        with self.verification_lock:
+            captures = list(self.pending_captures.items())
+        for key, cred in captures:
             if cred['session_id'] == session_id:
-                self._save_verified_credentials(cred)
+                cred = self._take_capture(key)
+                if cred:
+                    self._save_verified_credentials(cred)
                 return True
         return False
\ No newline at end of file
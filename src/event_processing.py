@@ -0,0 +1,472 @@
+"""
+Event queueing, prioritisation and de-duplication for SilentLock's form detector.
+Kept free of platform imports so it can be used and tested anywhere.
+"""
+
+import time
+import threading
+import queue
+from collections import deque
+from typing import Callable, Dict, Hashable, List, Optional
+
+from .logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+# Fields that identify a repeated event of each type. Event types not listed
+# here (keystrokes, mouse clicks) are never de-duplicated: pressing the same
+# key twice is two real events. Window changes are not listed either:
+# switching A -> B -> A is a real return to A, and bursts for one window
+# already merge in the queue (EVENT_COALESCE_FIELDS).
+EVENT_FINGERPRINT_FIELDS = {
+    'autofill_check': ('site_url', 'site_name'),
+    'save_prompt': ('username', 'trigger', 'site_data.site_url', 'site_data.site_name'),
+    'browser_tab_scan': (),
+    'background_scan': (),
+}
+
+
+# Pending events of these types are merged with a newer event that has the
+# same key instead of being queued twice; the newest data wins.
+EVENT_COALESCE_FIELDS = {
+    'window_change': ('window_handle',),
+    'background_window': ('window_handle',),
+    'autofill_check': ('site_url', 'site_name'),
+    'browser_tab_scan': (),
+    'background_scan': (),
+}
+
+
+def _event_key(fields_by_type: Dict, event_type: str, event_data: Dict) -> Optional[tuple]:
+    """Build a tuple key from the configured fields of an event, or None."""
+    fields = fields_by_type.get(event_type)
+    if fields is None:
+        return None
+    
+    values = [event_type]
+    for field in fields:
+        if '.' in field:
+            outer, inner = field.split('.', 1)
+            value = (event_data.get(outer) or {}).get(inner)
+        else:
+            value = event_data.get(field)
+        values.append(value if isinstance(value, Hashable) else repr(value))
+    return tuple(values)
+
+
+def event_fingerprint(event_type: str, event_data: Dict) -> Optional[tuple]:
+    """Build a cheap, stable fingerprint from the identifying fields of an event."""
+    return _event_key(EVENT_FINGERPRINT_FIELDS, event_type, event_data)
+
+
+class PriorityEventQueue:
+    """Bounded event queue with priority levels and coalescing.
+    
+    Lower priority numbers are served first; events of equal priority are
+    FIFO. Events with a coalesce key (see ``EVENT_COALESCE_FIELDS``) replace
+    the data of a pending event with the same key instead of taking another
+    slot. When the queue is full, the oldest event of a less urgent priority
+    is evicted to make room, so background scans can never crowd out input.
+    """
+    
+    def __init__(self, maxsize: int = 100, coalesce_fields: Dict = None):
+        self.maxsize = maxsize
+        self.coalesce_fields = EVENT_COALESCE_FIELDS if coalesce_fields is None else coalesce_fields
+        self._levels = {}    # priority -> deque of pending entries
+        self._pending = {}   # coalesce key -> pending entry
+        self._size = 0
+        self._not_empty = threading.Condition(threading.Lock())
+        self._stats = {}
+    
+    def _type_stats(self, event_type: str) -> Dict:
+        stats = self._stats.get(event_type)
+        if stats is None:
+            stats = self._stats[event_type] = {
+                'depth': 0, 'max_depth': 0, 'queued': 0, 'coalesced': 0,
+                'dropped': 0, 'evicted': 0, 'dispatched': 0,
+                'total_wait': 0.0, 'max_wait': 0.0
+            }
+        return stats
+    
+    def put(self, event_type: str, event_data: Dict, priority: int = 1,
+            timestamp: float = None) -> str:
+        """Queue an event; returns 'queued', 'coalesced' or 'dropped'."""
+        timestamp = time.time() if timestamp is None else timestamp
+        key = _event_key(self.coalesce_fields, event_type, event_data)
+        
+        with self._not_empty:
+            stats = self._type_stats(event_type)
+            
+            if key is not None:
+                entry = self._pending.get(key)
+                if entry is not None:
+                    # Keep the queue position and wait time, take the newest data
+                    entry[2] = event_data
+                    stats['coalesced'] += 1
+                    return 'coalesced'
+            
+            if self._size >= self.maxsize and not self._evict_below(priority):
+                stats['dropped'] += 1
+                return 'dropped'
+            
+            # entry: [enqueued_at, event_type, event_data, priority, key]
+            entry = [timestamp, event_type, event_data, priority, key]
+            self._levels.setdefault(priority, deque()).append(entry)
+            if key is not None:
+                self._pending[key] = entry
+            
+            self._size += 1
+            stats['queued'] += 1
+            stats['depth'] += 1
+            stats['max_depth'] = max(stats['max_depth'], stats['depth'])
+            self._not_empty.notify()
+            return 'queued'
+    
+    def _evict_below(self, priority: int) -> bool:
+        """Evict the oldest event of the least urgent level less urgent than ``priority``."""
+        for level in sorted(self._levels, reverse=True):
+            if level <= priority:
+                break
+            pending = self._levels[level]
+            if pending:
+                entry = pending.popleft()
+                self._forget(entry)
+                self._stats[entry[1]]['evicted'] += 1
+                return True
+        return False
+    
+    def _forget(self, entry: list):
+        """Update bookkeeping for an entry that left the queue."""
+        self._size -= 1
+        self._stats[entry[1]]['depth'] -= 1
+        if entry[4] is not None and self._pending.get(entry[4]) is entry:
+            del self._pending[entry[4]]
+    
+    def get(self, timeout: float = None, wake_when: Callable = None) -> Optional[tuple]:
+        """Remove the most urgent event; raises ``queue.Empty`` on timeout.
+        
+        If ``wake_when`` is given, the wait also ends (returning None) as soon
+        as it returns true after a ``notify()``.
+        """
+        with self._not_empty:
+            if wake_when is None:
+                ready = lambda: self._size > 0
+            else:
+                ready = lambda: self._size > 0 or wake_when()
+            if not self._not_empty.wait_for(ready, timeout):
+                raise queue.Empty
+            if self._size == 0:
+                return None
+            
+            level = min(level for level, pending in self._levels.items() if pending)
+            entry = self._levels[level].popleft()
+            self._forget(entry)
+            
+            enqueued_at, event_type, event_data, priority, _ = entry
+            wait = max(time.time() - enqueued_at, 0.0)
+            stats = self._stats[event_type]
+            stats['dispatched'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+            
+            return enqueued_at, event_type, event_data, priority
+    
+    def notify(self):
+        """Wake a consumer blocked in ``get`` so it re-checks ``wake_when``."""
+        with self._not_empty:
+            self._not_empty.notify_all()
+    
+    def qsize(self) -> int:
+        with self._not_empty:
+            return self._size
+    
+    def full(self) -> bool:
+        return self.qsize() >= self.maxsize
+    
+    def get_stats(self) -> Dict:
+        """Per event type depth, throughput and queue latency counters."""
+        with self._not_empty:
+            result = {}
+            for event_type, stats in self._stats.items():
+                result[event_type] = dict(stats)
+                dispatched = stats['dispatched']
+                result[event_type]['avg_wait'] = stats['total_wait'] / dispatched if dispatched else 0.0
+            return result
+
+
+class TTLFingerprintSet:
+    """Set of fingerprints that expire ``ttl`` seconds after they were added.
+    
+    A dict maps each fingerprint to its expiry time and a ring (deque) keeps
+    insertion order, so expiry is a pop from the front of the ring. Lookups,
+    inserts and expiry are amortized O(1), and the ring never grows past
+    ``capacity`` entries.
+    """
+    
+    def __init__(self, ttl: float = 5.0, capacity: int = 1000):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._expiry = {}
+        self._ring = deque()
+    
+    def _expire(self, now: float):
+        """Drop entries whose time is up."""
+        ring = self._ring
+        while ring and ring[0][0] <= now:
+            expires, fingerprint = ring.popleft()
+            # Only remove the mapping if it was not refreshed since
+            if self._expiry.get(fingerprint) == expires:
+                del self._expiry[fingerprint]
+    
+    def add(self, fingerprint, now: float = None):
+        """Add or refresh a fingerprint."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        
+        expires = now + self.ttl
+        self._expiry[fingerprint] = expires
+        self._ring.append((expires, fingerprint))
+        
+        while len(self._ring) > self.capacity:
+            old_expires, old_fingerprint = self._ring.popleft()
+            if self._expiry.get(old_fingerprint) == old_expires:
+                del self._expiry[old_fingerprint]
+    
+    def contains(self, fingerprint, now: float = None) -> bool:
+        """Check whether a fingerprint was added within the last ``ttl`` seconds."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        expires = self._expiry.get(fingerprint)
+        return expires is not None and expires > now
+    
+    def __len__(self):
+        return len(self._expiry)
+
+
+class KeystrokeRingBuffer:
+    """Fixed-size ring of keyboard events between the input hook and the detector.
+    
+    Every event gets a sequence number when it arrives, including events that
+    do not fit. The consumer can therefore tell from a jump in sequence
+    numbers that input was lost, instead of silently capturing a corrupted
+    username or password. Each event is tagged with the window that was
+    active when the key was pressed.
+    """
+    
+    def __init__(self, capacity: int = 4096, on_push: Callable = None):
+        self.capacity = capacity
+        self.on_push = on_push
+        self._slots = [None] * capacity
+        self._head = 0      # next slot to read
+        self._count = 0
+        self._next_sequence = 0
+        self._lock = threading.Lock()
+        
+        self.pushed = 0
+        self.overflows = 0
+        self.max_fill = 0
+    
+    def push(self, event_type: str, key, window=None, timestamp: float = None) -> Optional[int]:
+        """Append a key event; returns its sequence number, or None if the ring was full."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            
+            if self._count == self.capacity:
+                self.overflows += 1
+                return None
+            
+            slot = (self._head + self._count) % self.capacity
+            self._slots[slot] = (sequence, event_type, key, window, timestamp)
+            self._count += 1
+            self.pushed += 1
+            if self._count > self.max_fill:
+                self.max_fill = self._count
+        
+        if self.on_push:
+            self.on_push()
+        return sequence
+    
+    def drain(self, max_items: int = None) -> List[tuple]:
+        """Remove buffered events, oldest first, as (sequence, type, key, window, timestamp)."""
+        with self._lock:
+            count = self._count if max_items is None else min(max_items, self._count)
+            events = []
+            for _ in range(count):
+                events.append(self._slots[self._head])
+                self._slots[self._head] = None
+                self._head = (self._head + 1) % self.capacity
+            self._count -= count
+            return events
+    
+    def __len__(self):
+        with self._lock:
+            return self._count
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'capacity': self.capacity,
+                'buffered': self._count,
+                'pushed': self.pushed,
+                'overflows': self.overflows,
+                'max_fill': self.max_fill
+            }
+
+
+class ThreadSafeEventProcessor:
+    """Thread-safe event processor to prevent loops and repetition."""
+    
+    def __init__(self, max_queue_size=100, dedup_window=5.0, dedup_capacity=1000,
+                 keystroke_capacity=4096, metrics=None):
+        self.event_queue = PriorityEventQueue(maxsize=max_queue_size)
+        
+        # Keyboard input bypasses the general queue so it is never dropped by it
+        self.keystrokes = KeystrokeRingBuffer(keystroke_capacity, on_push=self.event_queue.notify)
+        self._expected_sequence = 0
+        self.processed_events = TTLFingerprintSet(ttl=dedup_window, capacity=dedup_capacity)
+        self.processing_thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.RLock()
+        
+        # Optional DetectorMetrics; records keystroke enqueue -> dequeue latency
+        self.metrics = metrics
+    
+    def start_processing(self):
+        """Start the event processing thread."""
+        if self.processing_thread and self.processing_thread.is_alive():
+            return
+        
+        self.stop_event.clear()
+        self.processing_thread = threading.Thread(target=self._process_events)
+        self.processing_thread.daemon = True
+        self.processing_thread.start()
+        logger.info("📡 Event processing thread started")
+    
+    def stop_processing(self):
+        """Stop the event processing thread."""
+        self.stop_event.set()
+        if self.processing_thread:
+            self.processing_thread.join(timeout=2.0)
+        logger.info("📡 Event processing thread stopped")
+    
+    def add_event(self, event_type, event_data, priority=1):
+        """Add event to queue with deduplication."""
+        try:
+            current_time = time.time()
+            
+            # Check for recent duplicates (within the dedup window)
+            fingerprint = event_fingerprint(event_type, event_data)
+            if fingerprint is not None:
+                with self.lock:
+                    if self.processed_events.contains(fingerprint, current_time):
+                        logger.debug("🚫 Duplicate event blocked: %s", event_type)
+                        return False
+            
+            # Queue by priority, merging with a pending event of the same key
+            result = self.event_queue.put(event_type, event_data, priority, current_time)
+            if result == 'dropped':
+                logger.warning("⚠️ Event queue full, dropping: %s", event_type)
+                return False
+            
+            if result == 'queued':
+                logger.debug("📥 Event queued: %s", event_type)
+            return True
+        
+        except Exception as e:
+            logger.error("Error queueing event %s: %s", event_type, e)
+            return False
+    
+    def add_keystroke(self, event_type, key, window=None):
+        """Record a key event from the keyboard hook; never blocks or dedups."""
+        sequence = self.keystrokes.push(event_type, key, window)
+        if sequence is None:
+            logger.warning("⚠️ Keystroke buffer full, input lost: %s", event_type)
+            return False
+        return True
+    
+    def _process_keystrokes(self):
+        """Hand buffered key events to the handler in arrival order."""
+        metrics = self.metrics
+        for sequence, event_type, key, window, timestamp in self.keystrokes.drain():
+            if metrics is not None:
+                metrics.record('key_queue', time.time() - timestamp)
+            if sequence != self._expected_sequence:
+                # Some input never made it into the buffer
+                self._handle_event("keystroke_gap", {
+                    'missed': sequence - self._expected_sequence,
+                    'window': window,
+                    'timestamp': timestamp
+                })
+            self._expected_sequence = sequence + 1
+            
+            self._handle_event(event_type, {
+                'key': key,
+                'window': window,
+                'sequence': sequence,
+                'timestamp': timestamp
+            })
+    
+    def _dispatch_next(self, timeout):
+        """Handle buffered keystrokes, then at most one queued event.
+        
+        Returns True if a queued event was handled; raises ``queue.Empty``
+        if nothing arrived within ``timeout``.
+        """
+        # Keystrokes always go first
+        if len(self.keystrokes):
+            self._process_keystrokes()
+        
+        # Get event with timeout, waking early for new keystrokes
+        event = self.event_queue.get(timeout=timeout, wake_when=lambda: len(self.keystrokes) > 0)
+        if event is None:
+            return False
+        timestamp, event_type, event_data, priority = event
+        
+        # Mark as processed
+        fingerprint = event_fingerprint(event_type, event_data)
+        if fingerprint is not None:
+            with self.lock:
+                self.processed_events.add(fingerprint, timestamp)
+        
+        # Process the event
+        self._handle_event(event_type, event_data)
+        return True
+    
+    def _process_events(self):
+        """Process keystrokes and queued events on one thread."""
+        while not self.stop_event.is_set():
+            try:
+                self._dispatch_next(timeout=1.0)
+            except queue.Empty:
+                continue
+            except Exception as e:
+                logger.error("Error processing event: %s", e)
+    
+    def process_pending(self) -> int:
+        """Handle everything queued so far on the calling thread.
+        
+        For deterministic replay without the processing thread; returns the
+        number of queued (non-keystroke) events handled.
+        """
+        handled = 0
+        while True:
+            try:
+                if self._dispatch_next(timeout=0):
+                    handled += 1
+            except queue.Empty:
+                return handled
+            except Exception as e:
+                logger.error("Error processing event: %s", e)
+    
+    def get_queue_stats(self) -> Dict:
+        """Get per event type queue depth and latency counters."""
+        stats = self.event_queue.get_stats()
+        stats['keystrokes'] = self.keystrokes.get_stats()
+        return stats
+    
+    def _handle_event(self, event_type, event_data):
+        """Override this method to handle specific events."""
+        logger.debug("📨 Processing event: %s", event_type)
@@ -9,6 +9,7 @@ import time
 import math
 from datetime import datetime
 from typing import Callable, Optional
+from .window_registry import register_tk_window
 
 class FloatingEyeWidget:
     """A realistic eye-shaped floating widget for enhanced monitoring status."""
@@ -57,6 +58,7 @@ class FloatingEyeWidget:
             
         # Create toplevel window
         self.window = tk.Toplevel()
+        register_tk_window(self.window)
         self.window.title("SilentLock Eye Monitor")
         
         # Window properties for eye shape
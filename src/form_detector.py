@@ -3,122 +3,62 @@ Form detection and monitoring for SilentLock password manager.
 Detects login forms and prompts user to save credentials.
 """
 
-import re
+import logging
 import time
 import threading
-import queue
-from collections import deque
 from typing import Dict, List, Optional, Callable
-from pynput import keyboard, mouse
-from pynput.keyboard import Key, Listener as KeyboardListener
-from pynput.mouse import Listener as MouseListener
-import win32gui
-import win32process
 import psutil
+from .autofill_engine import AutofillEngine
+from .autofill_index import AutofillIndex
+from .detector_metrics import (
+    DetectorMetrics, SnapshotWriter, default_snapshot_file, STAGE_AUTOFILL_LOOKUP,
+    STAGE_PROCESS_LOOKUP, STAGE_PROMPT_DISPLAY, STAGE_TITLE_PARSE, STAGE_WINDOW_ANALYSIS
+)
+from .detector_scheduler import DetectorScheduler
+from .event_processing import ThreadSafeEventProcessor
+from .logging_config import RateLimitedLogger, get_logger
+from .process_cache import ProcessMetadataCache
+from .secure_buffer import SecureFieldBuffer
+from .site_resolver import SiteResolver, extract_domain
+from .window_classifier import WindowClassifier
+from .window_registry import get_window_registry, register_tk_window
+from .window_events import (
+    WindowEventSource, PollingWindowSource, WindowSetTracker,
+    create_window_event_source, create_window_list, TITLE_CHANGED
+)
 
+logger = get_logger(__name__)
+# Per-keystroke diagnostics, off unless form_detector.keys is set to DEBUG
+key_log = RateLimitedLogger(get_logger(__name__ + '.keys'))
 
-class ThreadSafeEventProcessor:
-    """Thread-safe event processor to prevent loops and repetition."""
-    
-    def __init__(self, max_queue_size=100):
-        self.event_queue = queue.Queue(maxsize=max_queue_size)
-        self.processed_events = deque(maxlen=1000)  # Keep track of recent events
-        self.processing_thread = None
-        self.stop_event = threading.Event()
-        self.lock = threading.RLock()
-        
-    def start_processing(self):
-        """Start the event processing thread."""
-        if self.processing_thread and self.processing_thread.is_alive():
-            return
-            
-        self.stop_event.clear()
-        self.processing_thread = threading.Thread(target=self._process_events)
-        self.processing_thread.daemon = True
-        self.processing_thread.start()
-        print("📡 Event processing thread started")
-    
-    def stop_processing(self):
-        """Stop the event processing thread."""
-        self.stop_event.set()
-        if self.processing_thread:
-            self.processing_thread.join(timeout=2.0)
-        print("📡 Event processing thread stopped")
-    
-    def add_event(self, event_type, event_data, priority=1):
-        """Add event to queue with deduplication."""
-        try:
-            # Create event fingerprint for deduplication
-            event_fingerprint = f"{event_type}:{hash(str(event_data))}"
-            current_time = time.time()
-            
-            # Check for recent duplicates (within last 5 seconds)
-            with self.lock:
-                for timestamp, fingerprint in reversed(list(self.processed_events)):
-                    if current_time - timestamp > 5.0:
-                        break
-                    if fingerprint == event_fingerprint:
-                        print(f"🚫 Duplicate event blocked: {event_type}")
-                        return False
-            
-            # Add to queue if not full
-            if not self.event_queue.full():
-                self.event_queue.put((current_time, event_type, event_data, priority), block=False)
-                print(f"📥 Event queued: {event_type}")
-                return True
-            else:
-                print(f"⚠️ Event queue full, dropping: {event_type}")
-                return False
-                
-        except queue.Full:
-            print(f"⚠️ Event queue full, dropping: {event_type}")
-            return False
-    
-    def _process_events(self):
-        """Process events from queue."""
-        while not self.stop_event.is_set():
-            try:
-                # Get event with timeout
-                timestamp, event_type, event_data, priority = self.event_queue.get(timeout=1.0)
-                
-                # Mark as processed
-                event_fingerprint = f"{event_type}:{hash(str(event_data))}"
-                with self.lock:
-                    self.processed_events.append((timestamp, event_fingerprint))
-                
-                # Process the event
-                self._handle_event(event_type, event_data)
-                
-                # Mark task as done
-                self.event_queue.task_done()
-                
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Error processing event: {e}")
-                
-    def _handle_event(self, event_type, event_data):
-        """Override this method to handle specific events."""
-        print(f"📨 Processing event: {event_type}")
+# Characters kept per field while typing; longer input is dropped
+FIELD_CAPACITY = 512
 
 
 class LoginFormDetector:
     """Detects login forms and provides auto-fill capabilities with thread safety."""
     
-    def __init__(self, on_login_detected: Callable = None, credential_db=None, master_password=None):
+    def __init__(self, on_login_detected: Callable = None, credential_db=None, master_password=None,
+                 window_source: WindowEventSource = None, window_list=None):
         self.on_login_detected = on_login_detected
         self.credential_db = credential_db
         self.master_password = master_password
         self.is_monitoring = False
         self.current_window = None
-        self.typed_text = ""
+        self.processed_window = None  # Last window handed to _process_window_change
+        # Text of the field being typed ('*' per password character), reused
+        # and wiped in place rather than rebuilt on every keystroke
+        self.typed_text = SecureFieldBuffer(FIELD_CAPACITY)
         self.potential_username = ""
         self.potential_password = ""
         self.last_input_time = 0
         self.input_timeout = 30  # seconds
         
+        # Per-stage latency histograms
+        self.metrics = DetectorMetrics()
+        
         # Thread-safe event processing
-        self.event_processor = ThreadSafeEventProcessor()
+        self.event_processor = ThreadSafeEventProcessor(metrics=self.metrics)
         self.event_processor._handle_event = self._handle_queued_event
         
         # Auto-fill state
@@ -127,6 +67,11 @@ class LoginFormDetector:
         self.available_credentials = []
         self.fill_prompt_shown = False
         
+        # Host -> credential ids/usernames, built once after unlock
+        self.autofill_index = AutofillIndex()
+        if credential_db and master_password:
+            self.autofill_index.attach(credential_db)
+        
         # Thread-safe window tracking
         self.window_lock = threading.RLock()
         self.last_analyzed_window = None
@@ -139,114 +84,52 @@ class LoginFormDetector:
         self._autofill_dialog_open = False
         self._save_prompt_open = False
         
-        # Enhanced login form indicators
-        self.login_keywords = [
-            'login', 'signin', 'sign-in', 'log in', 'password', 'username',
-            'email', 'account', 'auth', 'authentication', 'credentials',
-            'register', 'signup', 'sign up', 'create account', 'join',
-            'member', 'user', 'pass', 'security', 'access', 'portal',
-            'dashboard', 'profile', 'settings', 'microsoft', 'google',
-            'facebook', 'twitter', 'linkedin', 'github', 'amazon',
-            'apple', 'adobe', 'office', 'outlook', 'gmail', 'yahoo',
-            'enterprise', 'sso', 'saml', 'oauth', 'openid', 'connect',
-            'verification', 'confirm', 'validate', 'activate', 'unlock',
-            'reset', 'recovery', 'forgot', 'session', 'secure'
-        ]
-        
-        # URL patterns that indicate login pages
-        self.login_url_patterns = [
-            'login', 'signin', 'auth', 'account', 'sso', 'oauth',
-            'portal', 'dashboard', 'admin', 'secure', 'my',
-            'user', 'profile', 'settings', 'member'
-        ]
-        
-        # Browser processes to monitor
-        self.browser_processes = [
-            'chrome.exe', 'firefox.exe', 'msedge.exe', 'iexplore.exe',
-            'opera.exe', 'brave.exe', 'vivaldi.exe', 'safari.exe',
-            'chromium.exe', 'waterfox.exe', 'seamonkey.exe'
-        ]
-        
-        # Enhanced Edge detection patterns
-        self.edge_processes = ['msedge.exe', 'microsoftedge.exe', 'edge.exe']
+        # Title keyword and process name rules, compiled once
+        # (optionally overridden by config/window_rules.json)
+        self.window_classifier = WindowClassifier()
         
         # Monitor ALL applications - comprehensive list
         self.monitor_all_apps = True  # New flag to monitor everything
         
-        # Known applications that commonly have login forms (for better detection)
-        self.common_login_apps = [
-            # Browsers
-            'chrome.exe', 'firefox.exe', 'msedge.exe', 'iexplore.exe',
-            'opera.exe', 'brave.exe', 'vivaldi.exe', 'safari.exe',
-            
-            # Communication
-            'discord.exe', 'slack.exe', 'teams.exe', 'zoom.exe',
-            'skype.exe', 'telegram.exe', 'whatsapp.exe', 'signal.exe',
-            'messenger.exe', 'viber.exe', 'line.exe', 'wechat.exe',
-            
-            # Development
-            'code.exe', 'devenv.exe', 'pycharm64.exe', 'idea64.exe',
-            'notepad++.exe', 'sublime_text.exe', 'atom.exe', 'eclipse.exe',
-            'androidstudio64.exe', 'rider64.exe', 'webstorm64.exe',
-            
-            # Gaming
-            'steam.exe', 'epicgameslauncher.exe', 'origin.exe',
-            'battlenet.exe', 'riotclientux.exe', 'gog.exe', 'uplay.exe',
-            'xbox.exe', 'xboxgamingoverlay.exe', 'minecraft.exe',
-            
-            # Productivity
-            'outlook.exe', 'thunderbird.exe', 'onenote.exe',
-            'evernote.exe', 'notion.exe', 'obsidian.exe', 'todoist.exe',
-            'trello.exe', 'asana.exe', 'monday.exe', 'slack.exe',
-            
-            # Media
-            'spotify.exe', 'itunes.exe', 'vlc.exe', 'netflix.exe',
-            'plex.exe', 'kodi.exe', 'musicbee.exe', 'foobar2000.exe',
-            
-            # Finance
-            'quicken.exe', 'mint.exe', 'personalcapital.exe',
-            'quickbooks.exe', 'wave.exe', 'xero.exe',
-            
-            # VPN/Security
-            'nordvpn.exe', 'expressvpn.exe', 'protonvpn.exe',
-            'surfshark.exe', 'cyberghost.exe', 'windscribe.exe',
-            'bitdefender.exe', 'norton.exe', 'mcafee.exe',
-            
-            # Cloud Storage
-            'onedrive.exe', 'dropbox.exe', 'googledrivesync.exe',
-            'box.exe', 'sync.exe', 'megasync.exe', 'pcloud.exe',
-            
-            # Remote Access
-            'teamviewer.exe', 'anydesk.exe', 'chrome_remote_desktop.exe',
-            'remotepc.exe', 'logmein.exe', 'gotomeeting.exe',
-            
-            # Design/Creative
-            'photoshop.exe', 'illustrator.exe', 'indesign.exe',
-            'figma.exe', 'sketch.exe', 'canva.exe', 'blender.exe',
-            
-            # Business
-            'zoom.exe', 'webex.exe', 'gotomeeting.exe', 'join.me.exe',
-            'bluejeans.exe', 'meet.exe', 'hangouts.exe',
-            
-            # Password Managers
-            '1password.exe', 'lastpass.exe', 'keepass.exe',
-            
-            # System utilities
-            'powershell.exe', 'cmd.exe', 'terminal.exe', 'wt.exe'
-        ]
+        # Process metadata, cached per (pid, create_time); SilentLock's own
+        # windows are recognised through the window registry, not cmdline()
+        self.process_cache = ProcessMetadataCache(classifier=self._classify_process, detect_silentlock=False)
+        self.window_registry = get_window_registry()
         
-        # Application processes that may have login forms
-        self.app_processes = [
-            'discord.exe', 'slack.exe', 'teams.exe', 'zoom.exe',
-            'skype.exe', 'telegram.exe', 'whatsapp.exe', 'signal.exe',
-            'steam.exe', 'epicgameslauncher.exe', 'origin.exe',
-            'spotify.exe', 'outlook.exe', 'thunderbird.exe'
-        ]
+        # Window title -> (url, site name, domain), memoized
+        self.site_resolver = SiteResolver()
         
         # Keyboard and mouse listeners
         self.keyboard_listener = None
         self.mouse_listener = None
         
+        # Foreground window changes are pushed by a window event source;
+        # None picks WinEvent hooks when available, polling otherwise
+        self.window_source = window_source
+        self.background_scan_interval = 10.0  # seconds
+        self._last_background_scan = 0.0
+        self._monitor_stop = threading.Event()
+        
+        # Delayed checks and timed flag resets run on one scheduler thread
+        self.scheduler = DetectorScheduler()
+        self._delayed_check_call = None
+        
+        # Counters-only status snapshot rewritten every minute while monitoring
+        self.metrics_snapshot = SnapshotWriter(self.scheduler, self.get_snapshot_status,
+                                               default_snapshot_file())
+        self._prompt_trigger_time = None
+        
+        # Window enumeration and lookups; background scans only analyze
+        # windows that are new or changed
+        self.window_list = window_list or create_window_list()
+        self.browser_scan_tracker = WindowSetTracker(self.window_list)
+        self.app_scan_tracker = WindowSetTracker(self.window_list)
+        
+        # Types autofilled credentials once the target window has focus
+        self.autofill_engine = AutofillEngine(foreground=getattr(self.window_list, 'get_foreground_window', None))
+        # Last completed fill, until its login outcome is reported back to the engine
+        self.last_autofill = None
+        
         # Enhanced monitoring state
         self.monitoring_errors = 0
         self.max_errors = 10
@@ -259,20 +142,26 @@ class LoginFormDetector:
         self.form_data = {}
         
         # Separate password tracking (for security)
-        self.actual_password = ""  # Store actual password temporarily for saving
+        self.actual_password = SecureFieldBuffer(FIELD_CAPACITY)  # Store actual password temporarily for saving
     
     def start_monitoring(self):
         """Start monitoring for login forms with thread-safe event processing."""
         if self.is_monitoring:
-            print("🚫 Monitoring already active")
+            logger.warning("🚫 Monitoring already active")
             return
         
         self.is_monitoring = True
         self.monitoring_errors = 0
         
         try:
-            # Start thread-safe event processor
+            # Start thread-safe event processor and the delayed work scheduler
             self.event_processor.start_processing()
+            self.scheduler.start()
+            self.metrics_snapshot.start()
+            
+            # pynput is imported here so the detector loads without an input backend
+            from pynput.keyboard import Listener as KeyboardListener
+            from pynput.mouse import Listener as MouseListener
             
             # Start keyboard listener with error handling
             self.keyboard_listener = KeyboardListener(
@@ -287,7 +176,11 @@ class LoginFormDetector:
             )
             self.mouse_listener.start()
             
-            # Start window monitoring thread
+            # Start foreground window events and the background scan thread
+            self._monitor_stop.clear()
+            self.browser_scan_tracker.reset()
+            self.app_scan_tracker.reset()
+            self._start_window_source()
             self.monitor_thread = threading.Thread(
                 target=self._monitor_windows_safe, 
                 name="WindowMonitor"
@@ -295,39 +188,53 @@ class LoginFormDetector:
             self.monitor_thread.daemon = True
             self.monitor_thread.start()
             
-            print("🚀 SilentLock monitoring started with thread-safe processing")
-            
+            logger.info("🚀 SilentLock monitoring started with thread-safe processing")
+        
         except Exception as e:
-            print(f"Error starting monitoring: {e}")
+            logger.error("Error starting monitoring: %s", e)
             self.is_monitoring = False
             self.event_processor.stop_processing()
+            self.scheduler.stop()
             raise
     
     def stop_monitoring(self):
         """Stop monitoring for login forms and clean up threads."""
         self.is_monitoring = False
+        self._monitor_stop.set()
         
         try:
             # Stop event processor first
             self.event_processor.stop_processing()
+            self.metrics_snapshot.stop()
+            self.scheduler.stop()
+            self._delayed_check_call = None
+            if self.metrics_snapshot.path:
+                self.metrics_snapshot.write_now()
+            
+            if self.window_source:
+                self.window_source.stop()
             
             if self.keyboard_listener:
                 self.keyboard_listener.stop()
             
             if self.mouse_listener:
                 self.mouse_listener.stop()
-                
+            
             # Reset dialog states safely
             with self.dialog_lock:
                 self._selection_dialog_open = False
                 self._autofill_dialog_open = False
                 self._save_prompt_open = False
-                
-            print("🛑 SilentLock monitoring stopped and threads cleaned up")
+            # Its timed reset was dropped with the scheduler's pending calls
+            self.fill_prompt_shown = False
+            self.typed_text.wipe()
+            self.actual_password.wipe()
             
+            logger.info("🛑 SilentLock monitoring stopped and threads cleaned up")
+        
         except Exception as e:
-            print(f"Error stopping monitoring: {e}")
-
+            logger.error("Error stopping monitoring: %s", e)
+    
     def get_monitoring_status(self):
         """Get detailed monitoring status including current input monitoring."""
         try:
@@ -340,22 +247,82 @@ class LoginFormDetector:
                 'current_field': 'PASSWORD' if self.in_password_field else 'USERNAME',
                 'current_input_length': len(self.typed_text),
                 'last_activity': f"{time.time() - self.last_input_time:.1f}s ago" if self.last_input_time > 0 else 'No activity',
-                'ready_for_save': self.username_captured and self.password_captured
+                'ready_for_save': self.username_captured and self.password_captured,
+                'event_queue': self.event_processor.get_queue_stats(),
+                'process_cache': self.process_cache.get_stats(),
+                'site_resolver': self.site_resolver.get_stats(),
+                'autofill_index': self.autofill_index.get_stats(),
+                'window_events': self.window_source.get_status() if self.window_source else None,
+                'window_scans': {
+                    'browser': self.browser_scan_tracker.get_stats(),
+                    'app': self.app_scan_tracker.get_stats()
+                },
+                'scheduler': self.scheduler.get_stats(),
+                'autofill_engine': self.autofill_engine.get_stats(),
+                'own_windows': self.window_registry.get_stats(),
+                'performance': self.get_performance_stats()
             }
             
             if self.username_captured:
                 status['username_preview'] = f"{self.potential_username[:5]}..." if len(self.potential_username) > 5 else self.potential_username
                 status['username_length'] = len(self.potential_username)
-                
+            
             if self.password_captured:
                 status['password_preview'] = '*' * min(len(self.potential_password), 8)
                 status['password_length'] = len(self.potential_password)
-                
-            return status
             
+            return status
+        
         except Exception as e:
             return {'error': f"Error getting status: {e}"}
     
+    def get_snapshot_status(self) -> Dict:
+        """Counters, histograms and component stats for the snapshot file.
+        
+        Unlike ``get_monitoring_status`` this holds nothing about what is
+        being typed or where: no field contents or lengths, no site, window
+        or application names.
+        """
+        autofill_stats = self.autofill_engine.get_stats()
+        return {
+            'is_monitoring': self.is_monitoring,
+            'event_queue': self.event_processor.get_queue_stats(),
+            'process_cache': self.process_cache.get_stats(),
+            'site_resolver': self.site_resolver.get_stats(),
+            'autofill_index': self.autofill_index.get_stats(),
+            'window_events': self.window_source.get_status() if self.window_source else None,
+            'window_scans': {
+                'browser': self.browser_scan_tracker.get_stats(),
+                'app': self.app_scan_tracker.get_stats()
+            },
+            'scheduler': self.scheduler.get_stats(),
+            'autofill_engine': {key: autofill_stats[key] for key in ('fills', 'aborted', 'last_latency')},
+            'own_windows': self.window_registry.get_stats(),
+            'performance': self.get_performance_stats()
+        }
+    
+    def get_performance_stats(self) -> Dict:
+        """Stage latencies, queue depth and drops, and cache hit rates."""
+        queue_stats = self.event_processor.event_queue.get_stats()
+        keystrokes = self.event_processor.keystrokes.get_stats()
+        index_stats = self.autofill_index.get_stats()
+        lookups = index_stats.get('lookups', 0)
+        return {
+            'stages': self.metrics.get_stats(),
+            'queue': {
+                'depth': sum(stats['depth'] for stats in queue_stats.values()),
+                'dropped': sum(stats['dropped'] for stats in queue_stats.values()),
+                'keystrokes_buffered': keystrokes['buffered'],
+                'keystroke_overflows': keystrokes['overflows']
+            },
+            'cache_hit_rates': {
+                'process_cache': self.process_cache.get_stats().get('hit_rate'),
+                'site_resolver': self.site_resolver.get_stats().get('hit_rate'),
+                'autofill_index': (index_stats.get('hits', 0) / lookups) if lookups else 0.0
+            },
+            'uptime': time.time() - self.metrics.started
+        }
+    
     def print_current_monitoring_status(self):
         """Print current monitoring status for debugging."""
         status = self.get_monitoring_status()
@@ -363,7 +330,7 @@ class LoginFormDetector:
         if 'error' in status:
             print(f"❌ {status['error']}")
             return
-            
+        
         print(f"\n📊 SILENTLOCK MONITORING STATUS")
         print("=" * 40)
         print(f"🔍 Active: {'YES' if status['is_monitoring'] else 'NO'}")
@@ -380,35 +347,14 @@ class LoginFormDetector:
         print(f"⏰ Last Activity: {status['last_activity']}")
         print(f"💾 Ready to Save: {'YES' if status['ready_for_save'] else 'NO'}")
         print("=" * 40)
-
+    
     def _is_silentlock_dialog_active(self):
         """Check if any SilentLock dialog is currently active to prevent self-monitoring."""
         with self.dialog_lock:
             return (self._selection_dialog_open or 
                     self._autofill_dialog_open or 
                     self._save_prompt_open)
-
-    def _get_all_silentlock_windows(self):
-        """Get all possible SilentLock window titles for exclusion."""
-        return [
-            'SilentLock Password Manager',
-            'SilentLock - Authentication', 
-            'SilentLock - Administrator Access',
-            'SilentLock - Administrator Dashboard',
-            'Administrator Account Created',
-            'Setup Administrator Account',
-            'SilentLock Auto-Fill',
-            'Select Credential',
-            'SilentLock',  # Catch-all for SilentLock notifications
-            'Add Credential',
-            'Edit Credential',
-            'Generate New Passkey',
-            'Admin Profile Management',
-            'Activity Statistics',
-            'SilentLock Eye Monitor',
-            'Select Browser to Import From'
-        ]
-
+    
     def _handle_queued_event(self, event_type, event_data):
         """Handle events from the thread-safe queue with enhanced browser tab detection."""
         try:
@@ -416,10 +362,14 @@ class LoginFormDetector:
                 self._process_key_press(event_data)
             elif event_type == "key_release":
                 self._process_key_release(event_data)
+            elif event_type == "keystroke_gap":
+                self._process_keystroke_gap(event_data)
             elif event_type == "mouse_click":
                 self._process_mouse_click(event_data)
             elif event_type == "window_change":
                 self._process_window_change(event_data)
+            elif event_type == "background_window":
+                self._process_background_window(event_data)
             elif event_type == "save_prompt":
                 self._process_save_prompt(event_data)
             elif event_type == "autofill_check":
@@ -429,30 +379,23 @@ class LoginFormDetector:
             elif event_type == "background_scan":
                 self._process_comprehensive_app_scan(event_data)
             else:
-                print(f"⚠️ Unknown event type: {event_type}")
-                
+                logger.warning("⚠️ Unknown event type: %s", event_type)
+        
         except Exception as e:
-            print(f"Error handling queued event {event_type}: {e}")
+            logger.error("Error handling queued event %s: %s", event_type, e)
     
     def _on_key_press_safe(self, key):
         """Safe wrapper for key press handling with event queuing."""
         try:
-            # Queue the event instead of processing directly
-            self.event_processor.add_event("key_press", {
-                'key': key,
-                'timestamp': time.time(),
-                'window': self.current_window
-            })
+            # Hand off to the keystroke ring buffer instead of processing directly
+            self.event_processor.add_keystroke("key_press", key, self.current_window)
         except Exception as e:
             self._handle_monitoring_error(f"Key press queueing error: {e}")
     
     def _on_key_release_safe(self, key):
         """Safe wrapper for key release handling with event queuing."""
         try:
-            self.event_processor.add_event("key_release", {
-                'key': key,
-                'timestamp': time.time()
-            })
+            self.event_processor.add_keystroke("key_release", key, self.current_window)
         except Exception as e:
             self._handle_monitoring_error(f"Key release queueing error: {e}")
     
@@ -480,60 +423,93 @@ class LoginFormDetector:
         """Handle monitoring errors gracefully with thread safety."""
         with self.dialog_lock:
             self.monitoring_errors += 1
-            
-        print(f"Monitoring error ({self.monitoring_errors}/{self.max_errors}): {error_msg}")
+        
+        logger.warning("Monitoring error (%s/%s): %s", self.monitoring_errors, self.max_errors, error_msg)
         
         if self.monitoring_errors >= self.max_errors:
-            print("Too many monitoring errors, stopping monitoring")
+            logger.error("Too many monitoring errors, stopping monitoring")
             self.stop_monitoring()
     
+    def _classify_process(self, process_name, cmdline=None):
+        """Derive the cached process flags used by window analysis."""
+        categories = self.window_classifier.classify_process(process_name)
+        return {
+            'categories': categories,
+            'is_browser': 'browser' in categories,
+            'is_monitored_app': 'monitored_app' in categories
+        }
+    
+    def _start_window_source(self):
+        """Start the configured window event source, falling back to polling."""
+        if self.window_source is None:
+            if isinstance(self.window_list, WindowEventSource):
+                # The in-memory backend delivers its own events
+                self.window_source = self.window_list
+            else:
+                self.window_source = create_window_event_source(self.window_list.get_foreground_window)
+        
+        try:
+            self.window_source.start(self._on_window_event)
+        except Exception as e:
+            logger.warning("⚠️ %s window events unavailable (%s), falling back to polling", self.window_source.name, e)
+            self.window_source = PollingWindowSource(self.window_list.get_foreground_window)
+            self.window_source.start(self._on_window_event)
+        
+        logger.info("🪟 Window events from: %s", self.window_source.name)
+    
+    def _on_window_event(self, hwnd, kind, title=None):
+        """Queue foreground and title changes pushed by the window source."""
+        if not hwnd:
+            return
+        if kind != TITLE_CHANGED:
+            self.autofill_engine.notify_foreground(hwnd)
+        if not self.is_monitoring:
+            return
+        
+        with self.window_lock:
+            if hwnd == self.current_window and kind != TITLE_CHANGED:
+                return
+            self.current_window = hwnd
+            
+            # Queue window change event instead of processing directly
+            self.event_processor.add_event("window_change", {
+                'window_handle': hwnd,
+                'title': title,
+                'timestamp': time.time(),
+                'is_foreground': True
+            })
+    
     def _monitor_windows(self):
-        """Monitor active windows for login-related content with thread-safe queuing."""
+        """Periodically queue background scans; window changes arrive as events."""
         while self.is_monitoring:
             try:
-                current_window = win32gui.GetForegroundWindow()
-                
-                with self.window_lock:
-                    if current_window != self.current_window:
-                        self.current_window = current_window
-                        
-                        # Queue window change event instead of processing directly
-                        self.event_processor.add_event("window_change", {
-                            'window_handle': current_window,
-                            'timestamp': time.time(),
-                            'is_foreground': True
-                        })
-                
-                # Also monitor background windows occasionally for comprehensive detection
                 if self.monitor_all_apps:
                     self._queue_background_window_scan()
                 
-                time.sleep(0.5)  # Reduced frequency to be less intensive
-                
+                if self._monitor_stop.wait(self.background_scan_interval):
+                    break
+            
             except Exception as e:
-                print(f"Error monitoring windows: {e}")
+                logger.error("Error monitoring windows: %s", e)
                 time.sleep(2)  # Shorter recovery time
     
     def _queue_background_window_scan(self):
         """Queue background window scanning with enhanced browser tab detection."""
-        # Only scan background windows every 20 iterations to avoid performance issues
-        if not hasattr(self, '_background_scan_counter'):
-            self._background_scan_counter = 0
-        
-        self._background_scan_counter += 1
-        if self._background_scan_counter < 20:  # Scan every 10 seconds (20 * 0.5s)
+        # Only scan background windows every background_scan_interval seconds
+        now = time.time()
+        if now - self._last_background_scan < self.background_scan_interval:
             return
         
-        self._background_scan_counter = 0
+        self._last_background_scan = now
         
         # Enhanced: Queue both background scan AND browser tab scan
         self.event_processor.add_event("background_scan", {
-            'timestamp': time.time()
+            'timestamp': now
         }, priority=2)  # Lower priority
         
         # Add comprehensive browser tab scanning
         self.event_processor.add_event("browser_tab_scan", {
-            'timestamp': time.time()
+            'timestamp': now
         }, priority=2)
     
     def _process_key_press(self, event_data):
@@ -541,43 +517,52 @@ class LoginFormDetector:
         key = event_data.get('key')
         if not key:
             return
-            
+        
+        # Keystrokes overtake queued window events; apply a pending switch first
+        window = event_data.get('window')
+        if window and window != self.processed_window:
+            self._process_window_change({'window_handle': window})
+        
         self.last_input_time = time.time()
         
         # Get current window information for context
         current_window = self.form_data.get('site_name', 'Unknown')
         is_login_page = self._is_login_page_context()
         
-        if key == Key.tab:
+        # Special keys (pynput Key members) are matched by name
+        key_name = getattr(key, 'name', None)
+        
+        if key_name == 'tab':
             # Tab indicates field navigation - critical for browser forms
-            print(f"🔄 TAB - Field transition detected on {current_window}")
+            logger.debug("🔄 TAB - Field transition detected on %s", current_window)
             self._handle_field_transition()
-            
-        elif key == Key.enter:
+        
+        elif key_name == 'enter':
             # Enter indicates form submission or field confirmation
-            print(f"🔑 ENTER - Form submission detected on {current_window}")
+            logger.debug("🔑 ENTER - Form submission detected on %s", current_window)
             self._handle_form_submission()
-            
-        elif key == Key.backspace:
+        
+        elif key_name == 'backspace':
             if self.typed_text:
-                self.typed_text = self.typed_text[:-1]
+                self.typed_text.pop()
                 # Also handle actual password backspace
                 if self.in_password_field and self.actual_password:
-                    self.actual_password = self.actual_password[:-1]
-                    print(f"🔐 Password backspace - remaining length: {len(self.actual_password)}")
-                else:
-                    print(f"👤 Username backspace - remaining text: '{self.typed_text[-5:]}...'")
+                    self.actual_password.pop()
+                    key_log.debug("🔐 Password backspace - remaining length: %s", len(self.actual_password))
+                elif key_log.isEnabledFor(logging.DEBUG):
+                    key_log.debug("👤 Username backspace - remaining text: '%s...'", self.typed_text.tail(5))
         
-        elif key == Key.space:
+        elif key_name == 'space':
             # Space handling for different field types
             if not self.in_password_field:
-                self.typed_text += ' '
-                print(f"👤 Username space added - current: '{self.typed_text[-10:]}...'")
+                self.typed_text.append(' ')
+                if key_log.isEnabledFor(logging.DEBUG):
+                    key_log.debug("👤 Username space added - current: '%s...'", self.typed_text.tail(10))
             elif self.form_data.get('is_browser', False):
                 if self.in_password_field:
-                    self.actual_password += ' '
-                    self.typed_text += '*'
-                    print(f"🔐 Password space added - length: {len(self.actual_password)}")
+                    self.actual_password.append(' ')
+                    self.typed_text.append('*')
+                    key_log.debug("🔐 Password space added - length: %s", len(self.actual_password))
         
         elif hasattr(key, 'char') and key.char:
             # Regular character input
@@ -585,7 +570,7 @@ class LoginFormDetector:
             
             # Enhanced monitoring output
             if is_login_page:
-                print(f"� LOGIN INPUT on '{current_window}': char='{char}' field={'PASSWORD' if self.in_password_field else 'USERNAME'}")
+                key_log.debug("⌨️ LOGIN INPUT on '%s': field=%s", current_window, 'PASSWORD' if self.in_password_field else 'USERNAME')
             
             # Enhanced password field detection
             self._update_password_field_detection(char)
@@ -593,28 +578,29 @@ class LoginFormDetector:
             # Store input appropriately with enhanced feedback
             if self.in_password_field:
                 # For password fields, store actual character but display asterisk
-                self.actual_password += char
-                self.typed_text += '*'
-                print(f"🔐 PASSWORD CHAR CAPTURED: '{char}' | Total length: {len(self.actual_password)} | Site: {current_window}")
+                self.actual_password.append(char)
+                self.typed_text.append('*')
+                key_log.debug("🔐 PASSWORD CHAR CAPTURED | Total length: %s | Site: %s", len(self.actual_password), current_window)
                 
                 # Validate password strength in real-time
                 self._analyze_password_strength()
-                
+            
             else:
-                self.typed_text += char
-                print(f"👤 USERNAME CHAR CAPTURED: '{char}' | Current: '{self.typed_text[-10:]}...' | Site: {current_window}")
-                
-                # Check for email pattern
-                if '@' in self.typed_text:
-                    print(f"📧 Email pattern detected in username: {self.typed_text}")
-                
+                self.typed_text.append(char)
+                if key_log.isEnabledFor(logging.DEBUG):
+                    key_log.debug("👤 USERNAME CHAR CAPTURED: '%s' | Current: '%s...' | Site: %s", char, self.typed_text.tail(10), current_window)
+                    
+                    # Check for email pattern
+                    if '@' in self.typed_text:
+                        key_log.debug("📧 Email pattern detected in username: %s", self.typed_text.to_str())
+            
             # Auto-detect password field based on typing patterns
             self._smart_password_field_detection()
             
             # Enhanced browser credential detection
             if self.form_data.get('is_browser', False):
                 self._enhanced_browser_credential_detection()
-                
+            
             # Real-time credential validation
             self._validate_current_input()
     
@@ -623,35 +609,45 @@ class LoginFormDetector:
         # Currently no specific processing needed
         pass
     
+    def _process_keystroke_gap(self, event_data):
+        """Discard partially captured input after keystrokes were lost."""
+        logger.warning("⚠️ %s keystroke(s) lost - discarding partial input", event_data.get('missed', 0))
+        self.typed_text.wipe()
+        self.actual_password.wipe()
+        self.potential_username = ""
+        self.potential_password = ""
+        self.username_captured = False
+        self.password_captured = False
+    
     def _process_mouse_click(self, event_data):
         """Process mouse click events from queue."""
         if not event_data.get('pressed'):
             return
-            
+        
         # Mouse click indicates field change or button press - critical for browser login forms
-        current_text = self.typed_text.strip()
+        current_text = self.typed_text.to_str().strip()
         
         if self.form_data.get('is_browser', False):
-            print(f"🌐 Browser click detected - Text: '{current_text[:5] if current_text else 'None'}...' (Password field: {self.in_password_field})")
+            logger.debug("🌐 Browser click detected - Text: '%s...' (Password field: %s)", current_text[:5] if current_text else 'None', self.in_password_field)
         
         if current_text:
             if self.in_password_field and not self.password_captured:
-                self.potential_password = self.actual_password if self.actual_password else current_text.replace('*', '')
+                self.potential_password = self.actual_password.to_str() if self.actual_password else current_text.replace('*', '')
                 self.password_captured = True
-                print(f"🔑 Password captured on click (length: {len(self.potential_password)}) - Browser: {self.form_data.get('is_browser', False)}")
+                logger.debug("🔑 Password captured on click (length: %s) - Browser: %s", len(self.potential_password), self.form_data.get('is_browser', False))
             elif not self.username_captured:
                 self.potential_username = current_text
                 self.username_captured = True
-                print(f"👤 Username captured on click: {self.potential_username[:3]}... - Browser: {self.form_data.get('is_browser', False)}")
+                logger.debug("👤 Username captured on click: %s... - Browser: %s", self.potential_username[:3], self.form_data.get('is_browser', False))
             
             # Reset field detection for new field
             self.in_password_field = False
-            self.typed_text = ""
-            self.actual_password = ""  # Reset actual password
+            self.typed_text.wipe()
+            self.actual_password.wipe()  # Reset actual password
             
             # Queue save prompt check instead of processing directly
             if self.username_captured and self.password_captured:
-                print("💾 Both credentials captured on click - queueing save prompt")
+                logger.info("💾 Both credentials captured on click - queueing save prompt")
                 self.event_processor.add_event("save_prompt", {
                     'username': self.potential_username,
                     'password': self.potential_password,
@@ -661,9 +657,9 @@ class LoginFormDetector:
         else:
             # Handle clicks without text for browsers
             if self.form_data.get('is_browser', False) and (self.username_captured or self.password_captured):
-                print("🌐 Browser click without current text - checking captured credentials")
+                logger.debug("🌐 Browser click without current text - checking captured credentials")
                 if self.username_captured and self.password_captured:
-                    print("💾 Browser login button click detected - queueing save prompt")
+                    logger.info("💾 Browser login button click detected - queueing save prompt")
                     self.event_processor.add_event("save_prompt", {
                         'username': self.potential_username,
                         'password': self.potential_password,
@@ -675,18 +671,31 @@ class LoginFormDetector:
         """Process window change events from queue."""
         window_handle = event_data.get('window_handle')
         if window_handle:
-            self._analyze_window(window_handle)
+            self.processed_window = window_handle
+            with self.metrics.timed(STAGE_WINDOW_ANALYSIS):
+                self._analyze_window(window_handle)
+    
+    def _process_background_window(self, event_data):
+        """Analyze a login window found by a scan without making it the current form."""
+        window_handle = event_data.get('window_handle')
+        if window_handle:
+            self._analyze_window(window_handle, is_background=True)
     
     def _analyze_window(self, hwnd, is_background=False):
-        """Enhanced window analysis for all browsers and applications."""
+        """Enhanced window analysis for all browsers and applications.
+        
+        Background analysis (``is_background``) only warms the process and
+        site caches; the foreground form state, the re-analysis cooldown and
+        autofill are left to the window the user is actually in.
+        """
         try:
             # CRITICAL: First check if any SilentLock dialog is active
             if self._is_silentlock_dialog_active():
                 if not is_background:
-                    print("⚠️ SilentLock dialog active - skipping window analysis to prevent loops")
+                    logger.debug("⚠️ SilentLock dialog active - skipping window analysis to prevent loops")
                 return
-                
-            window_title = win32gui.GetWindowText(hwnd)
+            
+            window_title = self.window_list.get_window_text(hwnd)
             if not window_title:
                 return
             
@@ -696,170 +705,77 @@ class LoginFormDetector:
                 return
             
             # CRITICAL: Skip SilentLock's own windows to prevent auto-fill on itself
-            silentlock_windows = self._get_all_silentlock_windows()
-            
-            # Additional check: any window containing "SilentLock" should be excluded
-            if 'SilentLock' in window_title or any(sl_window in window_title for sl_window in silentlock_windows):
+            try:
+                pid = self.window_list.get_window_pid(hwnd)
+            except Exception:
+                pid = None
+            if self.window_registry.is_own_window(hwnd, pid):
                 if not is_background:  # Only print for foreground windows
-                    print(f"⚠️ Skipping SilentLock's own window: {window_title}")
+                    logger.debug("⚠️ Skipping SilentLock's own window: %s", window_title)
                 return
             
             # Prevent auto-fill loops: don't re-analyze the same window too frequently
-            current_time = time.time()
-            window_key = f"{hwnd}_{window_title}"
-            
-            # Check if we recently analyzed this exact window
-            if window_key in self.window_analysis_cooldown:
-                last_analysis = self.window_analysis_cooldown[window_key]
-                if current_time - last_analysis < 10:  # 10 second cooldown
-                    return
-            
-            # Update analysis time
-            self.window_analysis_cooldown[window_key] = current_time
-            
-            # Clean up old entries to prevent memory buildup
-            if len(self.window_analysis_cooldown) > 50:
-                cutoff_time = current_time - 60  # Remove entries older than 1 minute
-                self.window_analysis_cooldown = {
-                    k: v for k, v in self.window_analysis_cooldown.items() 
-                    if v > cutoff_time
-                }
+            if not is_background:
+                current_time = time.time()
+                window_key = f"{hwnd}_{window_title}"
+                
+                # Check if we recently analyzed this exact window
+                if window_key in self.window_analysis_cooldown:
+                    last_analysis = self.window_analysis_cooldown[window_key]
+                    if current_time - last_analysis < 10:  # 10 second cooldown
+                        return
+                
+                # Update analysis time
+                self.window_analysis_cooldown[window_key] = current_time
+                
+                # Clean up old entries to prevent memory buildup
+                if len(self.window_analysis_cooldown) > 50:
+                    cutoff_time = current_time - 60  # Remove entries older than 1 minute
+                    self.window_analysis_cooldown = {
+                        k: v for k, v in self.window_analysis_cooldown.items() 
+                        if v > cutoff_time
+                    }
             
-            # Check if window title suggests a login page
+            # Classify the title against all keyword rules in one pass
             title_lower = window_title.lower()
-            is_login_page = any(keyword in title_lower for keyword in self.login_keywords)
+            title_categories = self.window_classifier.classify_title(title_lower)
             
             # Get process information
             process_name = "Unknown"
+            process_categories = frozenset()
             is_browser = False
             is_monitored_app = False
             
             try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                process = psutil.Process(pid)
-                process_name = process.name().lower()
-                
-                # CRITICAL: Skip if this is SilentLock's own Python process
-                if 'python' in process_name or 'tk' in process_name:
-                    # Additional check to see if this is SilentLock's Python instance
-                    try:
-                        cmdline = process.cmdline()
-                        if any('main.py' in cmd for cmd in cmdline) or any('SilentLock' in cmd for cmd in cmdline):
-                            if not is_background:
-                                print(f"⚠️ Skipping SilentLock's own Python process: {process_name}")
-                            return
-                        
-                        # Check if this is a tkinter process related to SilentLock
-                        if any('tkinter' in str(cmd).lower() or 'SilentLock' in str(cmd) for cmd in cmdline):
-                            if not is_background:
-                                print(f"⚠️ Skipping SilentLock's tkinter process: {process_name}")
-                            return
-                            
-                    except:
-                        # If we can't check cmdline but it's a Python process and we have SilentLock in the window title,
-                        # it's likely our own process
-                        if 'SilentLock' in window_title:
-                            if not is_background:
-                                print(f"⚠️ Skipping suspected SilentLock Python process: {process_name}")
-                            return
-                
-                # Check if it's a browser
-                is_browser = any(browser.lower() in process_name for browser in self.browser_processes)
-                
-                # Enhanced Edge detection
-                if not is_browser and any(edge in process_name for edge in self.edge_processes):
-                    is_browser = True
-                
-                # Check if it's a monitored application
-                is_monitored_app = any(app.lower() in process_name for app in self.app_processes)
+                with self.metrics.timed(STAGE_PROCESS_LOOKUP):
+                    process_info = self.process_cache.get(pid)
+                if process_info is None:
+                    raise psutil.NoSuchProcess(pid)
+                process_name = process_info.name
                 
+                process_categories = process_info.categories
+                is_browser = process_info.is_browser
+                is_monitored_app = process_info.is_monitored_app
+            
             except Exception as e:
                 if not is_background:  # Only print errors for foreground windows
-                    print(f"Error getting process info: {e}")
+                    logger.debug("Error getting process info: %s", e)
             
             # Enhanced login detection logic for ALL applications
-            should_monitor = False
-            
-            if self.monitor_all_apps:
-                # Monitor ALL applications, but use smart detection
-                if is_browser:
-                    # For browsers, use comprehensive detection
-                    should_monitor = (
-                        is_login_page or
-                        any(pattern in title_lower for pattern in ['account', 'signin', 'login', 'auth', 'portal', 'dashboard', 'profile', 'secure']) or
-                        self._detect_login_url_pattern(title_lower) or
-                        self._detect_common_login_sites(title_lower) or
-                        # Enhanced browser monitoring - monitor MORE aggressively
-                        any(keyword in title_lower for keyword in [
-                            'sign', 'log', 'enter', 'access', 'connect', 'password',
-                            'user', 'email', 'credential', 'verification', 'verify',
-                            'session', 'welcome', 'home', 'my', 'settings'
-                        ])
-                    )
-                    
-                    # AGGRESSIVE: For major browsers, monitor almost everything except obvious non-login pages
-                    if any(browser in process_name for browser in ['chrome.exe', 'firefox.exe', 'msedge.exe']):
-                        exclude_patterns = [
-                            'youtube', 'netflix', 'twitch', 'spotify', 'music',
-                            'video', 'stream', 'watch', 'play', 'game',
-                            'news', 'weather', 'map', 'search', 'google.com - search'
-                        ]
-                        if not any(exclude in title_lower for exclude in exclude_patterns):
-                            should_monitor = True
-                            if not is_background:
-                                print(f"🌐 AGGRESSIVE: Monitoring browser window: {title_lower[:50]}...")
-                    
-                    # Enhanced Edge detection - monitor more aggressively
-                    if any(edge in process_name for edge in self.edge_processes):
-                        should_monitor = should_monitor or any(keyword in title_lower for keyword in [
-                            'microsoft', 'office', 'outlook', 'live', 'hotmail', 'msn',
-                            'azure', 'bing', 'xbox', 'skype', 'teams', 'onedrive',
-                            # Add more common login patterns for Edge
-                            'sign', 'log', 'enter', 'access', 'connect', 'secure',
-                            'portal', 'dashboard', 'profile', 'settings', 'account'
-                        ])
-                        
-                        # For Edge, also monitor based on URL patterns in title
-                        edge_login_patterns = [
-                            'login.', 'signin.', 'auth.', 'account.', 'sso.',
-                            'portal.', 'my.', 'secure.', 'admin.', 'dashboard.'
-                        ]
-                        should_monitor = should_monitor or any(pattern in title_lower for pattern in edge_login_patterns)
-                        
-                elif process_name in self.common_login_apps:
-                    # For known apps with login forms, monitor more broadly
-                    should_monitor = (
-                        is_login_page or
-                        any(pattern in title_lower for pattern in ['setup', 'welcome', 'start', 'config', 'settings'])
-                    )
-                    
-                else:
-                    # For ALL other applications, use selective detection
-                    should_monitor = (
-                        is_login_page or
-                        any(sensitive_word in title_lower for sensitive_word in [
-                            'password', 'login', 'signin', 'auth', 'credential', 
-                            'setup', 'configuration', 'connect', 'account'
-                        ])
-                    )
-            
-            else:
-                # Original logic (if monitoring is not set to all apps)
-                if is_browser:
-                    should_monitor = (
-                        is_login_page or
-                        any(pattern in title_lower for pattern in ['account', 'signin', 'login', 'auth', 'portal', 'dashboard']) or
-                        self._detect_login_url_pattern(title_lower)
-                    )
-                elif is_monitored_app:
-                    should_monitor = True
-                elif is_login_page:
-                    should_monitor = True
+            should_monitor = self.window_classifier.should_monitor(
+                title_categories, process_categories, self.monitor_all_apps
+            )
             
             # Debug output for any detected application
-            if should_monitor and process_name not in ['dwm.exe', 'explorer.exe', 'winlogon.exe']:
+            if should_monitor and 'system' not in process_categories:
                 if not is_background:  # Only print for foreground windows to avoid spam
-                    print(f"Detected potential login: {process_name} - {window_title[:80]} - Monitoring: {should_monitor}")
+                    logger.debug("Detected potential login: %s - %s - Monitoring: %s", process_name, window_title[:80], should_monitor)
+            
+            if should_monitor and is_background:
+                # Resolve the site now so switching to this window later is a cache hit
+                with self.metrics.timed(STAGE_TITLE_PARSE):
+                    self.site_resolver.resolve(window_title, process_name, is_browser)
+                return
             
             if should_monitor:
                 # Only reset form state if this is a truly new window/form
@@ -869,6 +785,7 @@ class LoginFormDetector:
                 )
                 
                 if window_changed:
+                    self._cancel_delayed_check()
                     self._reset_form_state()
                     self.last_analyzed_window = hwnd
                     self.last_window_title = window_title
@@ -880,141 +797,22 @@ class LoginFormDetector:
                 self.form_data['is_monitored_app'] = is_monitored_app
                 self.form_data['is_background'] = is_background
                 
-                if is_browser:
-                    self._extract_url_from_title(window_title)
-                else:
-                    self.form_data['site_name'] = self._clean_app_title(window_title, process_name)
+                with self.metrics.timed(STAGE_TITLE_PARSE):
+                    site = self.site_resolver.resolve(window_title, process_name, is_browser)
+                if site.url:
+                    self.form_data['url'] = site.url
+                self.form_data['site_name'] = site.site_name
                 
                 if not is_background:  # Only print monitoring status for foreground
-                    print(f"Monitoring login form: {process_name} - {window_title[:50]}...")
+                    logger.debug("Monitoring login form: %s - %s...", process_name, window_title[:50])
                 
                 # Only check for auto-fill if this is a new window/form
                 if window_changed:
                     self._check_for_autofill_opportunity()
-                
+        
         except Exception as e:
             if not is_background:  # Only print errors for foreground windows
-                print(f"Error analyzing window: {e}")
-    
-    def _detect_login_url_pattern(self, title_lower):
-        """Detect login-related URL patterns in browser titles."""
-        return any(pattern in title_lower for pattern in self.login_url_patterns)
-    
-    def _detect_common_login_sites(self, title_lower):
-        """Detect common login sites and services."""
-        common_sites = [
-            'microsoft', 'google', 'facebook', 'twitter', 'linkedin',
-            'github', 'amazon', 'apple', 'adobe', 'netflix', 'spotify',
-            'dropbox', 'onedrive', 'gmail', 'outlook', 'yahoo',
-            'instagram', 'snapchat', 'tiktok', 'reddit', 'discord',
-            'slack', 'zoom', 'teams', 'office', 'wordpress'
-        ]
-        return any(site in title_lower for site in common_sites)
-    
-    def _clean_app_title(self, title, process_name):
-        """Clean application title for better site name."""
-        if not title:
-            return process_name.replace('.exe', '').title()
-        
-        # Remove common application suffixes
-        cleaned = title
-        app_suffixes = [
-            f' - {process_name.replace(".exe", "").title()}',
-            ' - Discord',
-            ' - Slack',
-            ' - Microsoft Teams',
-            ' - Zoom',
-            ' - Skype'
-        ]
-        
-        for suffix in app_suffixes:
-            if cleaned.endswith(suffix):
-                cleaned = cleaned[:-len(suffix)].strip()
-        
-        return cleaned if cleaned else process_name.replace('.exe', '').title()
-    
-    def _extract_url_from_title(self, title):
-        """Enhanced URL extraction from browser window titles."""
-        # Enhanced patterns for URLs in browser titles
-        url_patterns = [
-            r'https?://[^\s\-]+',  # Standard URLs
-            r'www\.[^\s\-]+',      # www URLs
-            r'[a-zA-Z0-9\-]+\.[a-zA-Z]{2,}(?:/[^\s]*)?',  # Domain patterns
-        ]
-        
-        for pattern in url_patterns:
-            match = re.search(pattern, title)
-            if match:
-                url = match.group()
-                self.form_data['url'] = url
-                # Extract domain for site name
-                domain = self._extract_domain_from_url(url)
-                self.form_data['site_name'] = domain
-                return
-        
-        # Enhanced title parsing for modern browsers
-        # Chrome: "Page Title - Google Chrome"
-        # Firefox: "Page Title - Mozilla Firefox"
-        # Edge: "Page Title - Microsoft Edge"
-        
-        browser_suffixes = [
-            ' - Google Chrome',
-            ' - Mozilla Firefox',
-            ' - Microsoft Edge',
-            ' - Internet Explorer',
-            ' - Opera',
-            ' - Safari',
-            ' - Brave',
-            ' - Vivaldi'
-        ]
-        
-        cleaned_title = title
-        for suffix in browser_suffixes:
-            if cleaned_title.endswith(suffix):
-                cleaned_title = cleaned_title[:-len(suffix)].strip()
-                break
-        
-        # Try to extract site name from cleaned title
-        if ' - ' in cleaned_title:
-            # Format: "Site Name - Page Title"
-            parts = cleaned_title.split(' - ')
-            self.form_data['site_name'] = parts[-1] if len(parts) > 1 else parts[0]
-        elif ' | ' in cleaned_title:
-            # Format: "Page Title | Site Name"
-            parts = cleaned_title.split(' | ')
-            self.form_data['site_name'] = parts[-1] if len(parts) > 1 else parts[0]
-        else:
-            # Use the whole cleaned title
-            self.form_data['site_name'] = cleaned_title
-        
-        # If site name is too short or generic, use a fallback
-        site_name = self.form_data.get('site_name', '')
-        if len(site_name) < 3 or site_name.lower() in ['login', 'signin', 'sign in']:
-            self.form_data['site_name'] = 'Browser Application'
-            
-    def _extract_domain_from_url(self, url):
-        """Extract clean domain name from URL."""
-        try:
-            # Remove protocol
-            if '://' in url:
-                url = url.split('://', 1)[1]
-            
-            # Remove path
-            if '/' in url:
-                url = url.split('/', 1)[0]
-            
-            # Remove port
-            if ':' in url:
-                url = url.split(':', 1)[0]
-            
-            # Remove www prefix
-            if url.startswith('www.'):
-                url = url[4:]
-            
-            return url.lower()
-            
-        except Exception:
-            return url
+                logger.error("Error analyzing window: %s", e)
     
     def _schedule_delayed_check(self, delay=2.0):
         """Schedule a delayed check for credentials that might come later with throttling."""
@@ -1024,36 +822,38 @@ class LoginFormDetector:
         # Check if we recently scheduled a delayed check
         if hasattr(self, '_last_delayed_check_time'):
             if current_time - self._last_delayed_check_time < 5.0:  # Only allow one per 5 seconds
-                print("🚫 Delayed check throttled - too recent")
+                logger.debug("🚫 Delayed check throttled - too recent")
                 return
         
         self._last_delayed_check_time = current_time
-        
-        def delayed_check():
-            try:
-                time.sleep(delay)
-                if self.is_monitoring and (self.username_captured or self.password_captured):
-                    print("Delayed check: Triggering save prompt with available credentials")
-                    
-                    # Use event queue to prevent direct triggering
-                    self.event_processor.add_event("save_prompt", {
-                        'username': self.potential_username,
-                        'password': self.actual_password,
-                        'site_data': self.form_data,
-                        'trigger': 'delayed'
-                    })
-            except Exception as e:
-                print(f"Error in delayed check: {e}")
-        
-        # Run delayed check in background thread
-        threading.Thread(target=delayed_check, daemon=True, name="delayed-check").start()
+        self._delayed_check_call = self.scheduler.call_later(delay, self._run_delayed_check)
+    
+    def _cancel_delayed_check(self):
+        """Drop the pending delayed check, e.g. when the user moves to another window."""
+        call, self._delayed_check_call = self._delayed_check_call, None
+        if call is not None:
+            call.cancel()
+    
+    def _run_delayed_check(self):
+        """Scheduled by _schedule_delayed_check; runs on the scheduler thread."""
+        self._delayed_check_call = None
+        if self.is_monitoring and (self.username_captured or self.password_captured):
+            logger.debug("Delayed check: Triggering save prompt with available credentials")
+            
+            # Use event queue to prevent direct triggering
+            self.event_processor.add_event("save_prompt", {
+                'username': self.potential_username,
+                'password': self.actual_password.to_str(),
+                'site_data': self.form_data,
+                'trigger': 'delayed'
+            })
     
     def _reset_form_state(self):
         """Reset form detection state."""
-        self.typed_text = ""
+        self.typed_text.wipe()
         self.potential_username = ""
         self.potential_password = ""
-        self.actual_password = ""  # Reset actual password
+        self.actual_password.wipe()  # Reset actual password
         self.in_password_field = False
         self.username_captured = False
         self.password_captured = False
@@ -1068,33 +868,34 @@ class LoginFormDetector:
             
             # Enhanced browser detection and monitoring
             if self.form_data.get('is_browser', False):
-                print(f"🌐 Browser input detected: {self.form_data.get('process_name', 'Unknown')} - {key}")
+                key_log.debug("🌐 Browser input detected: %s", self.form_data.get("process_name", "Unknown"))
             
-            if key == Key.tab:
+            key_name = getattr(key, 'name', None)
+            if key_name == 'tab':
                 # Tab indicates field navigation - critical for browser forms
                 self._handle_field_transition()
-                
-            elif key == Key.enter:
+            
+            elif key_name == 'enter':
                 # Enter indicates form submission or field confirmation
-                print("🔑 Enter key detected - checking for form submission")
+                logger.debug("🔑 Enter key detected - checking for form submission")
                 self._handle_form_submission()
-                
-            elif key == Key.backspace:
+            
+            elif key_name == 'backspace':
                 if self.typed_text:
-                    self.typed_text = self.typed_text[:-1]
+                    self.typed_text.pop()
                     # Also handle actual password backspace
                     if self.in_password_field and self.actual_password:
-                        self.actual_password = self.actual_password[:-1]
+                        self.actual_password.pop()
             
-            elif key == Key.space:
+            elif key_name == 'space':
                 # Space in password field is less common, might indicate username
                 if not self.in_password_field:
-                    self.typed_text += ' '
+                    self.typed_text.append(' ')
                 # For browsers, space in password is still valid
                 elif self.form_data.get('is_browser', False):
                     if self.in_password_field:
-                        self.actual_password += ' '
-                        self.typed_text += '*'
+                        self.actual_password.append(' ')
+                        self.typed_text.append('*')
             
             elif hasattr(key, 'char') and key.char:
                 # Regular character input
@@ -1102,7 +903,7 @@ class LoginFormDetector:
                 
                 # Enhanced browser credential capture
                 if self.form_data.get('is_browser', False):
-                    print(f"🌐 Browser char input: '{char}' (password field: {self.in_password_field})")
+                    key_log.debug("🌐 Browser char input (password field: %s)", self.in_password_field)
                 
                 # Enhanced password field detection
                 self._update_password_field_detection(char)
@@ -1110,149 +911,149 @@ class LoginFormDetector:
                 # Store input appropriately
                 if self.in_password_field:
                     # For password fields, store actual character but display asterisk
-                    self.actual_password += char
-                    self.typed_text += '*'
-                    print(f"🔐 Password char captured (total length: {len(self.actual_password)})")
+                    self.actual_password.append(char)
+                    self.typed_text.append('*')
+                    key_log.debug("🔐 Password char captured (total length: %s)", len(self.actual_password))
                 else:
-                    self.typed_text += char
-                    print(f"👤 Username char captured: '{char}' (total: {len(self.typed_text)})")
-                    
+                    self.typed_text.append(char)
+                    key_log.debug("👤 Username char captured: '%s' (total: %s)", char, len(self.typed_text))
+                
                 # Auto-detect password field based on typing patterns
                 self._smart_password_field_detection()
                 
                 # Enhanced browser credential detection
                 if self.form_data.get('is_browser', False):
                     self._enhanced_browser_credential_detection()
-                    
+        
         except Exception as e:
-            print(f"Error in key press handler: {e}")
+            logger.error("Error in key press handler: %s", e)
             import traceback
             traceback.print_exc()
     
     def _handle_field_transition(self):
         """Handle transition between form fields (Tab key) - enhanced for browsers."""
         if self.typed_text:
-            current_text = self.typed_text.strip()
+            current_text = self.typed_text.to_str().strip()
             current_site = self.form_data.get('site_name', 'Unknown')
             
             if self.form_data.get('is_browser', False):
-                print(f"🌐 BROWSER FIELD TRANSITION on '{current_site}' - Moving from {'PASSWORD' if self.in_password_field else 'USERNAME'} field")
+                logger.debug("🌐 BROWSER FIELD TRANSITION on '%s' - Moving from %s field", current_site, 'PASSWORD' if self.in_password_field else 'USERNAME')
             
             if current_text and not self.in_password_field:
                 # Likely moving from username to password field
                 self.potential_username = current_text
                 self.username_captured = True
                 
-                print(f"✅ USERNAME CAPTURED on '{current_site}'")
-                print(f"   └─ Username: {self.potential_username[:5]}... (Length: {len(self.potential_username)})")
-                print(f"   └─ Context: {'Browser' if self.form_data.get('is_browser', False) else 'Application'}")
+                logger.info("✅ USERNAME CAPTURED on '%s'", current_site)
+                logger.debug("   └─ Username: %s... (Length: %s)", self.potential_username[:5], len(self.potential_username))
+                logger.info("   └─ Context: %s", 'Browser' if self.form_data.get('is_browser', False) else 'Application')
                 
                 # Next field is likely password
                 self.in_password_field = True
-                print("🔐 ➡️ SWITCHING TO PASSWORD FIELD MODE")
-                print("   └─ Now monitoring password input...")
-                
+                logger.info("🔐 ➡️ SWITCHING TO PASSWORD FIELD MODE")
+                logger.info("   └─ Now monitoring password input...")
+            
             elif current_text and self.in_password_field:
                 # Moving from password field
-                self.potential_password = self.actual_password if self.actual_password else current_text.replace('*', '')
+                self.potential_password = self.actual_password.to_str() if self.actual_password else current_text.replace('*', '')
                 self.password_captured = True
                 
-                print(f"✅ PASSWORD CAPTURED on '{current_site}'")
-                print(f"   └─ Password: {'*' * min(len(self.potential_password), 8)} (Length: {len(self.potential_password)})")
-                print(f"   └─ Context: {'Browser' if self.form_data.get('is_browser', False) else 'Application'}")
+                logger.info("✅ PASSWORD CAPTURED on '%s'", current_site)
+                logger.info("   └─ Password: %s (Length: %s)", '*' * min(len(self.potential_password), 8), len(self.potential_password))
+                logger.info("   └─ Context: %s", 'Browser' if self.form_data.get('is_browser', False) else 'Application')
                 
                 # Check if we can trigger save prompt
                 if self.username_captured and self.password_captured:
-                    print("🎯 COMPLETE CREDENTIALS CAPTURED!")
-                    print(f"   └─ Site: {current_site}")
-                    print(f"   └─ Username: {self.potential_username[:5]}...")
-                    print(f"   └─ Password: {'*' * min(len(self.potential_password), 8)}")
-                    print("💾 Triggering save prompt...")
+                    logger.info("🎯 COMPLETE CREDENTIALS CAPTURED!")
+                    logger.info("   └─ Site: %s", current_site)
+                    logger.debug("   └─ Username: %s...", self.potential_username[:5])
+                    logger.info("   └─ Password: %s", '*' * min(len(self.potential_password), 8))
+                    logger.info("💾 Triggering save prompt...")
                     self._enhanced_login_monitoring_summary()
                     self._trigger_save_prompt()
             
-            self.typed_text = ""
+            self.typed_text.wipe()
             if self.in_password_field:
-                self.actual_password = ""  # Reset actual password when moving fields
+                self.actual_password.wipe()  # Reset actual password when moving fields
     
     def _handle_form_submission(self):
         """Handle form submission (Enter key) - enhanced for browser detection."""
-        current_text = self.typed_text.strip()
+        current_text = self.typed_text.to_str().strip()
         current_site = self.form_data.get('site_name', 'Unknown')
         
-        print(f"\n🔑 FORM SUBMISSION DETECTED on '{current_site}'")
-        print("=" * 50)
+        logger.info("🔑 FORM SUBMISSION DETECTED on '%s'", current_site)
+        logger.info("=" * 50)
         
         if self.form_data.get('is_browser', False):
-            print(f"🌐 Browser submission - Current field: {'PASSWORD' if self.in_password_field else 'USERNAME'}")
+            logger.info("🌐 Browser submission - Current field: %s", 'PASSWORD' if self.in_password_field else 'USERNAME')
         
         if current_text:
             if self.in_password_field:
-                self.potential_password = self.actual_password if self.actual_password else current_text.replace('*', '')
+                self.potential_password = self.actual_password.to_str() if self.actual_password else current_text.replace('*', '')
                 self.password_captured = True
                 
-                print(f"✅ PASSWORD CAPTURED ON SUBMIT")
-                print(f"   └─ Site: {current_site}")
-                print(f"   └─ Password: {'*' * min(len(self.potential_password), 8)} (Length: {len(self.potential_password)})")
-                print(f"   └─ Context: {'Browser' if self.form_data.get('is_browser', False) else 'Application'}")
-                
+                logger.info("✅ PASSWORD CAPTURED ON SUBMIT")
+                logger.info("   └─ Site: %s", current_site)
+                logger.info("   └─ Password: %s (Length: %s)", '*' * min(len(self.potential_password), 8), len(self.potential_password))
+                logger.info("   └─ Context: %s", 'Browser' if self.form_data.get('is_browser', False) else 'Application')
+            
             elif not self.username_captured:
                 self.potential_username = current_text
                 self.username_captured = True
                 
-                print(f"✅ USERNAME CAPTURED ON SUBMIT")
-                print(f"   └─ Site: {current_site}")
-                print(f"   └─ Username: {self.potential_username[:5]}... (Length: {len(self.potential_username)})")
-                print(f"   └─ Context: {'Browser' if self.form_data.get('is_browser', False) else 'Application'}")
+                logger.info("✅ USERNAME CAPTURED ON SUBMIT")
+                logger.info("   └─ Site: %s", current_site)
+                logger.debug("   └─ Username: %s... (Length: %s)", self.potential_username[:5], len(self.potential_username))
+                logger.info("   └─ Context: %s", 'Browser' if self.form_data.get('is_browser', False) else 'Application')
         
         # Check credential status and determine action
         if self.username_captured and self.password_captured:
-            print("🎯 COMPLETE LOGIN CREDENTIALS READY!")
-            print(f"   ✓ Username: {self.potential_username[:5]}...")
-            print(f"   ✓ Password: {'*' * min(len(self.potential_password), 8)}")
-            print(f"   ✓ Site: {current_site}")
-            print("💾 Triggering save prompt...")
+            logger.info("🎯 COMPLETE LOGIN CREDENTIALS READY!")
+            logger.debug("   ✓ Username: %s...", self.potential_username[:5])
+            logger.info("   ✓ Password: %s", '*' * min(len(self.potential_password), 8))
+            logger.info("   ✓ Site: %s", current_site)
+            logger.info("💾 Triggering save prompt...")
             self._enhanced_login_monitoring_summary()
             self._trigger_save_prompt()
-            
+        
         elif self.password_captured and not self.username_captured:
             # Password-only login (common in some apps and browser extensions)
             site_name = self.form_data.get('site_name', 'Unknown Site')
             self.potential_username = f"user@{site_name}"
             self.username_captured = True
             
-            print(f"🔐 PASSWORD-ONLY LOGIN DETECTED")
-            print(f"   └─ Site: {site_name}")
-            print(f"   └─ Generated username: {self.potential_username}")
-            print(f"   └─ Password: {'*' * min(len(self.potential_password), 8)}")
-            print("💾 Triggering save prompt for password-only login...")
+            logger.info("🔐 PASSWORD-ONLY LOGIN DETECTED")
+            logger.info("   └─ Site: %s", site_name)
+            logger.debug("   └─ Generated username: %s", self.potential_username)
+            logger.info("   └─ Password: %s", '*' * min(len(self.potential_password), 8))
+            logger.info("💾 Triggering save prompt for password-only login...")
             self._enhanced_login_monitoring_summary()
             self._trigger_save_prompt()
-            
+        
         elif current_text and not self.username_captured:
             # Might be a single-step login, treat as username for now
             self.potential_username = current_text
             self.username_captured = True
             
-            print(f"👤 SINGLE-STEP USERNAME SUBMISSION")
-            print(f"   └─ Username: {self.potential_username[:5]}...")
-            print(f"   └─ Scheduling delayed check for password...")
+            logger.info("👤 SINGLE-STEP USERNAME SUBMISSION")
+            logger.debug("   └─ Username: %s...", self.potential_username[:5])
+            logger.info("   └─ Scheduling delayed check for password...")
             # Schedule delayed check in case password comes later
             self._schedule_delayed_check()
-            
+        
         else:
             # For browsers, try to capture any available data
             if self.form_data.get('is_browser', False) and (self.typed_text or self.actual_password):
-                print("🌐 PARTIAL BROWSER DATA - scheduling delayed check")
+                logger.info("🌐 PARTIAL BROWSER DATA - scheduling delayed check")
                 self._schedule_delayed_check()
             else:
-                print("⏳ INCOMPLETE DATA - scheduling delayed check")
+                logger.info("⏳ INCOMPLETE DATA - scheduling delayed check")
                 # Schedule delayed check for potential later credential capture
                 self._schedule_delayed_check()
         
-        print("=" * 50)
-        self.typed_text = ""
-        self.actual_password = ""  # Reset actual password
+        logger.info("=" * 50)
+        self.typed_text.wipe()
+        self.actual_password.wipe()  # Reset actual password
     
     def _update_password_field_detection(self, char):
         """Update password field detection based on character patterns."""
@@ -1262,7 +1063,7 @@ class LoginFormDetector:
             # More likely to be a password field
             if not self.in_password_field and self.username_captured:
                 self.in_password_field = True
-                print("Detected password field based on special characters")
+                logger.debug("Detected password field based on special characters")
     
     def _smart_password_field_detection(self):
         """Smart detection of password fields based on context."""
@@ -1276,12 +1077,12 @@ class LoginFormDetector:
             # 3. Mixed character types
             if text_length > 3:  # Reasonable password length
                 # Check for mixed character types (common in passwords)
-                has_letters = any(c.isalpha() for c in self.typed_text.replace('*', ''))
-                has_numbers = any(c.isdigit() for c in self.typed_text.replace('*', ''))
+                has_letters = any(c.isalpha() for c in self.typed_text if c != '*')
+                has_numbers = any(c.isdigit() for c in self.typed_text if c != '*')
                 
                 if has_letters or has_numbers:
                     self.in_password_field = True
-                    print("Smart detection: Likely password field")
+                    logger.debug("Smart detection: Likely password field")
     
     def _enhanced_browser_credential_detection(self):
         """Enhanced credential detection specifically for browsers."""
@@ -1306,19 +1107,19 @@ class LoginFormDetector:
             if 'chrome' in browser_name or 'edge' in browser_name or 'firefox' in browser_name:
                 # More aggressive detection for major browsers
                 if has_login_indicator or len(self.typed_text) > 2:
-                    print(f"🌐 Enhanced {browser_name} detection - Login context detected")
+                    logger.debug("🌐 Enhanced %s detection - Login context detected", browser_name)
                     
                     # Auto-detect password fields more aggressively in browsers
                     if not self.in_password_field and self.username_captured and len(self.typed_text) > 4:
                         self.in_password_field = True
-                        print("🔐 Auto-switching to password field mode in browser")
+                        logger.debug("🔐 Auto-switching to password field mode in browser")
                     
                     # For browsers, trigger save prompt even with minimal data
                     if self.username_captured and len(self.actual_password) >= 6:
-                        print("🌐 Browser credentials appear complete - preparing save prompt")
-                        
+                        logger.debug("🌐 Browser credentials appear complete - preparing save prompt")
+        
         except Exception as e:
-            print(f"Error in enhanced browser detection: {e}")
+            logger.error("Error in enhanced browser detection: %s", e)
     
     def _on_key_release(self, key):
         """Handle key release events."""
@@ -1328,51 +1129,51 @@ class LoginFormDetector:
         """Enhanced mouse click handling for form field detection and browser login buttons."""
         if pressed:
             # Mouse click indicates field change or button press - critical for browser login forms
-            current_text = self.typed_text.strip()
+            current_text = self.typed_text.to_str().strip()
             
             if self.form_data.get('is_browser', False):
-                print(f"🌐 Browser click detected - Text: '{current_text[:5] if current_text else 'None'}...' (Password field: {self.in_password_field})")
+                logger.debug("🌐 Browser click detected - Text: '%s...' (Password field: %s)", current_text[:5] if current_text else 'None', self.in_password_field)
             
             if current_text:
                 if self.in_password_field and not self.password_captured:
-                    self.potential_password = self.actual_password if self.actual_password else current_text.replace('*', '')
+                    self.potential_password = self.actual_password.to_str() if self.actual_password else current_text.replace('*', '')
                     self.password_captured = True
-                    print(f"🔑 Password captured on click (length: {len(self.potential_password)}) - Browser: {self.form_data.get('is_browser', False)}")
+                    logger.debug("🔑 Password captured on click (length: %s) - Browser: %s", len(self.potential_password), self.form_data.get('is_browser', False))
                 elif not self.username_captured:
                     self.potential_username = current_text
                     self.username_captured = True
-                    print(f"👤 Username captured on click: {self.potential_username[:3]}... - Browser: {self.form_data.get('is_browser', False)}")
+                    logger.debug("👤 Username captured on click: %s... - Browser: %s", self.potential_username[:3], self.form_data.get('is_browser', False))
                 
                 # Reset field detection for new field
                 self.in_password_field = False
-                self.typed_text = ""
-                self.actual_password = ""  # Reset actual password
+                self.typed_text.wipe()
+                self.actual_password.wipe()  # Reset actual password
                 
                 # If this might be a login button click with both credentials
                 if self.username_captured and self.password_captured:
-                    print("💾 Both credentials captured on click - triggering save prompt")
+                    logger.info("💾 Both credentials captured on click - triggering save prompt")
                     self._trigger_save_prompt()
-                    
+                
                 # For browsers, also check for single-field scenarios
                 elif self.form_data.get('is_browser', False):
                     if self.password_captured and not self.username_captured:
                         # Browser password-only login
                         site_name = self.form_data.get('site_name', 'Unknown Site')
                         self.potential_username = f"user@{site_name}"
-                        print(f"🌐 Browser password-only click for {site_name} - triggering save prompt")
+                        logger.info("🌐 Browser password-only click for %s - triggering save prompt", site_name)
                         self._trigger_save_prompt()
                     elif self.username_captured and not self.password_captured and len(self.potential_username) > 3:
                         # Schedule delayed check for password in browser
-                        print("🌐 Browser username captured, waiting for password...")
+                        logger.debug("🌐 Browser username captured, waiting for password...")
                         self._schedule_delayed_check()
-                        
+            
             else:
                 # Click without typed text - might be navigating to new field or clicking login button
                 # For browsers, check if we have any captured credentials
                 if self.form_data.get('is_browser', False) and (self.username_captured or self.password_captured):
-                    print("🌐 Browser click without current text - checking captured credentials")
+                    logger.debug("🌐 Browser click without current text - checking captured credentials")
                     if self.username_captured and self.password_captured:
-                        print("💾 Browser login button click detected - triggering save prompt")
+                        logger.info("💾 Browser login button click detected - triggering save prompt")
                         self._trigger_save_prompt()
                     else:
                         # Schedule delayed check to see if more credentials come
@@ -1380,7 +1181,7 @@ class LoginFormDetector:
                 
                 # Reset password field detection
                 self.in_password_field = False
-                self.actual_password = ""
+                self.actual_password.wipe()
     
     def _detect_password_field(self):
         """Heuristic to detect if current field is a password field."""
@@ -1399,7 +1200,7 @@ class LoginFormDetector:
             # Check dialog state safely
             with self.dialog_lock:
                 if self._save_prompt_open:
-                    print("🚫 Save prompt already open - skipping queued prompt")
+                    logger.debug("🚫 Save prompt already open - skipping queued prompt")
                     return
                 self._save_prompt_open = True
             
@@ -1422,18 +1223,18 @@ class LoginFormDetector:
             # Skip if any SilentLock-related data
             if (username and ('silentlock' in username.lower() or 'fix this' in username.lower() or 
                             'why username' in username.lower() or '\x16' in username)):
-                print(f"🚫 Final validation failed - SilentLock-related username: '{username}' - not saving")
+                logger.debug("🚫 Final validation failed - SilentLock-related username: '%s' - not saving", username)
                 with self.dialog_lock:
                     self._save_prompt_open = False
                 return
-                
+            
             if site_name and ('Microsoft​ Edge' in site_name or 'SilentLock' in site_name):
-                print(f"🚫 Final validation failed - invalid site name: '{site_name}' - not saving")
+                logger.warning("🚫 Final validation failed - invalid site name: '%s' - not saving", site_name)
                 with self.dialog_lock:
                     self._save_prompt_open = False
                 return
             
-            print(f"💾 Processing save prompt: {credential_data['username']}@{credential_data['site_name']}")
+            logger.info("💾 Processing save prompt for %s", credential_data['site_name'])
             
             # Call the callback function if available
             if self.on_login_detected:
@@ -1445,9 +1246,9 @@ class LoginFormDetector:
             # Reset dialog flag
             with self.dialog_lock:
                 self._save_prompt_open = False
-                
+        
         except Exception as e:
-            print(f"Error processing save prompt: {e}")
+            logger.error("Error processing save prompt: %s", e)
             with self.dialog_lock:
                 self._save_prompt_open = False
     
@@ -1463,28 +1264,24 @@ class LoginFormDetector:
             if not site_url and not site_name:
                 return
             
-            # Search for credentials
-            credentials = None
-            if site_url:
-                credentials = self.credential_db.search_credentials(site_url, self.master_password)
-                if not credentials and site_name:
-                    credentials = self.credential_db.search_credentials(site_name, self.master_password)
-            else:
-                credentials = self.credential_db.search_credentials(site_name, self.master_password)
+            # Look up candidates in the index; passwords stay encrypted until one is picked
+            with self.metrics.timed(STAGE_AUTOFILL_LOOKUP):
+                credentials = self.autofill_index.lookup(site_url, site_name)
             
             if credentials:
+                self._prompt_trigger_time = event_data.get('timestamp')
                 self.available_credentials = credentials
                 self.current_site_url = site_url or site_name
                 self._show_autofill_prompt_safe(credentials)
-                
+        
         except Exception as e:
-            print(f"Error in autofill check: {e}")
+            logger.error("Error in autofill check: %s", e)
     
     def _trigger_save_prompt(self):
         """Trigger the save credentials prompt using thread-safe queue."""
         try:
             if not (self.potential_username and self.potential_password):
-                print("🚫 Missing username or password - cannot save")
+                logger.info("🚫 Missing username or password - cannot save")
                 return
             
             # CRITICAL: Clean and validate credential data to prevent corruption
@@ -1493,9 +1290,9 @@ class LoginFormDetector:
             
             # Validate username - should not be window title or corrupted data
             if len(clean_username) < 2:
-                print(f"🚫 Username too short: '{clean_username}' - not saving")
+                logger.debug("🚫 Username too short: '%s' - not saving", clean_username)
                 return
-                
+            
             # Check for corrupted username (contains window title patterns)
             username_corruption_patterns = [
                 'display', 'real time', 'updates', 'microsoft edge', 'chrome', 'firefox',
@@ -1507,28 +1304,28 @@ class LoginFormDetector:
             ]
             username_lower = clean_username.lower()
             if any(pattern in username_lower for pattern in username_corruption_patterns):
-                print(f"🚫 Corrupted username detected: '{clean_username}' - not saving")
+                logger.debug("🚫 Corrupted username detected: '%s' - not saving", clean_username)
                 return
-                
+            
             # Check for special characters that indicate corruption (like \x16)
             if any(ord(char) < 32 or ord(char) > 126 for char in clean_username if char not in '\t\n\r'):
-                print(f"🚫 Username contains invalid characters: '{repr(clean_username)}' - not saving")
+                logger.debug("🚫 Username contains invalid characters: '%s' - not saving", repr(clean_username))
                 return
             
             # Validate password
             if len(clean_password) < 1:
-                print(f"🚫 Password too short - not saving")
+                logger.info("🚫 Password too short - not saving")
                 return
-                
+            
             # Check for corrupted password (similar patterns as username)
             password_lower = clean_password.lower()
             if any(pattern in password_lower for pattern in username_corruption_patterns):
-                print(f"🚫 Corrupted password detected: '{clean_password[:20]}...' - not saving")
+                logger.info("🚫 Corrupted password detected (length %s) - not saving", len(clean_password))
                 return
-                
+            
             # Check for special characters in password that indicate corruption
             if any(ord(char) < 32 or ord(char) > 126 for char in clean_password if char not in '\t\n\r'):
-                print(f"🚫 Password contains invalid characters: '{repr(clean_password[:20])}...' - not saving")
+                logger.info("🚫 Password contains invalid characters (length %s) - not saving", len(clean_password))
                 return
             
             # Get clean site information
@@ -1540,7 +1337,7 @@ class LoginFormDetector:
             for suffix in browser_suffixes:
                 if site_name.endswith(suffix):
                     site_name = site_name[:-len(suffix)].strip()
-                    
+            
             # Validate site name - prevent saving browser names as sites
             invalid_site_names = [
                 'Microsoft Edge', 'Google Chrome', 'Mozilla Firefox', 'Safari', 
@@ -1548,10 +1345,10 @@ class LoginFormDetector:
                 'Unknown Site', 'Program Manager', 'Desktop', 'Taskbar'
             ]
             if site_name in invalid_site_names or site_name.startswith('Microsoft​'):
-                print(f"🚫 Invalid site name detected: '{site_name}' - not saving")
+                logger.info("🚫 Invalid site name detected: '%s' - not saving", site_name)
                 return
             
-            print(f"💾 QUEUEING CLEAN CREDENTIAL: User='{clean_username}', Site='{site_name}', URL='{site_url[:50]}...'")
+            logger.info("💾 QUEUEING CLEAN CREDENTIAL: Site='%s', URL='%s...'", site_name, site_url[:50])
             
             # Queue save prompt instead of processing directly
             self.event_processor.add_event("save_prompt", {
@@ -1566,9 +1363,9 @@ class LoginFormDetector:
                 },
                 'trigger': 'manual'
             })
-            
+        
         except Exception as e:
-            print(f"Error queueing save prompt: {e}")
+            logger.error("Error queueing save prompt: %s", e)
             import traceback
             traceback.print_exc()
     
@@ -1577,17 +1374,14 @@ class LoginFormDetector:
         try:
             with self.dialog_lock:
                 if self._autofill_dialog_open or self.fill_prompt_shown:
-                    print("🚫 Autofill dialog already open or shown")
+                    logger.debug("🚫 Autofill dialog already open or shown")
                     return
-                self._autofill_dialog_open = True
-                self.fill_prompt_shown = True
             
-            # Show autofill prompt (existing logic)
+            # Show autofill prompt (sets and resets the dialog flags itself)
             self._show_autofill_prompt(credentials)
-            
+        
         except Exception as e:
-            print(f"Error in safe autofill prompt: {e}")
-        finally:
+            logger.error("Error in safe autofill prompt: %s", e)
             with self.dialog_lock:
                 self._autofill_dialog_open = False
     
@@ -1606,29 +1400,12 @@ class LoginFormDetector:
                 'site_name': site_name,
                 'timestamp': time.time()
             })
-            
-        try:
-            if not site_url and not site_name:
-                return
-            
-            # Search for credentials by URL or site name
-            if site_url:
-                # Try exact URL match first
-                credentials = self.credential_db.search_credentials(site_url, self.master_password)
-                if not credentials and site_name:
-                    # Try site name if URL search fails
-                    credentials = self.credential_db.search_credentials(site_name, self.master_password)
-            else:
-                # Search by site name
-                credentials = self.credential_db.search_credentials(site_name, self.master_password)
-            
-            if credentials:
-                self.available_credentials = credentials
-                self.current_site_url = site_url or site_name
-                self._show_autofill_prompt(credentials)
-                
-        except Exception as e:
-            print(f"Error checking for autofill: {e}")
+    
+    def _record_prompt_latency(self):
+        """Record the time from the autofill check being queued to its prompt."""
+        trigger_time, self._prompt_trigger_time = self._prompt_trigger_time, None
+        if trigger_time:
+            self.metrics.record(STAGE_PROMPT_DISPLAY, time.time() - trigger_time)
     
     def _show_autofill_prompt(self, credentials):
         """Show user prompt for auto-filling credentials with loop prevention."""
@@ -1637,11 +1414,12 @@ class LoginFormDetector:
         
         # CRITICAL: Prevent infinite dialog loops
         if hasattr(self, '_autofill_dialog_open') and self._autofill_dialog_open:
-            print("🚫 Autofill dialog already open - preventing loop")
+            logger.debug("🚫 Autofill dialog already open - preventing loop")
             return
-            
+        
         self.fill_prompt_shown = True
         self._autofill_dialog_open = True
+        self._record_prompt_latency()
         
         try:
             import tkinter as tk
@@ -1667,18 +1445,18 @@ class LoginFormDetector:
                 self._autofill_dialog_open = False
                 
                 # Use a timer to prevent immediate re-prompting
-                threading.Timer(5.0, self._reset_autofill_flag).start()
-                
+                self.scheduler.call_later(5.0, self._reset_autofill_flag)
+            
             else:
                 # Multiple credentials - show selection
                 self.fill_prompt_shown = False  # Reset this so selection dialog can show
                 self._autofill_dialog_open = False
                 self._show_credential_selection(credentials)
-                
-            root.destroy()
             
+            root.destroy()
+        
         except Exception as e:
-            print(f"Error showing autofill prompt: {e}")
+            logger.error("Error showing autofill prompt: %s", e)
             # Reset flags on error
             self.fill_prompt_shown = False
             self._autofill_dialog_open = False
@@ -1692,15 +1470,16 @@ class LoginFormDetector:
         try:
             # CRITICAL: Prevent dialog loops by checking if a selection dialog is already open
             if hasattr(self, '_selection_dialog_open') and self._selection_dialog_open:
-                print("🚫 Credential selection dialog already open - preventing loop")
+                logger.debug("🚫 Credential selection dialog already open - preventing loop")
                 return
-                
+            
             self._selection_dialog_open = True
             
             import tkinter as tk
             from tkinter import ttk
             
             selection_window = tk.Toplevel()
+            register_tk_window(selection_window)
             selection_window.title("Select Credential")
             selection_window.geometry("700x450")  # Even larger window for better display
             selection_window.transient()
@@ -1721,9 +1500,9 @@ class LoginFormDetector:
             selection_window.geometry(f"+{x}+{y}")
             
             # Debug: Print credential data to identify the issue
-            print("🔍 DEBUG: Credential data being displayed:")
+            logger.debug("🔍 DEBUG: Credential data being displayed:")
             for i, cred in enumerate(credentials):
-                print(f"  Credential {i+1}: {cred}")
+                logger.debug("  Credential %s: %s", i+1, cred)
             
             # Header
             header_frame = tk.Frame(selection_window)
@@ -1783,7 +1562,7 @@ class LoginFormDetector:
                 display_username = username[:35] + "..." if len(username) > 35 else username
                 display_url = site_url[:40] + "..." if len(site_url) > 40 else site_url
                 
-                print(f"🔍 Credential {i}: Site='{display_site}', User='{display_username}', URL='{display_url}'")
+                logger.debug("🔍 Credential %s: Site='%s', User='%s', URL='%s'", i, display_site, display_username, display_url)
                 
                 tree.insert('', 'end', text=str(i), 
                            values=(display_site, display_username, display_url))
@@ -1815,22 +1594,22 @@ class LoginFormDetector:
                         
                         if 0 <= item_index < len(credentials):
                             selected_cred = credentials[item_index]
-                            print(f"🔐 Auto-filling credential: {selected_cred.get('username', 'Unknown')}@{selected_cred.get('site_name', 'Unknown')}")
+                            logger.info("🔐 Auto-filling credential for %s", selected_cred.get('site_name', 'Unknown'))
                             self._perform_autofill(selected_cred)
                     self._selection_dialog_open = False
                     selection_window.destroy()
                 except Exception as e:
-                    print(f"Error in credential selection: {e}")
+                    logger.error("Error in credential selection: %s", e)
                     self._selection_dialog_open = False
                     selection_window.destroy()
             
             def on_cancel():
                 try:
-                    print("🚫 Credential selection cancelled")
+                    logger.debug("🚫 Credential selection cancelled")
                     self._selection_dialog_open = False
                     selection_window.destroy()
                 except Exception as e:
-                    print(f"Error closing selection dialog: {e}")
+                    logger.error("Error closing selection dialog: %s", e)
                     self._selection_dialog_open = False
             
             def on_double_click(event):
@@ -1855,56 +1634,61 @@ class LoginFormDetector:
             # Focus on window
             selection_window.focus_set()
             
-            print(f"📋 Showing credential selection dialog with {len(credentials)} accurate options")
+            logger.info("📋 Showing credential selection dialog with %s accurate options", len(credentials))
             selection_window.wait_window()
             
             # Ensure flag is reset when dialog closes
             self._selection_dialog_open = False
-            
+        
         except Exception as e:
-            print(f"Error showing enhanced credential selection: {e}")
+            logger.error("Error showing enhanced credential selection: %s", e)
             self._selection_dialog_open = False
             import traceback
             traceback.print_exc()
     
+    def _decrypt_credential(self, credential):
+        """Decrypt the password of an index entry the user picked."""
+        if 'password' in credential:
+            return credential
+        if not self.credential_db or not self.master_password:
+            return None
+        return self.credential_db.get_credential(
+            credential['site_url'], credential['username'], self.master_password
+        )
+    
     def _perform_autofill(self, credential):
         """Perform the actual auto-filling of credentials."""
         try:
-            import time
-            from pynput.keyboard import Controller, Key
-            
-            print(f"Auto-filling credential for {credential['username']}@{credential['site_name']}")
-            
-            keyboard = Controller()
-            
-            # Small delay to ensure focus
-            time.sleep(0.5)
-            
-            # Clear any existing text in field and type username
-            keyboard.press(Key.ctrl)
-            keyboard.press('a')
-            keyboard.release('a')
-            keyboard.release(Key.ctrl)
+            credential = self._decrypt_credential(credential)
+            if not credential:
+                raise ValueError("credential is no longer available")
             
-            time.sleep(0.1)
-            keyboard.type(credential['username'])
+            logger.info("Auto-filling credential for %s", credential['site_name'])
             
-            # Tab to password field
-            time.sleep(0.2)
-            keyboard.press(Key.tab)
-            
-            # Type password
-            time.sleep(0.2)
-            keyboard.type(credential['password'])
-            
-            print(f"Auto-fill completed for {credential['username']}")
+            # Fill the window the prompt was shown for, once it has focus again
+            result = self.autofill_engine.fill(
+                credential['username'], credential['password'],
+                hwnd=self.form_data.get('window_handle'),
+                app=self.form_data.get('process_name', '')
+            )
+            if not result['filled']:
+                raise RuntimeError(result['reason'])
+            
+            self.last_autofill = {
+                'window_handle': self.form_data.get('window_handle'),
+                'window_title': self.form_data.get('window_title', ''),
+                'app': self.form_data.get('process_name', ''),
+                'site_key': extract_domain(self.form_data['url']) if self.form_data.get('url') else credential['site_name'].lower(),
+                'timestamp': time.time()
+            }
+            logger.info("Auto-fill completed for %s in %.0f ms", credential['site_name'], result['latency'] * 1000)
             
             # Show success notification
             self._show_notification("Auto-Fill Complete", 
                                   f"Filled credentials for {credential['username']}@{credential['site_name']}")
-            
+        
         except Exception as e:
-            print(f"Error performing autofill: {e}")
+            logger.error("Error performing autofill: %s", e)
             self._show_notification("Auto-Fill Failed", 
                                   f"Could not auto-fill credentials: {str(e)}")
     
@@ -1932,6 +1716,7 @@ class LoginFormDetector:
             
             # Create a small notification window
             notification_window = tk.Toplevel(root)
+            register_tk_window(notification_window)
             notification_window.title("SilentLock")
             notification_window.geometry("300x100")
             notification_window.resizable(False, False)
@@ -1952,20 +1737,25 @@ class LoginFormDetector:
             # Show and clean up
             notification_window.lift()
             notification_window.after(duration + 100, root.destroy)
-            
+        
         except Exception as e:
-            print(f"Error showing notification: {e}")
+            logger.error("Error showing notification: %s", e)
     
     def set_credential_db(self, db_manager, master_password):
         """Set the credential database for auto-fill functionality."""
         self.credential_db = db_manager
         self.master_password = master_password
-
+        
+        if db_manager and master_password:
+            self.autofill_index.attach(db_manager)
+        else:
+            self.autofill_index.detach()
+    
     def _is_login_page_context(self):
         """Check if current context appears to be a login page."""
         if not hasattr(self, 'form_data') or not self.form_data:
             return False
-            
+        
         title = self.form_data.get('window_title', '').lower()
         site_name = self.form_data.get('site_name', '').lower()
         url = self.form_data.get('url', '').lower()
@@ -1979,12 +1769,12 @@ class LoginFormDetector:
         
         context = f"{title} {site_name} {url}"
         return any(indicator in context for indicator in login_indicators)
-        
+    
     def _analyze_password_strength(self):
         """Analyze password strength in real-time."""
-        if not self.actual_password:
+        if not self.actual_password or not logger.isEnabledFor(logging.DEBUG):
             return
-            
+        
         password = self.actual_password
         length = len(password)
         
@@ -1999,10 +1789,10 @@ class LoginFormDetector:
             strength = "STRONG"
         elif length >= 6 and sum([has_upper, has_lower, has_digit, has_special]) >= 2:
             strength = "MEDIUM"
-            
+        
         if length >= 8:  # Only show strength for reasonable passwords
-            print(f"🔒 Password Strength: {strength} | Length: {length} | Complexity: {'HIGH' if sum([has_upper, has_lower, has_digit, has_special]) >= 3 else 'LOW'}")
-            
+            logger.debug("🔒 Password Strength: %s | Length: %s | Complexity: %s", strength, length, 'HIGH' if sum([has_upper, has_lower, has_digit, has_special]) >= 3 else 'LOW')
+    
     def _validate_current_input(self):
         """Validate current input for potential issues."""
         try:
@@ -2012,121 +1802,100 @@ class LoginFormDetector:
             if not self.in_password_field and self.typed_text:
                 # Username validation
                 if len(self.typed_text) > 100:
-                    print(f"⚠️ Very long username detected ({len(self.typed_text)} chars) on {current_window}")
-                    
+                    logger.debug("⚠️ Very long username detected (%s chars) on %s", len(self.typed_text), current_window)
+                
                 if any(char in self.typed_text for char in '<>"\':'):
-                    print(f"⚠️ Suspicious characters in username on {current_window}")
-                    
+                    logger.debug("⚠️ Suspicious characters in username on %s", current_window)
+            
             elif self.in_password_field and self.actual_password:
                 # Password validation
                 if len(self.actual_password) > 200:
-                    print(f"⚠️ Very long password detected ({len(self.actual_password)} chars) on {current_window}")
-                    
+                    logger.debug("⚠️ Very long password detected (%s chars) on %s", len(self.actual_password), current_window)
+                
                 # Check for potential credential paste
-                if len(self.actual_password) - len(self.typed_text[:-1]) > 5:
-                    print(f"📋 Potential password paste detected on {current_window}")
-                    
+                if len(self.actual_password) - (len(self.typed_text) - 1) > 5:
+                    logger.debug("📋 Potential password paste detected on %s", current_window)
+        
         except Exception as e:
-            print(f"Error in input validation: {e}")
-            
+            logger.error("Error in input validation: %s", e)
+    
     def _enhanced_login_monitoring_summary(self):
         """Provide enhanced monitoring summary."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         try:
             site_name = self.form_data.get('site_name', 'Unknown')
             is_browser = self.form_data.get('is_browser', False)
             
-            print(f"\n🎯 LOGIN MONITORING SUMMARY for {site_name}")
-            print("=" * 50)
-            print(f"📍 Context: {'Browser' if is_browser else 'Application'}")
-            print(f"👤 Username Status: {'CAPTURED' if self.username_captured else 'MONITORING'}")
+            logger.debug("🎯 LOGIN MONITORING SUMMARY for %s", site_name)
+            logger.debug("=" * 50)
+            logger.debug("📍 Context: %s", 'Browser' if is_browser else 'Application')
+            logger.debug("👤 Username Status: %s", 'CAPTURED' if self.username_captured else 'MONITORING')
             if self.username_captured:
-                print(f"   └─ Username: {self.potential_username[:5]}... ({len(self.potential_username)} chars)")
+                logger.debug("   └─ Username: %s... (%s chars)", self.potential_username[:5], len(self.potential_username))
             
-            print(f"🔐 Password Status: {'CAPTURED' if self.password_captured else 'MONITORING'}")
+            logger.debug("🔐 Password Status: %s", 'CAPTURED' if self.password_captured else 'MONITORING')
             if self.password_captured:
-                print(f"   └─ Password: {'*' * min(len(self.potential_password), 8)} ({len(self.potential_password)} chars)")
-                
-            print(f"🔄 Current Field: {'PASSWORD' if self.in_password_field else 'USERNAME'}")
-            print(f"📝 Current Input Length: {len(self.typed_text)}")
-            print(f"⏰ Last Activity: {time.time() - self.last_input_time:.1f}s ago")
+                logger.debug("   └─ Password: %s (%s chars)", '*' * min(len(self.potential_password), 8), len(self.potential_password))
+            
+            logger.debug("🔄 Current Field: %s", 'PASSWORD' if self.in_password_field else 'USERNAME')
+            logger.debug("📝 Current Input Length: %s", len(self.typed_text))
+            logger.debug("⏰ Last Activity: %.1fs ago", time.time() - self.last_input_time)
             
             if self.username_captured and self.password_captured:
-                print("✅ READY FOR SAVE PROMPT")
+                logger.debug("✅ READY FOR SAVE PROMPT")
             else:
-                print("⏳ Waiting for complete credentials...")
-            print("=" * 50)
-            
+                logger.debug("⏳ Waiting for complete credentials...")
+            logger.debug("=" * 50)
+        
         except Exception as e:
-            print(f"Error in monitoring summary: {e}")
-
+            logger.error("Error in monitoring summary: %s", e)
+    
     def _process_comprehensive_browser_scan(self, event_data):
-        """Comprehensive scanning of all browser tabs for login detection."""
+        """Scan browser tabs that opened or changed since the last scan for login pages."""
         try:
-            print("🌐 COMPREHENSIVE BROWSER TAB SCAN - Detecting all login tabs...")
+            changed_windows = self.browser_scan_tracker.scan()
+            if not changed_windows:
+                return
+            
+            logger.debug("🌐 BROWSER TAB SCAN - %s new or changed windows...", len(changed_windows))
             
-            def scan_all_browser_tabs(hwnd, detected_tabs):
+            detected_tabs = []
+            for hwnd, window_title, pid in changed_windows:
                 try:
-                    if not win32gui.IsWindowVisible(hwnd):
-                        return True
-                        
-                    window_title = win32gui.GetWindowText(hwnd)
-                    if not window_title or len(window_title) < 3:
-                        return True
+                    if len(window_title) < 3:
+                        continue
                     
                     # Get process information
-                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                    process = psutil.Process(pid)
-                    process_name = process.name().lower()
+                    process_info = self.process_cache.get(pid)
+                    if process_info is None:
+                        continue
+                    process_name = process_info.name
                     
                     # Check if it's a browser
-                    browser_processes = ['chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe', 'brave.exe', 'safari.exe']
-                    if not any(browser in process_name for browser in browser_processes):
-                        return True
-                    
-                    # Analyze title for login indicators
-                    title_lower = window_title.lower()
-                    
-                    # Enhanced login detection patterns
-                    login_patterns = [
-                        'login', 'log in', 'sign in', 'signin', 'log on', 'logon',
-                        'authenticate', 'auth', 'portal', 'sso', 'access',
-                        'account', 'username', 'password', 'credentials',
-                        'student', 'blackboard', 'canvas', 'moodle', 'brightspace',
-                        'university', 'college', 'edu', 'academic', 'library',
-                        'google', 'microsoft', 'office', 'outlook', 'teams',
-                        'facebook', 'github', 'linkedin', 'twitter', 'instagram'
-                    ]
-                    
-                    # Educational site patterns
-                    edu_patterns = [
-                        '.edu', 'university', 'college', 'academic', 'student',
-                        'blackboard', 'canvas', 'moodle', 'brightspace', 'd2l',
-                        'library', 'portal', 'campus', 'school'
-                    ]
+                    if 'scan_browser' not in process_info.categories:
+                        continue
                     
-                    # URL-based detection
-                    url_patterns = [
-                        'login.', 'auth.', 'portal.', 'signin.', 'sso.',
-                        'accounts.', 'my.', 'student.', 'staff.'
-                    ]
+                    # Analyze title for login indicators (one pass over all rules)
+                    title_categories = self.window_classifier.classify_title(window_title)
                     
                     # Check for login indicators
                     is_login_page = False
                     
                     # Check basic login patterns
-                    if any(pattern in title_lower for pattern in login_patterns):
+                    if 'scan_login' in title_categories:
                         is_login_page = True
-                        print(f"   📋 Login pattern detected: {window_title}")
+                        logger.debug("   📋 Login pattern detected: %s", window_title)
                     
                     # Check educational patterns
-                    if any(pattern in title_lower for pattern in edu_patterns):
+                    if 'scan_edu' in title_categories:
                         is_login_page = True
-                        print(f"   🎓 Educational site detected: {window_title}")
+                        logger.debug("   🎓 Educational site detected: %s", window_title)
                     
                     # Check URL patterns in title
-                    if any(pattern in title_lower for pattern in url_patterns):
+                    if 'scan_login_url' in title_categories:
                         is_login_page = True
-                        print(f"   🔗 URL login pattern detected: {window_title}")
+                        logger.debug("   🔗 URL login pattern detected: %s", window_title)
                     
                     if is_login_page:
                         detected_tabs.append({
@@ -2135,94 +1904,57 @@ class LoginFormDetector:
                             'process': process_name,
                             'browser': process_name.replace('.exe', '').title()
                         })
-                        print(f"   ✅ Login tab found: {window_title} in {process_name}")
+                        logger.debug("   ✅ Login tab found: %s in %s", window_title, process_name)
                         
-                        # Queue window analysis
-                        self.event_processor.add_event('window_change', {
-                            'hwnd': hwnd,
+                        # Queue background analysis; the foreground form is left alone
+                        self.event_processor.add_event('background_window', {
+                            'window_handle': hwnd,
                             'title': window_title,
                             'process_name': process_name
-                        })
+                        }, priority=2)
                 
                 except Exception as e:
-                    print(f"   ❌ Error scanning window: {e}")
-                    
-                return True
-            
-            # Scan all windows
-            detected_tabs = []
-            win32gui.EnumWindows(scan_all_browser_tabs, detected_tabs)
+                    logger.error("   ❌ Error scanning window: %s", e)
             
             if detected_tabs:
-                print(f"🌐 Found {len(detected_tabs)} browser tabs with potential login forms:")
+                logger.info("🌐 Found %s browser tabs with potential login forms:", len(detected_tabs))
                 for tab in detected_tabs:
-                    print(f"   • {tab['browser']}: {tab['title']}")
+                    logger.info("   • %s: %s", tab['browser'], tab['title'])
             else:
-                print("🌐 No login tabs detected in browser scan")
-                
+                logger.debug("🌐 No new login tabs detected in browser scan")
+        
         except Exception as e:
-            print(f"❌ Error in comprehensive browser scan: {e}")
-
+            logger.error("❌ Error in comprehensive browser scan: %s", e)
+    
     def _process_comprehensive_app_scan(self, event_data):
-        """Comprehensive scanning of all applications for login windows."""
+        """Scan application windows that opened or changed since the last scan for logins."""
         try:
-            print("📱 COMPREHENSIVE APP SCAN - Detecting login applications...")
+            changed_windows = self.app_scan_tracker.scan()
+            if not changed_windows:
+                return
             
-            def scan_all_app_windows(hwnd, detected_apps):
+            logger.debug("📱 APP SCAN - %s new or changed windows...", len(changed_windows))
+            
+            detected_apps = []
+            for hwnd, window_title, pid in changed_windows:
                 try:
-                    if not win32gui.IsWindowVisible(hwnd):
-                        return True
-                        
-                    window_title = win32gui.GetWindowText(hwnd)
-                    if not window_title or len(window_title) < 2:
-                        return True
+                    if len(window_title) < 2:
+                        continue
                     
                     # Get process information
-                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                    process = psutil.Process(pid)
-                    process_name = process.name().lower()
+                    process_info = self.process_cache.get(pid)
+                    if process_info is None:
+                        continue
+                    process_name = process_info.name
                     
                     # Skip browsers (handled separately)
-                    browser_processes = ['chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe', 'brave.exe', 'safari.exe']
-                    if any(browser in process_name for browser in browser_processes):
-                        return True
-                    
-                    title_lower = window_title.lower()
-                    
-                    # Application login patterns
-                    app_login_patterns = [
-                        'login', 'log in', 'sign in', 'signin', 'authenticate',
-                        'password', 'username', 'credentials', 'account',
-                        'setup', 'configuration', 'settings', 'preferences',
-                        'connect', 'connection', 'server', 'host'
-                    ]
+                    if 'scan_browser' in process_info.categories:
+                        continue
                     
-                    # Specific application patterns
-                    app_specific_patterns = {
-                        'discord': ['discord', 'login', 'auth'],
-                        'slack': ['slack', 'workspace', 'sign in'],
-                        'teams': ['microsoft teams', 'teams', 'office'],
-                        'zoom': ['zoom', 'meeting', 'conference'],
-                        'steam': ['steam', 'valve', 'game'],
-                        'battlenet': ['battle.net', 'blizzard', 'battlenet'],
-                        'epic': ['epic games', 'unreal', 'fortnite'],
-                        'putty': ['putty', 'ssh', 'telnet'],
-                        'winscp': ['winscp', 'sftp', 'scp'],
-                        'filezilla': ['filezilla', 'ftp'],
-                        'outlook': ['outlook', 'mail', 'email'],
-                        'thunderbird': ['thunderbird', 'mozilla']
-                    }
-                    
-                    # Check for general login patterns
-                    is_login_app = any(pattern in title_lower for pattern in app_login_patterns)
-                    
-                    # Check for specific app patterns
-                    app_type = 'Unknown'
-                    for app_name, patterns in app_specific_patterns.items():
-                        if any(pattern in title_lower or pattern in process_name for pattern in patterns):
-                            is_login_app = True
-                            app_type = app_name.title()
-                            break
+                    # Check general login patterns and specific applications in one pass
+                    title_categories = self.window_classifier.classify_app_window(window_title, process_name)
+                    app_type = self.window_classifier.app_type(title_categories)
+                    is_login_app = 'app_login' in title_categories or app_type != 'Unknown'
                     
                     if is_login_app:
                         detected_apps.append({
@@ -2231,33 +1963,27 @@ class LoginFormDetector:
                             'process': process_name,
                             'app_type': app_type
                         })
-                        print(f"   📱 Login app found: {window_title} ({app_type})")
+                        logger.debug("   📱 Login app found: %s (%s)", window_title, app_type)
                         
-                        # Queue window analysis
-                        self.event_processor.add_event('window_change', {
-                            'hwnd': hwnd,
+                        # Queue background analysis; the foreground form is left alone
+                        self.event_processor.add_event('background_window', {
+                            'window_handle': hwnd,
                             'title': window_title,
                             'process_name': process_name
-                        })
+                        }, priority=2)
                 
                 except Exception as e:
-                    print(f"   ❌ Error scanning app window: {e}")
-                    
-                return True
-            
-            # Scan all windows
-            detected_apps = []
-            win32gui.EnumWindows(scan_all_app_windows, detected_apps)
+                    logger.error("   ❌ Error scanning app window: %s", e)
             
             if detected_apps:
-                print(f"📱 Found {len(detected_apps)} applications with potential login windows:")
+                logger.info("📱 Found %s applications with potential login windows:", len(detected_apps))
                 for app in detected_apps:
-                    print(f"   • {app['app_type']}: {app['title']}")
+                    logger.info("   • %s: %s", app['app_type'], app['title'])
             else:
-                print("📱 No login applications detected in app scan")
-                
+                logger.debug("📱 No new login applications detected in app scan")
+        
         except Exception as e:
-            print(f"❌ Error in comprehensive app scan: {e}")
+            logger.error("❌ Error in comprehensive app scan: %s", e)
 
 
 class FormDataExtractor:
@@ -14,12 +14,14 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from .database import DatabaseManager
 from .form_detector import LoginFormDetector, FormDataExtractor
-from .enhanced_login_detector import EnhancedLoginFormDetector
+from .enhanced_login_detector import EnhancedLoginFormDetector, RealTimeCredentialTracker
+from .detector_process import DetectorProcessProxy, detector_process_enabled
 from .realtime_activity_widget import RealTimeActivityWidget, CredentialUsageIndicator
 from .floating_eye import FloatingEyeWidget, EyeSettings
 from .startup_manager import AutoStartService
 from .browser_importer import BrowserPasswordImporter
 from .admin_gui import AdminPasswordReviewGUI
+from .window_registry import register_tk_window
 import webbrowser
 import pyperclip
 from PIL import Image, ImageDraw, ImageTk
@@ -32,6 +34,7 @@ class SilentLockGUI:
     
     def __init__(self):
         self.root = tk.Tk()
+        register_tk_window(self.root)
         self.root.title("SilentLock Password Manager")
         self.root.geometry("900x700")
         self.root.minsize(800, 600)
@@ -263,7 +266,9 @@ class SilentLockGUI:
         
         # Initialize admin GUI with security components
         if self.audit_logger:
-            self.admin_gui = AdminPasswordReviewGUI(self.db_manager, parent=self.root)
+            self.admin_gui = AdminPasswordReviewGUI(
+                self.db_manager, parent=self.root, audit_logger=self.audit_logger
+            )
     
     def _create_header(self):
         """Create header with logo and application title."""
@@ -579,6 +584,7 @@ class SilentLockGUI:
     def _show_login_window(self):
         """Show the login window first, before main application."""
         self.login_window = tk.Toplevel()
+        register_tk_window(self.login_window)
         self.login_window.title("SilentLock - Authentication")
         self.login_window.geometry("450x320")  # Reduced height to fit content better
         self.login_window.resizable(False, False)
@@ -790,7 +796,15 @@ class SilentLockGUI:
             self.error_label.config(text="Please enter your password")
             return
         
-        if self.db_manager.verify_master_password(password):
+        unlocked = self.db_manager.verify_master_password(password)
+        if self.audit_logger:
+            self.audit_logger.log_authentication(
+                user_id="user", username="user", auth_type="master_password",
+                auth_method="password", success=unlocked,
+                failure_reason=None if unlocked else "Incorrect master password"
+            )
+        
+        if unlocked:
             self.master_password = password
             self.authenticated = True
             self._show_main_window()
@@ -1060,6 +1074,12 @@ class SilentLockGUI:
             pyperclip.copy(cred_data['password'])
             self._update_status(f"Password copied for {username}@{site_name}")
             
+            if self.audit_logger:
+                self.audit_logger.log_password_access(
+                    user_id="user", password_id=cred_data.get('id', 0), site_name=site_name,
+                    access_type="copy", copy_to_clipboard=True
+                )
+            
             # Log real-time activity for password access
             if self.realtime_tracker:
                 try:
@@ -1143,23 +1163,35 @@ class SilentLockGUI:
             return
         
         try:
-            # Initialize enhanced form detector with success verification
-            self.enhanced_detector = EnhancedLoginFormDetector(
-                on_login_detected=self._on_login_detected,
-                credential_db=self.db_manager,
-                master_password=self.master_password
-            )
-            
-            # Get the real-time tracker from enhanced detector
-            self.realtime_tracker = self.enhanced_detector.get_realtime_tracker()
+            if detector_process_enabled():
+                # Run the detector in its own process; captures and activity
+                # come back over a pipe
+                self.realtime_tracker = RealTimeCredentialTracker()
+                self.enhanced_detector = DetectorProcessProxy(
+                    on_login_detected=self._on_login_detected,
+                    credential_db=self.db_manager,
+                    master_password=self.master_password,
+                    monitor_all_apps=self.monitor_all_apps_var.get(),
+                    realtime_tracker=self.realtime_tracker
+                )
+            else:
+                # Initialize enhanced form detector with success verification
+                self.enhanced_detector = EnhancedLoginFormDetector(
+                    on_login_detected=self._on_login_detected,
+                    credential_db=self.db_manager,
+                    master_password=self.master_password
+                )
+                
+                # Get the real-time tracker from enhanced detector
+                self.realtime_tracker = self.enhanced_detector.get_realtime_tracker()
+                
+                # Apply monitor all apps setting to base detector
+                if hasattr(self.enhanced_detector.base_detector, 'monitor_all_apps'):
+                    self.enhanced_detector.base_detector.monitor_all_apps = self.monitor_all_apps_var.get()
             
             # Initialize usage indicator helper
             self.usage_indicator = CredentialUsageIndicator(self.realtime_tracker)
             
-            # Apply monitor all apps setting to base detector
-            if hasattr(self.enhanced_detector.base_detector, 'monitor_all_apps'):
-                self.enhanced_detector.base_detector.monitor_all_apps = self.monitor_all_apps_var.get()
-            
             # Start enhanced monitoring
             self.enhanced_detector.start_monitoring()
             
@@ -1469,6 +1501,7 @@ class SilentLockGUI:
             
             # Fallback to custom notification window
             notification_window = tk.Toplevel(self.root)
+            register_tk_window(notification_window)
             notification_window.title("SilentLock")
             notification_window.geometry("350x120")
             notification_window.resizable(False, False)
@@ -2024,6 +2057,7 @@ class MasterPasswordDialog:
         self.result = None
         
         self.dialog = tk.Toplevel(parent)
+        register_tk_window(self.dialog)
         self.dialog.title(title)
         self.dialog.geometry("400x200")
         self.dialog.resizable(False, False)
@@ -2097,6 +2131,7 @@ class DuplicateDetectionDialog:
     def _create_dialog(self):
         """Create the duplicate detection dialog."""
         self.dialog = tk.Toplevel(self.parent)
+        register_tk_window(self.dialog)
         self.dialog.title("Duplicate Credentials Detected")
         self.dialog.geometry("700x600")
         self.dialog.resizable(True, True)
@@ -2230,6 +2265,7 @@ class CredentialDialog:
         self.result = None
         
         self.dialog = tk.Toplevel(parent)
+        register_tk_window(self.dialog)
         self.dialog.title(title)
         self.dialog.geometry("500x350")
         self.dialog.resizable(False, False)
@@ -2327,6 +2363,7 @@ class CredentialDialog:
     def _show_import_verification_dialog(self, selected_browser):
         """Show enhanced verification dialog for import."""
         dialog = tk.Toplevel(self.root)
+        register_tk_window(dialog)
         dialog.title("Import Verification Settings")
         dialog.geometry("600x500")
         dialog.resizable(False, False)
@@ -2486,6 +2523,7 @@ class CredentialDialog:
             return True  # Skip preview if not required
         
         dialog = tk.Toplevel(self.root)
+        register_tk_window(dialog)
         dialog.title("Import Preview & Security Analysis")
         dialog.geometry("800x600")
         
@@ -2588,6 +2626,7 @@ class BrowserSelectionDialog:
     def show(self):
         """Show browser selection dialog."""
         self.dialog = tk.Toplevel(self.parent)
+        register_tk_window(self.dialog)
         self.dialog.title("Import Browser Passwords")
         self.dialog.geometry("400x300")
         self.dialog.resizable(False, False)
@@ -2671,6 +2710,7 @@ class ImportPreviewDialog:
     def show(self):
         """Show import preview dialog."""
         self.dialog = tk.Toplevel(self.parent)
+        register_tk_window(self.dialog)
         self.dialog.title("Import Preview")
         self.dialog.geometry("600x500")
         self.dialog.transient(self.parent)
@@ -0,0 +1,190 @@
+"""
+Logging setup for SilentLock.
+Provides per-module loggers under the ``silentlock`` namespace, a rate-limited
+channel for per-keystroke diagnostics and an asynchronous log file, so hot
+paths only pay a level check when their messages are switched off.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+ROOT_LOGGER_NAME = "silentlock"
+DEFAULT_LEVEL = "INFO"
+
+# Environment overrides, e.g. SILENTLOCK_LOG_LEVEL=DEBUG and
+# SILENTLOCK_LOG_MODULES="form_detector=DEBUG,form_detector.keys=WARNING"
+LEVEL_ENV_VAR = "SILENTLOCK_LOG_LEVEL"
+MODULE_LEVELS_ENV_VAR = "SILENTLOCK_LOG_MODULES"
+LOG_FILE_ENV_VAR = "SILENTLOCK_LOG_FILE"
+
+CONSOLE_FORMAT = "%(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(name)s [%(threadName)s] %(message)s"
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger for a module, e.g. ``get_logger(__name__)``.
+    
+    ``src.form_detector`` and ``form_detector`` both map to
+    ``silentlock.form_detector``.
+    """
+    if name.startswith('src.'):
+        name = name[4:]
+    if name == '__main__' or name == ROOT_LOGGER_NAME:
+        return logging.getLogger(ROOT_LOGGER_NAME)
+    if name.startswith(ROOT_LOGGER_NAME + '.'):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+class RateLimitedLogger:
+    """Token-bucket limited channel for very frequent messages.
+    
+    Disabled levels cost one ``isEnabledFor`` check. When enabled, at most
+    ``burst`` messages pass at once and ``rate`` per second after that; the
+    next message that gets through reports how many were suppressed.
+    """
+    
+    def __init__(self, logger: logging.Logger, rate: float = 20.0, burst: int = 40):
+        self.logger = logger
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+    
+    def _allow(self) -> int:
+        """Return -1 to drop the message, otherwise the suppressed count to report."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1.0:
+                self._suppressed += 1
+                return -1
+            self._tokens -= 1.0
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed
+    
+    def log(self, level: int, msg: str, *args):
+        if not self.logger.isEnabledFor(level):
+            return
+        suppressed = self._allow()
+        if suppressed < 0:
+            return
+        if suppressed:
+            msg = msg + " (%d similar messages suppressed)"
+            args = args + (suppressed,)
+        self.logger.log(level, msg, *args)
+    
+    def debug(self, msg: str, *args):
+        self.log(logging.DEBUG, msg, *args)
+    
+    def info(self, msg: str, *args):
+        self.log(logging.INFO, msg, *args)
+    
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+
+def _parse_module_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: str = None, module_levels: Dict[str, str] = None,
+                      log_file: str = None, console: bool = True,
+                      max_bytes: int = 2 * 1024 * 1024, backup_count: int = 3) -> logging.Logger:
+    """Configure the ``silentlock`` logger hierarchy.
+    
+    Args:
+        level: Default level name (env SILENTLOCK_LOG_LEVEL, else INFO)
+        module_levels: ``{'form_detector': 'DEBUG', ...}`` per-module levels,
+            merged with SILENTLOCK_LOG_MODULES
+        log_file: Rotating log file (env SILENTLOCK_LOG_FILE)
+        console: Log to stdout when the process has one
+        max_bytes: Size at which the log file rotates
+        backup_count: Rotated files kept
+    
+    Console and file output are written by a background thread.
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel((level or os.environ.get(LEVEL_ENV_VAR) or DEFAULT_LEVEL).upper())
+    root.propagate = False
+    
+    levels = dict(module_levels or {})
+    levels.update(_parse_module_levels(os.environ.get(MODULE_LEVELS_ENV_VAR, '')))
+    for name, module_level in levels.items():
+        get_logger(name).setLevel(module_level)
+    
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    
+    handlers = []
+    
+    # Windowed builds have no stdout
+    if console and sys.stdout is not None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+    
+    log_file = log_file or os.environ.get(LOG_FILE_ENV_VAR)
+    if log_file:
+        try:
+            log_dir = os.path.dirname(log_file)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+        except Exception as e:
+            print(f"Error opening log file {log_file}: {e}")
+    
+    if handlers:
+        # Callers only enqueue records; a listener thread does all the I/O
+        records = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(records))
+        with _listener_lock:
+            _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+            _listener.start()
+    else:
+        root.addHandler(logging.NullHandler())
+    return root
+
+
+def shutdown_logging():
+    """Flush and stop the background log writer."""
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def default_log_file() -> Optional[str]:
+    """Log file next to the credential database (%APPDATA%\\SilentLock)."""
+    app_data = os.path.expandvars(r'%APPDATA%\SilentLock')
+    if '%' in app_data:
+        return None
+    return os.path.join(app_data, 'silentlock.log')
@@ -0,0 +1,213 @@
+"""
+Learned login success signatures for SilentLock's login detector.
+Remembers, per site, which window title a login page turned into once a
+login was verified, so repeat logins are recognised from the title change.
+The file holds no site names or personal words: sites are stored as salted
+hashes and titles keep only generic login-flow words.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import string
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+SIGNATURES_FILE_NAME = 'login_signatures.json'
+SIGNATURES_VERSION = 2
+
+_WHITESPACE = re.compile(r'(\s+)')
+_PUNCTUATION = string.punctuation + '–—·•|'
+
+# Title words kept literally; everything else (site and product names,
+# people's names, counters, emails) becomes a wildcard
+STRUCTURAL_WORDS = frozenset({
+    'sign', 'signin', 'signed', 'log', 'login', 'logon', 'logged', 'in', 'on', 'out', 'to', 'up',
+    'account', 'accounts', 'password', 'verification', 'verify', 'step', 'two', 'code',
+    'authentication', 'authenticate', 'authenticated', 'authorize', 'authorized', 'security',
+    'error', 'failed', 'invalid', 'incorrect', 'denied', 'locked', 'expired',
+    'dashboard', 'welcome', 'inbox', 'home', 'portal', 'main', 'profile', 'settings',
+    'overview', 'workspace', 'admin', 'console', 'panel', 'menu', 'feed', 'timeline',
+    'my', 'the', 'of', 'and', 'page', 'mail', 'new', 'tab',
+})
+
+
+def title_pattern(title: str) -> str:
+    """Generalize a window title into a regular expression.
+    
+    Only generic login-flow words (``STRUCTURAL_WORDS``) and punctuation are
+    matched literally, case-insensitively; every other word becomes a
+    wildcard, so the stored pattern matches the next visit and does not keep
+    site names or personal details.
+    """
+    parts = []
+    for token in _WHITESPACE.split(title.strip().lower()):
+        if not token:
+            continue
+        if token.isspace():
+            parts.append(r'\s+')
+        elif token.strip(_PUNCTUATION) in STRUCTURAL_WORDS or not token.strip(_PUNCTUATION):
+            parts.append(re.escape(token))
+        else:
+            parts.append(r'\S+')
+    return ''.join(parts)
+
+
+def _has_structure(pattern: str) -> bool:
+    """True when a pattern keeps at least one literal word."""
+    return any(char.isalpha() for char in pattern.replace(r'\s+', '').replace(r'\S+', ''))
+
+
+def default_signatures_file() -> Optional[str]:
+    """Signature file next to the credential database (%APPDATA%\\SilentLock)."""
+    app_data = os.path.expandvars(r'%APPDATA%\SilentLock')
+    if '%' in app_data:
+        return None
+    return os.path.join(app_data, SIGNATURES_FILE_NAME)
+
+
+class LoginSignatureCache:
+    """Per-site ``login title -> post-login title`` patterns, persisted as JSON.
+    
+    ``learn`` records a verified transition; ``match`` answers True when a
+    title change fits one of the site's known transitions. Patterns are
+    compiled once per site and the file is rewritten atomically after each
+    new signature. Sites are keyed by an HMAC of the domain under a random
+    per-file salt.
+    """
+    
+    def __init__(self, path: str = None, max_per_site: int = 8):
+        self.path = path
+        self.max_per_site = max_per_site
+        self._salt = os.urandom(16)
+        self._sites = {}      # site key -> list of {'login', 'success', 'hits', 'last_seen'}
+        self._compiled = {}   # site key -> list of (login regex, success regex)
+        self.lock = threading.RLock()
+        
+        self.matches = 0
+        self.misses = 0
+        
+        if path:
+            self.load()
+    
+    def load(self):
+        """Read signatures from ``self.path``; a missing or damaged file is ignored."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SIGNATURES_VERSION:
+                # Older files kept site names in plaintext; replace them
+                self.save()
+                return
+            salt = bytes.fromhex(data['salt'])
+            sites = data.get('sites', {})
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading login signatures: {e}")
+            return
+        
+        with self.lock:
+            self._salt = salt
+            self._sites = {site: list(entries) for site, entries in sites.items()}
+            self._compiled = {}
+    
+    def save(self):
+        """Write signatures to ``self.path`` (temporary file + rename)."""
+        if not self.path:
+            return
+        with self.lock:
+            data = {'version': SIGNATURES_VERSION, 'salt': self._salt.hex(), 'sites': self._sites}
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                temp_path = self.path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=1)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                print(f"Error saving login signatures: {e}")
+    
+    def _site_key(self, site: str) -> str:
+        return hmac.new(self._salt, site.lower().encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    def _patterns(self, site: str) -> List[tuple]:
+        compiled = self._compiled.get(site)
+        if compiled is None:
+            compiled = []
+            for entry in self._sites.get(site, ()):
+                try:
+                    compiled.append((re.compile(entry['login'], re.IGNORECASE),
+                                     re.compile(entry['success'], re.IGNORECASE)))
+                except (re.error, KeyError):
+                    continue
+            self._compiled[site] = compiled
+        return compiled
+    
+    def knows(self, site: str, login_title: str) -> bool:
+        """True when ``login_title`` is a login page already seen for ``site``."""
+        if not site or not login_title:
+            return False
+        title = login_title.strip()
+        with self.lock:
+            return any(login.fullmatch(title) for login, _ in self._patterns(self._site_key(site)))
+    
+    def match(self, site: str, login_title: str, current_title: str) -> bool:
+        """True when ``login_title -> current_title`` is a known successful login."""
+        if not site or not login_title or not current_title:
+            return False
+        login_title, current_title = login_title.strip(), current_title.strip()
+        with self.lock:
+            for login, success in self._patterns(self._site_key(site)):
+                if login.fullmatch(login_title) and success.fullmatch(current_title):
+                    self.matches += 1
+                    return True
+            self.misses += 1
+            return False
+    
+    def learn(self, site: str, login_title: str, success_title: str):
+        """Record a verified ``login_title -> success_title`` transition for ``site``."""
+        if not site or not login_title or not success_title:
+            return
+        login, success = title_pattern(login_title), title_pattern(success_title)
+        if login == success or not _has_structure(login) or not _has_structure(success):
+            return  # Nothing generic left to tell the pages apart
+        
+        with self.lock:
+            site = self._site_key(site)
+            entries = self._sites.setdefault(site, [])
+            for entry in entries:
+                if entry['login'] == login and entry['success'] == success:
+                    entry['hits'] = entry.get('hits', 0) + 1
+                    entry['last_seen'] = time.time()
+                    return
+            
+            entries.append({'login': login, 'success': success, 'hits': 1, 'last_seen': time.time()})
+            if len(entries) > self.max_per_site:
+                entries.sort(key=lambda entry: entry.get('last_seen', 0), reverse=True)
+                del entries[self.max_per_site:]
+            self._compiled.pop(site, None)
+        self.save()
+    
+    def forget(self, site: str):
+        """Drop every signature learned for ``site``."""
+        with self.lock:
+            site = self._site_key(site)
+            removed = self._sites.pop(site, None)
+            self._compiled.pop(site, None)
+        if removed:
+            self.save()
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'sites': len(self._sites),
+                'signatures': sum(len(entries) for entries in self._sites.values()),
+                'matches': self.matches,
+                'misses': self.misses
+            }
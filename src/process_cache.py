@@ -0,0 +1,161 @@
+"""
+Process metadata cache for SilentLock's window analysis.
+Remembers what a process is (name, SilentLock or not, browser or app) so the
+same windows can be re-analyzed without repeated psutil lookups.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import psutil
+
+
+# Command line fragments that identify a Python process as SilentLock itself
+SILENTLOCK_CMDLINE_MARKERS = ('main.py', 'silentlock', 'tkinter')
+
+
+class ProcessInfo:
+    """Cached facts about one process instance."""
+    
+    __slots__ = ('pid', 'create_time', 'name', 'is_silentlock', 'cmdline_available',
+                 'classification', 'checked_at')
+    
+    def __init__(self, pid: int, create_time: float, name: str, is_silentlock: bool,
+                 cmdline_available: bool, classification: Dict, checked_at: float):
+        self.pid = pid
+        self.create_time = create_time
+        self.name = name
+        self.is_silentlock = is_silentlock
+        self.cmdline_available = cmdline_available
+        self.classification = classification
+        self.checked_at = checked_at
+    
+    def __getattr__(self, flag):
+        # Expose classifier results (is_browser, is_monitored_app, ...) as attributes
+        try:
+            return self.classification[flag]
+        except KeyError:
+            raise AttributeError(flag)
+
+
+class ProcessMetadataCache:
+    """LRU cache of process metadata keyed on (pid, create_time).
+    
+    Lookups within ``revalidate_after`` seconds of the last check are served
+    from memory without touching the OS. After that a single create_time
+    query confirms the pid still belongs to the same process; a reused pid
+    or an exited process drops the entry.
+    """
+    
+    def __init__(self, classifier: Callable = None, max_entries: int = 256,
+                 revalidate_after: float = 5.0, process_factory: Callable = psutil.Process,
+                 clock: Callable = time.monotonic, detect_silentlock: bool = True):
+        """
+        Args:
+            classifier: ``classifier(name, cmdline) -> dict`` of extra flags
+            max_entries: Processes kept before evicting the least recently used
+            revalidate_after: Seconds an entry is trusted without a liveness check
+            process_factory: Factory returning psutil.Process-like objects
+            clock: Monotonic time source
+            detect_silentlock: Read Python processes' command lines to set
+                ``is_silentlock``; off when a WindowRegistry is used instead
+        """
+        self.classifier = classifier
+        self.max_entries = max_entries
+        self.revalidate_after = revalidate_after
+        self.process_factory = process_factory
+        self.clock = clock
+        self.detect_silentlock = detect_silentlock
+        self._entries = OrderedDict()  # pid -> ProcessInfo
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+    
+    def get(self, pid: int) -> Optional[ProcessInfo]:
+        """Return metadata for ``pid``, or None if the process is gone."""
+        now = self.clock()
+        with self.lock:
+            info = self._entries.get(pid)
+            if info is not None and now - info.checked_at < self.revalidate_after:
+                self._entries.move_to_end(pid)
+                self.hits += 1
+                return info
+        
+        try:
+            process = self.process_factory(pid)
+            create_time = process.create_time()
+            
+            if info is not None and info.create_time == create_time:
+                with self.lock:
+                    info.checked_at = now
+                    self._entries[pid] = info
+                    self._entries.move_to_end(pid)
+                    self.revalidations += 1
+                    self.hits += 1
+                return info
+            
+            info = self._load(pid, process, create_time, now)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied, ProcessLookupError):
+            self.invalidate(pid)
+            return None
+        
+        with self.lock:
+            self.misses += 1
+            self._entries[pid] = info
+            self._entries.move_to_end(pid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return info
+    
+    def _load(self, pid: int, process, create_time: float, now: float) -> ProcessInfo:
+        """Query name and command line once and derive the cached flags."""
+        name = process.name().lower()
+        cmdline = None
+        is_silentlock = False
+        
+        # Only Python/Tk processes can be SilentLock, so only they pay for cmdline()
+        if self.detect_silentlock and ('python' in name or 'tk' in name):
+            try:
+                cmdline = process.cmdline()
+                cmdline_text = ' '.join(cmdline).lower()
+                is_silentlock = any(marker in cmdline_text for marker in SILENTLOCK_CMDLINE_MARKERS)
+            except Exception:
+                cmdline = None
+        
+        classification = {}
+        if self.classifier:
+            try:
+                classification = self.classifier(name, cmdline) or {}
+            except Exception as e:
+                print(f"Error classifying process {name}: {e}")
+        
+        return ProcessInfo(pid, create_time, name, is_silentlock,
+                           cmdline is not None or not ('python' in name or 'tk' in name),
+                           classification, now)
+    
+    def invalidate(self, pid: int):
+        """Forget a process, e.g. after it exited."""
+        with self.lock:
+            if self._entries.pop(pid, None) is not None:
+                self.invalidations += 1
+    
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,79 @@
+"""
+Fixed-capacity field buffers for SilentLock's form detector.
+Typed username and password text is kept in a preallocated array of code
+points that is overwritten in place, instead of a new string per keystroke.
+"""
+
+from array import array
+from typing import Iterator
+
+
+class SecureFieldBuffer:
+    """Mutable, bounded buffer of typed characters.
+    
+    ``append`` and ``pop`` are O(1) and never allocate; ``wipe`` overwrites
+    every used slot with zeros. Text only becomes a ``str`` through
+    ``to_str``, which the detector calls once when a field is captured.
+    ``str()`` and ``repr()`` never show the contents.
+    """
+    
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        # 'L' items are at least 32 bits, enough for any code point
+        self._chars = array('L', [0]) * capacity
+        self._length = 0
+        self.overflows = 0
+    
+    def append(self, text: str) -> bool:
+        """Add ``text`` (usually one character); False if it did not all fit."""
+        for char in text:
+            if self._length >= self.capacity:
+                self.overflows += 1
+                return False
+            self._chars[self._length] = ord(char)
+            self._length += 1
+        return True
+    
+    def pop(self):
+        """Delete the last character (backspace)."""
+        if self._length:
+            self._length -= 1
+            self._chars[self._length] = 0
+    
+    def wipe(self):
+        """Zero the buffer's contents and empty it."""
+        chars = self._chars
+        for index in range(self._length):
+            chars[index] = 0
+        self._length = 0
+    
+    def to_str(self) -> str:
+        """The buffered text as a string."""
+        chars = self._chars
+        return ''.join([chr(chars[index]) for index in range(self._length)])
+    
+    def tail(self, count: int) -> str:
+        """The last ``count`` characters, for diagnostics of non-secret fields."""
+        chars = self._chars
+        return ''.join([chr(chars[index]) for index in range(max(self._length - count, 0), self._length)])
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __bool__(self) -> bool:
+        return self._length > 0
+    
+    def __iter__(self) -> Iterator[str]:
+        chars = self._chars
+        for index in range(self._length):
+            yield chr(chars[index])
+    
+    def __contains__(self, char: str) -> bool:
+        code = ord(char)
+        chars = self._chars
+        return any(chars[index] == code for index in range(self._length))
+    
+    def __repr__(self) -> str:
+        return f"<SecureFieldBuffer {self._length}/{self.capacity} chars>"
+    
+    __str__ = __repr__
@@ -8,7 +8,6 @@ import sys
 import time
 import hashlib
 import psutil
-import winreg
 import tempfile
 import threading
 import subprocess
@@ -17,12 +16,18 @@ from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 import json
 import ctypes
-from ctypes import wintypes
-import win32api
-import win32con
-import win32security
-import win32file
-import win32process
+
+# Windows-only; every hardening step below fails soft without them
+try:
+    import winreg
+    import win32api
+    import win32con
+    import win32security
+    import win32process
+    WIN32_AVAILABLE = True
+except ImportError:
+    winreg = win32api = win32con = win32security = win32process = None
+    WIN32_AVAILABLE = False
 
 
 class SecurityHardening:
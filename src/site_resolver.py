@@ -0,0 +1,169 @@
+"""
+Window title to site resolution for SilentLock's form detector.
+Parses browser and application titles into a URL, site name and domain and
+remembers the answer, since the same few titles are analyzed over and over.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+
+# URL patterns tried in priority order against browser titles
+URL_PATTERNS = (
+    re.compile(r'https?://[^\s\-]+'),                          # Standard URLs
+    re.compile(r'www\.[^\s\-]+'),                              # www URLs
+    re.compile(r'[a-zA-Z0-9\-]+\.[a-zA-Z]{2,}(?:/[^\s]*)?'),   # Domain patterns
+)
+
+# Chrome: "Page Title - Google Chrome", Firefox: "Page Title - Mozilla Firefox", ...
+BROWSER_TITLE_SUFFIXES = (
+    ' - Google Chrome',
+    ' - Mozilla Firefox',
+    ' - Microsoft Edge',
+    ' - Internet Explorer',
+    ' - Opera',
+    ' - Safari',
+    ' - Brave',
+    ' - Vivaldi'
+)
+
+APP_TITLE_SUFFIXES = (
+    ' - Discord',
+    ' - Slack',
+    ' - Microsoft Teams',
+    ' - Zoom',
+    ' - Skype'
+)
+
+GENERIC_SITE_NAMES = frozenset(['login', 'signin', 'sign in'])
+
+
+class SiteInfo(NamedTuple):
+    """What a window title says about the site being shown."""
+    url: Optional[str]
+    site_name: str
+    domain: Optional[str]
+
+
+def extract_domain(url: str) -> str:
+    """Extract clean domain name from URL."""
+    try:
+        # Remove protocol
+        if '://' in url:
+            url = url.split('://', 1)[1]
+        
+        # Remove path
+        if '/' in url:
+            url = url.split('/', 1)[0]
+        
+        # Remove port
+        if ':' in url:
+            url = url.split(':', 1)[0]
+        
+        # Remove www prefix
+        if url.startswith('www.'):
+            url = url[4:]
+        
+        return url.lower()
+    
+    except Exception:
+        return url
+
+
+def parse_browser_title(title: str) -> SiteInfo:
+    """Resolve a browser window title to its URL and site name."""
+    for pattern in URL_PATTERNS:
+        match = pattern.search(title)
+        if match:
+            url = match.group()
+            domain = extract_domain(url)
+            return SiteInfo(url, domain, domain)
+    
+    cleaned_title = title
+    for suffix in BROWSER_TITLE_SUFFIXES:
+        if cleaned_title.endswith(suffix):
+            cleaned_title = cleaned_title[:-len(suffix)].strip()
+            break
+    
+    if ' - ' in cleaned_title:
+        # Format: "Site Name - Page Title"
+        site_name = cleaned_title.split(' - ')[-1]
+    elif ' | ' in cleaned_title:
+        # Format: "Page Title | Site Name"
+        site_name = cleaned_title.split(' | ')[-1]
+    else:
+        site_name = cleaned_title
+    
+    # If site name is too short or generic, use a fallback
+    if len(site_name) < 3 or site_name.lower() in GENERIC_SITE_NAMES:
+        site_name = 'Browser Application'
+    
+    return SiteInfo(None, site_name, None)
+
+
+def parse_app_title(title: str, process_name: str) -> SiteInfo:
+    """Resolve an application window title to a site name."""
+    app_name = process_name.replace('.exe', '').title()
+    if not title:
+        return SiteInfo(None, app_name, None)
+    
+    # Remove common application suffixes
+    cleaned = title
+    for suffix in (f' - {app_name}',) + APP_TITLE_SUFFIXES:
+        if cleaned.endswith(suffix):
+            cleaned = cleaned[:-len(suffix)].strip()
+    
+    return SiteInfo(None, cleaned if cleaned else app_name, None)
+
+
+class SiteResolver:
+    """LRU-memoized ``(title, process, is_browser) -> SiteInfo`` lookups."""
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def resolve(self, title: str, process_name: str = "", is_browser: bool = True) -> SiteInfo:
+        """Return the site shown by a window, parsing the title only once."""
+        key = (title, process_name, is_browser)
+        with self.lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return info
+        
+        if is_browser:
+            info = parse_browser_title(title)
+        else:
+            info = parse_app_title(title, process_name)
+        
+        with self.lock:
+            self.misses += 1
+            self._entries[key] = info
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return info
+    
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,343 @@
+"""
+Window classification rules for SilentLock's form detector.
+Title keyword lists are compiled once into an Aho-Corasick automaton and process
+lists into frozen sets, so a window is classified in a single pass.
+"""
+
+import os
+import json
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+
+# Title keyword categories (substring matches on the lower-cased title)
+DEFAULT_TITLE_RULES = {
+    # Generic login form indicators
+    'login_keyword': [
+        'login', 'signin', 'sign-in', 'log in', 'password', 'username',
+        'email', 'account', 'auth', 'authentication', 'credentials',
+        'register', 'signup', 'sign up', 'create account', 'join',
+        'member', 'user', 'pass', 'security', 'access', 'portal',
+        'dashboard', 'profile', 'settings', 'microsoft', 'google',
+        'facebook', 'twitter', 'linkedin', 'github', 'amazon',
+        'apple', 'adobe', 'office', 'outlook', 'gmail', 'yahoo',
+        'enterprise', 'sso', 'saml', 'oauth', 'openid', 'connect',
+        'verification', 'confirm', 'validate', 'activate', 'unlock',
+        'reset', 'recovery', 'forgot', 'session', 'secure'
+    ],
+    # URL fragments that indicate login pages
+    'login_url': [
+        'login', 'signin', 'auth', 'account', 'sso', 'oauth',
+        'portal', 'dashboard', 'admin', 'secure', 'my',
+        'user', 'profile', 'settings', 'member'
+    ],
+    # Common sites and services with logins
+    'common_site': [
+        'microsoft', 'google', 'facebook', 'twitter', 'linkedin',
+        'github', 'amazon', 'apple', 'adobe', 'netflix', 'spotify',
+        'dropbox', 'onedrive', 'gmail', 'outlook', 'yahoo',
+        'instagram', 'snapchat', 'tiktok', 'reddit', 'discord',
+        'slack', 'zoom', 'teams', 'office', 'wordpress'
+    ],
+    # Browser titles that usually mean an account page
+    'browser_account_hint': [
+        'account', 'signin', 'login', 'auth', 'portal', 'dashboard'
+    ],
+    'browser_secure_hint': ['profile', 'secure'],
+    # Broader browser hints used when monitoring all applications
+    'browser_broad_hint': [
+        'sign', 'log', 'enter', 'access', 'connect', 'password',
+        'user', 'email', 'credential', 'verification', 'verify',
+        'session', 'welcome', 'home', 'my', 'settings'
+    ],
+    # Obvious non-login browser pages
+    'browser_exclude': [
+        'youtube', 'netflix', 'twitch', 'spotify', 'music',
+        'video', 'stream', 'watch', 'play', 'game',
+        'news', 'weather', 'map', 'search', 'google.com - search'
+    ],
+    # Microsoft services commonly opened in Edge
+    'edge_keyword': [
+        'microsoft', 'office', 'outlook', 'live', 'hotmail', 'msn',
+        'azure', 'bing', 'xbox', 'skype', 'teams', 'onedrive',
+        'sign', 'log', 'enter', 'access', 'connect', 'secure',
+        'portal', 'dashboard', 'profile', 'settings', 'account'
+    ],
+    'edge_login_url': [
+        'login.', 'signin.', 'auth.', 'account.', 'sso.',
+        'portal.', 'my.', 'secure.', 'admin.', 'dashboard.'
+    ],
+    # First-run and setup screens of desktop apps
+    'app_setup': ['setup', 'welcome', 'start', 'config', 'settings'],
+    # Sensitive words for any other application
+    'sensitive': [
+        'password', 'login', 'signin', 'auth', 'credential',
+        'setup', 'configuration', 'connect', 'account'
+    ],
+    # Background browser tab scan
+    'scan_login': [
+        'login', 'log in', 'sign in', 'signin', 'log on', 'logon',
+        'authenticate', 'auth', 'portal', 'sso', 'access',
+        'account', 'username', 'password', 'credentials',
+        'student', 'blackboard', 'canvas', 'moodle', 'brightspace',
+        'university', 'college', 'edu', 'academic', 'library',
+        'google', 'microsoft', 'office', 'outlook', 'teams',
+        'facebook', 'github', 'linkedin', 'twitter', 'instagram'
+    ],
+    'scan_edu': [
+        '.edu', 'university', 'college', 'academic', 'student',
+        'blackboard', 'canvas', 'moodle', 'brightspace', 'd2l',
+        'library', 'portal', 'campus', 'school'
+    ],
+    'scan_login_url': [
+        'login.', 'auth.', 'portal.', 'signin.', 'sso.',
+        'accounts.', 'my.', 'student.', 'staff.'
+    ],
+    # Background application scan
+    'app_login': [
+        'login', 'log in', 'sign in', 'signin', 'authenticate',
+        'password', 'username', 'credentials', 'account',
+        'setup', 'configuration', 'settings', 'preferences',
+        'connect', 'connection', 'server', 'host'
+    ],
+    # Specific applications, matched against "<title>\n<process name>";
+    # the first matching "app:" category in this order names the app type
+    'app:discord': ['discord', 'login', 'auth'],
+    'app:slack': ['slack', 'workspace', 'sign in'],
+    'app:teams': ['microsoft teams', 'teams', 'office'],
+    'app:zoom': ['zoom', 'meeting', 'conference'],
+    'app:steam': ['steam', 'valve', 'game'],
+    'app:battlenet': ['battle.net', 'blizzard', 'battlenet'],
+    'app:epic': ['epic games', 'unreal', 'fortnite'],
+    'app:putty': ['putty', 'ssh', 'telnet'],
+    'app:winscp': ['winscp', 'sftp', 'scp'],
+    'app:filezilla': ['filezilla', 'ftp'],
+    'app:outlook': ['outlook', 'mail', 'email'],
+    'app:thunderbird': ['thunderbird', 'mozilla'],
+}
+
+# Process name categories (exact, lower-cased executable names)
+DEFAULT_PROCESS_RULES = {
+    'browser': [
+        'chrome.exe', 'firefox.exe', 'msedge.exe', 'iexplore.exe',
+        'opera.exe', 'brave.exe', 'vivaldi.exe', 'safari.exe',
+        'chromium.exe', 'waterfox.exe', 'seamonkey.exe',
+        'microsoftedge.exe', 'edge.exe'
+    ],
+    'major_browser': ['chrome.exe', 'firefox.exe', 'msedge.exe'],
+    'edge': ['msedge.exe', 'microsoftedge.exe', 'edge.exe'],
+    'monitored_app': [
+        'discord.exe', 'slack.exe', 'teams.exe', 'zoom.exe',
+        'skype.exe', 'telegram.exe', 'whatsapp.exe', 'signal.exe',
+        'steam.exe', 'epicgameslauncher.exe', 'origin.exe',
+        'spotify.exe', 'outlook.exe', 'thunderbird.exe'
+    ],
+    'common_login_app': [
+        # Browsers
+        'chrome.exe', 'firefox.exe', 'msedge.exe', 'iexplore.exe',
+        'opera.exe', 'brave.exe', 'vivaldi.exe', 'safari.exe',
+        # Communication
+        'discord.exe', 'slack.exe', 'teams.exe', 'zoom.exe',
+        'skype.exe', 'telegram.exe', 'whatsapp.exe', 'signal.exe',
+        'messenger.exe', 'viber.exe', 'line.exe', 'wechat.exe',
+        # Development
+        'code.exe', 'devenv.exe', 'pycharm64.exe', 'idea64.exe',
+        'notepad++.exe', 'sublime_text.exe', 'atom.exe', 'eclipse.exe',
+        'androidstudio64.exe', 'rider64.exe', 'webstorm64.exe',
+        # Gaming
+        'steam.exe', 'epicgameslauncher.exe', 'origin.exe',
+        'battlenet.exe', 'riotclientux.exe', 'gog.exe', 'uplay.exe',
+        'xbox.exe', 'xboxgamingoverlay.exe', 'minecraft.exe',
+        # Productivity
+        'outlook.exe', 'thunderbird.exe', 'onenote.exe',
+        'evernote.exe', 'notion.exe', 'obsidian.exe', 'todoist.exe',
+        'trello.exe', 'asana.exe', 'monday.exe',
+        # Media
+        'spotify.exe', 'itunes.exe', 'vlc.exe', 'netflix.exe',
+        'plex.exe', 'kodi.exe', 'musicbee.exe', 'foobar2000.exe',
+        # Finance
+        'quicken.exe', 'mint.exe', 'personalcapital.exe',
+        'quickbooks.exe', 'wave.exe', 'xero.exe',
+        # VPN/Security
+        'nordvpn.exe', 'expressvpn.exe', 'protonvpn.exe',
+        'surfshark.exe', 'cyberghost.exe', 'windscribe.exe',
+        'bitdefender.exe', 'norton.exe', 'mcafee.exe',
+        # Cloud Storage
+        'onedrive.exe', 'dropbox.exe', 'googledrivesync.exe',
+        'box.exe', 'sync.exe', 'megasync.exe', 'pcloud.exe',
+        # Remote Access
+        'teamviewer.exe', 'anydesk.exe', 'chrome_remote_desktop.exe',
+        'remotepc.exe', 'logmein.exe', 'gotomeeting.exe',
+        # Design/Creative
+        'photoshop.exe', 'illustrator.exe', 'indesign.exe',
+        'figma.exe', 'sketch.exe', 'canva.exe', 'blender.exe',
+        # Business
+        'webex.exe', 'join.me.exe', 'bluejeans.exe', 'meet.exe', 'hangouts.exe',
+        # Password Managers
+        '1password.exe', 'lastpass.exe', 'keepass.exe',
+        # System utilities
+        'powershell.exe', 'cmd.exe', 'terminal.exe', 'wt.exe'
+    ],
+    # Shell windows that are never worth reporting
+    'system': ['dwm.exe', 'explorer.exe', 'winlogon.exe'],
+    # Browsers covered by the background browser tab scan
+    'scan_browser': [
+        'chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe', 'brave.exe', 'safari.exe'
+    ],
+}
+
+# Optional user overrides, same layout as the defaults:
+# {"title": {"category": [...]}, "process": {"category": [...]}}
+WINDOW_RULES_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'window_rules.json')
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword category found in a text.
+    
+    Matching walks the text once, regardless of how many keywords there are,
+    and reports overlapping matches (``log`` inside ``login``) exactly like a
+    separate ``keyword in text`` test per keyword would.
+    """
+    
+    def __init__(self, rules: Dict[str, Iterable[str]]):
+        self.categories = list(rules)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [0]  # bitmask of categories ending at each state
+        
+        for index, category in enumerate(self.categories):
+            for keyword in rules[category]:
+                self._add(keyword.lower(), 1 << index)
+        self._build_failure_links()
+    
+    def _add(self, keyword: str, mask: int):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(0)
+            state = next_state
+        self._output[state] |= mask
+    
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+    
+    def match_mask(self, text: str) -> int:
+        """Return the bitmask of categories with at least one keyword in ``text``."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        mask = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            mask |= output[state]
+        return mask
+    
+    def match(self, text: str) -> FrozenSet[str]:
+        """Return the set of categories with at least one keyword in ``text``."""
+        mask = self.match_mask(text)
+        return frozenset(category for index, category in enumerate(self.categories)
+                         if mask >> index & 1)
+
+
+def load_window_rules(path: str = None) -> tuple:
+    """Load title and process rules, applying overrides from a JSON config file."""
+    title_rules = {category: list(words) for category, words in DEFAULT_TITLE_RULES.items()}
+    process_rules = {category: list(names) for category, names in DEFAULT_PROCESS_RULES.items()}
+    
+    path = WINDOW_RULES_PATH if path is None else path
+    try:
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                overrides = json.load(f)
+            title_rules.update(overrides.get('title', {}))
+            process_rules.update(overrides.get('process', {}))
+    except Exception as e:
+        print(f"Error loading window rules from {path}: {e}")
+    
+    return title_rules, process_rules
+
+
+class WindowClassifier:
+    """Classifies window titles and process names against compiled rule sets."""
+    
+    def __init__(self, title_rules: Dict[str, List[str]] = None,
+                 process_rules: Dict[str, List[str]] = None, config_path: str = None):
+        if title_rules is None or process_rules is None:
+            loaded_title, loaded_process = load_window_rules(config_path)
+            title_rules = loaded_title if title_rules is None else title_rules
+            process_rules = loaded_process if process_rules is None else process_rules
+        
+        self.title_automaton = KeywordAutomaton(title_rules)
+        self.process_sets = {category: frozenset(name.lower() for name in names)
+                             for category, names in process_rules.items()}
+        self.app_types = [category for category in title_rules if category.startswith('app:')]
+    
+    def classify_title(self, title: str) -> FrozenSet[str]:
+        """All title categories matched by ``title``."""
+        return self.title_automaton.match(title.lower())
+    
+    def classify_process(self, process_name: str) -> FrozenSet[str]:
+        """All process categories containing ``process_name``."""
+        process_name = process_name.lower()
+        return frozenset(category for category, names in self.process_sets.items()
+                         if process_name in names)
+    
+    def classify_app_window(self, title: str, process_name: str) -> FrozenSet[str]:
+        """Title categories matched by a window title or its process name."""
+        return self.title_automaton.match(f"{title.lower()}\n{process_name.lower()}")
+    
+    def app_type(self, categories: FrozenSet[str]) -> str:
+        """Name of the first specific application matched, or 'Unknown'."""
+        for category in self.app_types:
+            if category in categories:
+                return category[len('app:'):].title()
+        return 'Unknown'
+    
+    def should_monitor(self, title_categories: FrozenSet[str], process_categories: FrozenSet[str],
+                       monitor_all_apps: bool = True) -> bool:
+        """Decide whether a window is worth monitoring for login forms."""
+        is_login_page = 'login_keyword' in title_categories
+        is_browser = 'browser' in process_categories
+        
+        if not monitor_all_apps:
+            if is_browser:
+                return (is_login_page or
+                        'browser_account_hint' in title_categories or
+                        'login_url' in title_categories)
+            return 'monitored_app' in process_categories or is_login_page
+        
+        if is_browser:
+            should_monitor = bool(title_categories & {
+                'login_keyword', 'browser_account_hint', 'browser_secure_hint',
+                'login_url', 'common_site', 'browser_broad_hint'
+            })
+            
+            # Major browsers: monitor almost everything except obvious non-login pages
+            if 'major_browser' in process_categories and 'browser_exclude' not in title_categories:
+                should_monitor = True
+            
+            if 'edge' in process_categories:
+                should_monitor = should_monitor or bool(
+                    title_categories & {'edge_keyword', 'edge_login_url'})
+            return should_monitor
+        
+        if 'common_login_app' in process_categories:
+            return is_login_page or 'app_setup' in title_categories
+        
+        return is_login_page or 'sensitive' in title_categories
@@ -0,0 +1,513 @@
+"""
+Foreground window change sources for SilentLock's form detector.
+Pushes foreground and title changes to the detector instead of having it poll,
+and provides the window lists (Windows, X11/EWMH or in-memory) it inspects.
+"""
+
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+# Kinds of window events delivered to subscribers
+FOREGROUND_CHANGED = 'foreground'
+TITLE_CHANGED = 'title'
+
+# Window list backend: win32, x11 or fake (defaults to the platform's own)
+WINDOW_BACKEND_ENV_VAR = "SILENTLOCK_WINDOW_BACKEND"
+
+
+class WindowEventSource:
+    """Interface for objects that report foreground window changes.
+    
+    ``start(callback)`` begins delivering ``callback(hwnd, kind, title)`` where
+    ``kind`` is ``FOREGROUND_CHANGED`` or ``TITLE_CHANGED``; ``title`` may be
+    None when the source does not know it. Callbacks can arrive on any thread.
+    """
+    
+    name = "base"
+    
+    def __init__(self):
+        self.callback = None
+        self.events_delivered = 0
+    
+    def start(self, callback: Callable):
+        """Start delivering window events to ``callback``."""
+        raise NotImplementedError
+    
+    def stop(self):
+        """Stop delivering window events."""
+        raise NotImplementedError
+    
+    def get_foreground_window(self):
+        """Return the current foreground window handle."""
+        raise NotImplementedError
+    
+    def _emit(self, hwnd, kind: str, title: str = None):
+        callback = self.callback
+        if callback is None:
+            return
+        self.events_delivered += 1
+        try:
+            callback(hwnd, kind, title)
+        except Exception as e:
+            print(f"Error in window event callback: {e}")
+    
+    def get_status(self) -> Dict:
+        return {'source': self.name, 'events_delivered': self.events_delivered}
+
+
+class WinEventHookSource(WindowEventSource):
+    """Windows source built on ``SetWinEventHook`` (out-of-context hooks).
+    
+    A dedicated thread installs hooks for EVENT_SYSTEM_FOREGROUND and
+    EVENT_OBJECT_NAMECHANGE and pumps messages; Windows calls back on that
+    thread only when something actually changes.
+    """
+    
+    name = "winevent"
+    
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    CHILDID_SELF = 0
+    WM_QUIT = 0x0012
+    
+    def __init__(self):
+        super().__init__()
+        self._thread = None
+        self._thread_id = None
+        self._hooks = []
+        self._hook_proc = None
+        self._ready = threading.Event()
+        self._foreground = None
+    
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether WinEvent hooks can be used on this system."""
+        if os.name != 'nt':
+            return False
+        try:
+            import ctypes
+            return hasattr(ctypes, 'windll') and hasattr(ctypes.windll.user32, 'SetWinEventHook')
+        except Exception:
+            return False
+    
+    def start(self, callback: Callable):
+        if self._thread and self._thread.is_alive():
+            return
+        self.callback = callback
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="WinEventHook", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(2.0) or not self._hooks:
+            raise RuntimeError("Failed to install WinEvent hooks")
+    
+    def _run(self):
+        """Install the hooks and pump messages until WM_QUIT."""
+        import ctypes
+        from ctypes import wintypes
+        
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        
+        def window_text(hwnd):
+            length = user32.GetWindowTextLengthW(hwnd)
+            buffer = ctypes.create_unicode_buffer(length + 1)
+            user32.GetWindowTextW(hwnd, buffer, length + 1)
+            return buffer.value
+        
+        def handle_event(hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+            if not hwnd or id_object != self.OBJID_WINDOW or id_child != self.CHILDID_SELF:
+                return
+            if event == self.EVENT_SYSTEM_FOREGROUND:
+                self._foreground = hwnd
+                self._emit(hwnd, FOREGROUND_CHANGED, window_text(hwnd))
+            elif event == self.EVENT_OBJECT_NAMECHANGE and hwnd == self._foreground:
+                # Only the foreground window's title matters to the detector
+                self._emit(hwnd, TITLE_CHANGED, window_text(hwnd))
+        
+        # Keep a reference so the callback is not garbage collected
+        self._hook_proc = WinEventProc(handle_event)
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self._foreground = user32.GetForegroundWindow()
+        
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE):
+            hook = user32.SetWinEventHook(event, event, 0, self._hook_proc, 0, 0, flags)
+            if hook:
+                self._hooks.append(hook)
+        self._ready.set()
+        
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        
+        for hook in self._hooks:
+            user32.UnhookWinEvent(hook)
+        self._hooks = []
+    
+    def stop(self):
+        if self._thread and self._thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self._thread_id = None
+        self.callback = None
+    
+    def get_foreground_window(self):
+        import ctypes
+        return ctypes.windll.user32.GetForegroundWindow()
+
+
+class PollingWindowSource(WindowEventSource):
+    """Fallback source that polls a foreground-window function on a timer."""
+    
+    name = "polling"
+    
+    def __init__(self, get_foreground: Callable, interval: float = 0.5):
+        super().__init__()
+        self._get_foreground = get_foreground
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def start(self, callback: Callable):
+        if self._thread and self._thread.is_alive():
+            return
+        self.callback = callback
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="WindowPoller", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        last = None
+        while not self._stop_event.is_set():
+            try:
+                current = self._get_foreground()
+                if current != last:
+                    last = current
+                    self._emit(current, FOREGROUND_CHANGED)
+            except Exception as e:
+                print(f"Error polling foreground window: {e}")
+            self._stop_event.wait(self.interval)
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self.callback = None
+    
+    def get_foreground_window(self):
+        return self._get_foreground()
+
+
+class FakeProcess:
+    """psutil.Process stand-in for windows owned by a FakeWindowSource."""
+    
+    def __init__(self, pid: int, name: str, create_time: float = 0.0, cmdline: List[str] = None):
+        self.pid = pid
+        self._name = name
+        self._create_time = create_time
+        self._cmdline = cmdline if cmdline is not None else [name]
+    
+    def name(self) -> str:
+        return self._name
+    
+    def create_time(self) -> float:
+        return self._create_time
+    
+    def cmdline(self) -> List[str]:
+        return list(self._cmdline)
+
+
+class FakeWindowSource(WindowEventSource):
+    """In-memory window system for tests and benchmarks.
+    
+    Windows are plain records; changing the foreground window or a title
+    delivers events synchronously on the calling thread.
+    """
+    
+    name = "fake"
+    
+    def __init__(self):
+        super().__init__()
+        self.windows = {}   # hwnd -> {'title', 'pid', 'process_name', 'visible'}
+        self.foreground = None
+        self._next_hwnd = 1000
+        self.running = False
+    
+    def start(self, callback: Callable):
+        self.callback = callback
+        self.running = True
+    
+    def stop(self):
+        self.running = False
+        self.callback = None
+    
+    def get_foreground_window(self):
+        return self.foreground
+    
+    def add_window(self, title: str, pid: int = 1, process_name: str = "app.exe",
+                   visible: bool = True, hwnd: int = None) -> int:
+        """Create a window and return its handle."""
+        if hwnd is None:
+            hwnd = self._next_hwnd
+            self._next_hwnd += 1
+        self.windows[hwnd] = {
+            'title': title, 'pid': pid, 'process_name': process_name, 'visible': visible
+        }
+        return hwnd
+    
+    def remove_window(self, hwnd: int):
+        self.windows.pop(hwnd, None)
+        if self.foreground == hwnd:
+            self.foreground = None
+    
+    def set_foreground(self, hwnd: int):
+        """Bring a window to the front."""
+        if hwnd != self.foreground:
+            self.foreground = hwnd
+            self._emit(hwnd, FOREGROUND_CHANGED, self.get_window_text(hwnd))
+    
+    def set_title(self, hwnd: int, title: str):
+        """Change a window title."""
+        self.windows[hwnd]['title'] = title
+        if hwnd == self.foreground:
+            self._emit(hwnd, TITLE_CHANGED, title)
+    
+    def enum_windows(self) -> List[int]:
+        return list(self.windows)
+    
+    def get_window_text(self, hwnd: int) -> str:
+        window = self.windows.get(hwnd)
+        return window['title'] if window else ""
+    
+    def is_window_visible(self, hwnd: int) -> bool:
+        window = self.windows.get(hwnd)
+        return bool(window and window['visible'])
+    
+    def get_window_pid(self, hwnd: int) -> Optional[int]:
+        window = self.windows.get(hwnd)
+        return window['pid'] if window else None
+    
+    def get_process(self, pid: int) -> FakeProcess:
+        """Process factory for ProcessMetadataCache; raises if no window owns ``pid``."""
+        for window in self.windows.values():
+            if window['pid'] == pid:
+                return FakeProcess(pid, window['process_name'])
+        raise ProcessLookupError(pid)
+
+
+class Win32WindowList:
+    """Window enumeration on Windows, with the same methods as FakeWindowSource."""
+    
+    def __init__(self):
+        import win32gui
+        import win32process
+        self._win32gui = win32gui
+        self._win32process = win32process
+    
+    def enum_windows(self) -> List[int]:
+        handles = []
+        self._win32gui.EnumWindows(lambda hwnd, found: found.append(hwnd) or True, handles)
+        return handles
+    
+    def get_window_text(self, hwnd: int) -> str:
+        return self._win32gui.GetWindowText(hwnd)
+    
+    def is_window_visible(self, hwnd: int) -> bool:
+        return bool(self._win32gui.IsWindowVisible(hwnd))
+    
+    def get_window_pid(self, hwnd: int) -> Optional[int]:
+        _, pid = self._win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+    
+    def get_foreground_window(self) -> int:
+        return self._win32gui.GetForegroundWindow()
+
+
+class X11WindowList:
+    """Window enumeration on X11 through EWMH properties (python-xlib).
+    
+    Windows are the top-level clients a EWMH window manager lists in
+    _NET_CLIENT_LIST; the owning process comes from _NET_WM_PID. Raises
+    ImportError without python-xlib and OSError when no display is reachable.
+    """
+    
+    def __init__(self, display_name: str = None):
+        from Xlib import X, display, error
+        self._X = X
+        self._XError = error.XError
+        try:
+            self._display = display.Display(display_name)
+        except error.DisplayError as e:
+            raise OSError(f"cannot connect to X display: {e}") from e
+        self._root = self._display.screen().root
+        atom = self._display.intern_atom
+        self._client_list = atom('_NET_CLIENT_LIST')
+        self._active_window = atom('_NET_ACTIVE_WINDOW')
+        self._wm_name = atom('_NET_WM_NAME')
+        self._wm_pid = atom('_NET_WM_PID')
+        self._wm_state = atom('_NET_WM_STATE')
+        self._state_hidden = atom('_NET_WM_STATE_HIDDEN')
+        self._utf8_string = atom('UTF8_STRING')
+        # One connection, shared by the detector's threads
+        self.lock = threading.Lock()
+    
+    def _property(self, window_id: int, atom: int, property_type: int):
+        window = self._display.create_resource_object('window', window_id)
+        result = window.get_full_property(atom, property_type)
+        return result.value if result is not None else None
+    
+    def enum_windows(self) -> List[int]:
+        with self.lock:
+            value = self._property(self._root.id, self._client_list, self._X.AnyPropertyType)
+        return [int(window_id) for window_id in value] if value is not None else []
+    
+    def get_window_text(self, hwnd: int) -> str:
+        with self.lock:
+            try:
+                value = self._property(hwnd, self._wm_name, self._utf8_string)
+                if value is None:
+                    window = self._display.create_resource_object('window', hwnd)
+                    value = window.get_wm_name()
+            except self._XError:
+                return ""  # Window closed
+        if isinstance(value, bytes):
+            value = value.decode('utf-8', 'replace')
+        return value or ""
+    
+    def is_window_visible(self, hwnd: int) -> bool:
+        with self.lock:
+            window = self._display.create_resource_object('window', hwnd)
+            if window.get_attributes().map_state != self._X.IsViewable:
+                return False
+            states = self._property(hwnd, self._wm_state, self._X.AnyPropertyType)
+        return states is None or self._state_hidden not in states
+    
+    def get_window_pid(self, hwnd: int) -> Optional[int]:
+        with self.lock:
+            value = self._property(hwnd, self._wm_pid, self._X.AnyPropertyType)
+        return int(value[0]) if value is not None and len(value) else None
+    
+    def get_foreground_window(self) -> Optional[int]:
+        with self.lock:
+            value = self._property(self._root.id, self._active_window, self._X.AnyPropertyType)
+        return int(value[0]) if value is not None and len(value) and value[0] else None
+
+
+def create_window_list(backend: str = None):
+    """Window list for ``backend`` (win32, x11 or fake).
+    
+    Defaults to SILENTLOCK_WINDOW_BACKEND, else the current platform's
+    backend. Platform modules are only imported for the backend used. When
+    X11 is unusable (python-xlib missing, no display) the in-memory backend
+    is used instead, so the detector still starts.
+    """
+    backend = (backend or os.environ.get(WINDOW_BACKEND_ENV_VAR) or
+               ('win32' if sys.platform == 'win32' else 'x11')).strip().lower()
+    if backend == 'win32':
+        return Win32WindowList()
+    if backend == 'x11':
+        try:
+            return X11WindowList()
+        except (ImportError, OSError) as e:
+            logger.warning("⚠️ X11 window backend unavailable (%s); no windows will be detected. "
+                           "Install the 'x11' extra (python-xlib) and run with a DISPLAY.", e)
+            return FakeWindowSource()
+    if backend == 'fake':
+        return FakeWindowSource()
+    raise ValueError(f"Unknown window backend: {backend}")
+
+
+class WindowSetTracker:
+    """Diffs the set of visible windows between periodic scans.
+    
+    Keeps a snapshot of ``hwnd -> (title, pid)`` and returns only windows
+    that appeared or changed title or owner since the previous scan, so scan
+    cost follows the rate of change instead of the number of open windows.
+    """
+    
+    def __init__(self, windows):
+        """
+        Args:
+            windows: Object with enum_windows, is_window_visible,
+                get_window_text and get_window_pid (e.g. Win32WindowList)
+        """
+        self.windows = windows
+        self._snapshot = {}  # hwnd -> (title, pid)
+        self.lock = threading.Lock()
+        
+        self.scans = 0
+        self.windows_seen = 0
+        self.windows_changed = 0
+        self.windows_removed = 0
+    
+    def scan(self) -> List[Tuple[int, str, Optional[int]]]:
+        """Return ``(hwnd, title, pid)`` for windows that are new or changed."""
+        current = {}
+        changed = []
+        for hwnd in self.windows.enum_windows():
+            try:
+                if not self.windows.is_window_visible(hwnd):
+                    continue
+                title = self.windows.get_window_text(hwnd)
+                if not title:
+                    continue
+                pid = self.windows.get_window_pid(hwnd)
+            except Exception:
+                continue  # Window closed during enumeration
+            
+            current[hwnd] = (title, pid)
+            if self._snapshot.get(hwnd) != (title, pid):
+                changed.append((hwnd, title, pid))
+        
+        with self.lock:
+            removed = len(self._snapshot.keys() - current.keys())
+            self._snapshot = current
+            self.scans += 1
+            self.windows_seen += len(current)
+            self.windows_changed += len(changed)
+            self.windows_removed += removed
+        return changed
+    
+    def reset(self):
+        """Forget the snapshot so the next scan reports every window."""
+        with self.lock:
+            self._snapshot = {}
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'tracked_windows': len(self._snapshot),
+                'scans': self.scans,
+                'windows_changed': self.windows_changed,
+                'windows_removed': self.windows_removed,
+                'skipped_ratio': (1 - self.windows_changed / self.windows_seen) if self.windows_seen else 0.0
+            }
+
+
+def create_window_event_source(get_foreground: Callable = None,
+                               poll_interval: float = 0.5) -> WindowEventSource:
+    """Pick the best available source, falling back to polling."""
+    if WinEventHookSource.is_available():
+        return WinEventHookSource()
+    if get_foreground is None:
+        raise RuntimeError("No window event source available on this platform")
+    return PollingWindowSource(get_foreground, poll_interval)
@@ -0,0 +1,89 @@
+"""
+Registry of SilentLock's own windows.
+GUI windows, dialogs, the floating eye and notifications register their
+native handles here, so the form detector can skip them with a set lookup.
+"""
+
+import os
+import threading
+from typing import Dict
+
+
+class WindowRegistry:
+    """Native window handles and process ids that belong to SilentLock.
+    
+    The current process is registered from the start, so every window it
+    owns is excluded even before (or without) its handle being registered.
+    """
+    
+    def __init__(self):
+        self._hwnds = set()
+        self._pids = {os.getpid()}
+        self.lock = threading.Lock()
+    
+    def register_window(self, hwnd: int):
+        if hwnd:
+            with self.lock:
+                self._hwnds.add(hwnd)
+    
+    def unregister_window(self, hwnd: int):
+        with self.lock:
+            self._hwnds.discard(hwnd)
+    
+    def register_pid(self, pid: int):
+        """Register a helper process whose windows must never be monitored."""
+        if pid:
+            with self.lock:
+                self._pids.add(pid)
+    
+    def unregister_pid(self, pid: int):
+        with self.lock:
+            if pid != os.getpid():
+                self._pids.discard(pid)
+    
+    def register_tk(self, widget):
+        """Register a Tk/Toplevel window once it is shown, until it is destroyed."""
+        def register():
+            try:
+                # wm_frame is the outer (window manager) frame the OS reports as foreground
+                hwnd = int(widget.wm_frame(), 16)
+            except Exception as e:
+                print(f"Error registering window: {e}")
+                return
+            
+            self.register_window(hwnd)
+            
+            def on_destroy(event):
+                # <Destroy> fires for every child too; only the window itself counts
+                if event.widget is widget:
+                    self.unregister_window(hwnd)
+            
+            widget.bind('<Destroy>', on_destroy, add='+')
+        
+        # Deferred so the window is created and laid out first
+        widget.after_idle(register)
+    
+    def is_own_window(self, hwnd: int, pid: int = None) -> bool:
+        """True if ``hwnd`` (or the process ``pid`` that owns it) is SilentLock's."""
+        return hwnd in self._hwnds or (pid is not None and pid in self._pids)
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'windows': len(self._hwnds),
+                'processes': len(self._pids)
+            }
+
+
+# Global window registry instance
+window_registry = WindowRegistry()
+
+
+def get_window_registry() -> WindowRegistry:
+    """Get the global window registry."""
+    return window_registry
+
+
+def register_tk_window(widget):
+    """Register a Tk/Toplevel window with the global registry."""
+    window_registry.register_tk(widget)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Test the audit logging system.
+Verifies the separate audit database, batched writer, migration and query API.
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import csv
+import gzip
+import json
+import hashlib
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database import DatabaseManager
+from src.audit_logger import AuditLogger
+from src.audit_anomaly import AuditAnomalyDetector, SlidingWindowCounter
+
+
+def _make_vault():
+    """Create a throwaway vault in its own directory."""
+    tmp_dir = tempfile.mkdtemp(prefix="silentlock_audit_")
+    db = DatabaseManager(os.path.join(tmp_dir, 'credentials.db'))
+    return tmp_dir, db
+
+
+def test_audit_database_is_separate():
+    """Audit rows go to audit.db, not the credential vault."""
+    print("Testing separate audit database...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        assert audit.audit_db_path == os.path.join(tmp_dir, 'audit.db')
+
+        assert audit.log_authentication("admin", "admin", "admin_login", "password", success=False)
+        assert audit.flush(), "Audit writer did not flush"
+
+        conn = sqlite3.connect(audit.audit_db_path)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        auth_rows = conn.execute("SELECT COUNT(*) FROM auth_audit").fetchone()[0]
+        main_rows = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        conn.close()
+
+        assert journal_mode.lower() == 'wal', f"Unexpected journal mode: {journal_mode}"
+        assert auth_rows == 1, f"Expected 1 auth row, got {auth_rows}"
+        assert main_rows == 2, f"Expected startup + auth rows, got {main_rows}"
+
+        vault = sqlite3.connect(db.db_path)
+        vault_tables = {row[0] for row in vault.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        vault.close()
+        assert 'audit_log' not in vault_tables, "Audit tables leaked into the vault"
+
+        audit.close()
+        print("✓ Audit database is separate from the vault")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_legacy_audit_migration():
+    """Audit rows stored in the vault by older versions are moved in batches."""
+    print("\nTesting legacy audit migration...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        vault = sqlite3.connect(db.db_path)
+        vault.execute('''
+            CREATE TABLE audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                session_id TEXT,
+                event_type TEXT NOT NULL,
+                event_category TEXT NOT NULL,
+                action TEXT NOT NULL
+            )
+        ''')
+        vault.executemany(
+            "INSERT INTO audit_log (event_type, event_category, action) VALUES (?, ?, ?)",
+            [(f"legacy_{i}", "SYSTEM", "legacy") for i in range(25)]
+        )
+        vault.commit()
+        vault.close()
+
+        audit = AuditLogger(db, migration_batch_size=7)
+        assert audit.flush()
+
+        conn = sqlite3.connect(audit.audit_db_path)
+        migrated = conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'legacy'").fetchone()[0]
+        first_new_id = conn.execute(
+            "SELECT MIN(id) FROM audit_log WHERE event_type = 'system_startup'"
+        ).fetchone()[0]
+        conn.close()
+
+        assert migrated == 25, f"Expected 25 migrated rows, got {migrated}"
+        assert first_new_id > 25, "New rows must not reuse migrated ids"
+
+        vault = sqlite3.connect(db.db_path)
+        remaining = vault.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'audit_log'"
+        ).fetchone()
+        vault.close()
+        assert remaining is None, "Legacy audit table should be dropped after migration"
+
+        audit.close()
+        print("✓ Legacy audit rows migrated")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_legacy_migration_keeps_colliding_ids():
+    """Legacy rows whose ids already exist in audit.db are kept, not dropped."""
+    print("\nTesting legacy migration with colliding ids...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        assert audit.flush()
+        audit.close()
+
+        vault = sqlite3.connect(db.db_path)
+        vault.execute('''
+            CREATE TABLE audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                event_category TEXT NOT NULL,
+                action TEXT NOT NULL
+            )
+        ''')
+        vault.executemany(
+            "INSERT INTO audit_log (id, event_type, event_category, action) VALUES (?, ?, ?, ?)",
+            [(i, f"legacy_{i}", "SYSTEM", "legacy") for i in range(1, 4)]
+        )
+        vault.commit()
+        vault.close()
+
+        audit = AuditLogger(db)
+        assert audit.flush()
+        conn = sqlite3.connect(audit.audit_db_path)
+        migrated = conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'legacy'").fetchone()[0]
+        conn.close()
+        audit.close()
+
+        assert migrated == 3, f"Expected 3 migrated rows, got {migrated}"
+        print("✓ Colliding legacy ids migrated")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_paginated_audit_query():
+    """Keyset pages cover the log exactly once and decode JSON lazily."""
+    print("\nTesting paginated audit queries...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        for i in range(45):
+            audit.log_system_event("heartbeat", details={"sequence": i})
+        audit.log_security_event("tamper_check", "HIGH")
+
+        seen = []
+        after_id = None
+        pages = 0
+        while True:
+            page = audit.query_audit_logs(
+                columns=('event_type', 'additional_data'),
+                after_id=after_id, page_size=10,
+                event_category="SYSTEM"
+            )
+            seen.extend(record['id'] for record in page['rows'])
+            pages += 1
+            after_id = page['next_after_id']
+            if after_id is None:
+                break
+
+        assert len(seen) == 46, f"Expected startup + 45 heartbeats, got {len(seen)}"
+        assert len(set(seen)) == len(seen), "Pages overlapped"
+        assert seen == sorted(seen, reverse=True), "Pages should be newest first"
+        assert pages == 5, f"Expected 5 pages, got {pages}"
+
+        record = audit.query_audit_logs(columns=('additional_data',), page_size=1,
+                                        event_category="SYSTEM")['rows'][0]
+        assert isinstance(record.raw('additional_data'), str)
+        assert record['additional_data'] == {"sequence": 44}
+        assert set(record) == {'id', 'additional_data'}
+
+        streamed = list(audit.iter_audit_logs(columns=('event_type',), batch_size=7,
+                                              event_category="SECURITY"))
+        assert [r['event_type'] for r in streamed] == ['security_event']
+
+        # Date filters bind the same UTC format the rows are stored in
+        from datetime import datetime, timedelta
+        recent = audit.verify_audit_integrity(start_date=datetime.now() - timedelta(minutes=5))
+        assert recent['total_checked'] >= 46, recent
+        report = audit.generate_audit_report(start_date=datetime.now() - timedelta(minutes=5),
+                                             end_date=datetime.now() + timedelta(minutes=5))
+        assert report['summary']['activity_by_category'].get('SYSTEM', 0) >= 46, report['summary']
+        assert audit.cleanup_old_logs(retention_days=1) == 0
+
+        audit.close()
+        print("✓ Paginated and streaming audit queries work")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_live_audit_subscription():
+    """Subscribers receive committed rows through a bounded buffer."""
+    print("\nTesting live audit subscription...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        assert audit.flush()
+
+        notified = []
+        live = audit.subscribe(on_available=notified.append, max_buffer=5)
+        security_only = audit.subscribe(event_categories=("SECURITY",))
+
+        for i in range(8):
+            audit.log_system_event("heartbeat", details={"sequence": i})
+        audit.log_security_event("tamper_check", "HIGH")
+        assert audit.flush()
+
+        records = live.drain()
+        assert len(records) == 5, f"Buffer should hold 5 rows, got {len(records)}"
+        assert live.dropped == 4, f"Expected 4 dropped rows, got {live.dropped}"
+        assert records[-1]['event_type'] == 'security_event'
+        assert records[0]['additional_data'] == {"sequence": 4}
+        assert notified and notified[0] is live
+
+        stored = audit.query_audit_logs(columns=('event_type',), page_size=1)['rows'][0]
+        assert stored['id'] == records[-1]['id'], "Live ids must match stored ids"
+
+        assert [r['event_type'] for r in security_only.drain()] == ['security_event']
+
+        live.close()
+        audit.log_system_event("after_close")
+        assert audit.flush()
+        assert live.drain() == [], "Closed subscription should not receive rows"
+
+        audit.close()
+        print("✓ Live audit subscription works")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_streaming_audit_export():
+    """Exports stream filtered rows with a verifiable hash chain."""
+    print("\nTesting streaming audit export...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        for i in range(30):
+            audit.log_system_event("heartbeat", details={"sequence": i})
+        audit.log_security_event("tamper_check", "HIGH")
+
+        progress = []
+        jsonl_path = os.path.join(tmp_dir, 'audit.jsonl.gz')
+        result = audit.export_audit_logs(
+            jsonl_path, export_format="jsonl", batch_size=8,
+            progress_callback=lambda written, total: progress.append((written, total)),
+            event_category="SYSTEM"
+        )
+        assert result["compressed"] and result["rows_written"] == 31
+        assert progress[-1] == (31, 31), f"Unexpected final progress: {progress[-1]}"
+
+        chain_hash = "0" * 64
+        with gzip.open(jsonl_path, "rt", encoding="utf-8") as exported:
+            rows = [json.loads(line) for line in exported]
+        for row in rows:
+            stored = row.pop("chain_hash")
+            canonical = json.dumps(row, sort_keys=True, default=str)
+            chain_hash = hashlib.sha256((chain_hash + canonical).encode()).hexdigest()
+            assert stored == chain_hash, f"Chain broken at row {row['id']}"
+        assert chain_hash == result["final_chain_hash"]
+        assert all(row["event_category"] == "SYSTEM" for row in rows)
+
+        csv_path = os.path.join(tmp_dir, 'audit.csv')
+        result = audit.export_audit_logs(csv_path, event_category="SECURITY")
+        with open(csv_path, newline="", encoding="utf-8") as exported:
+            rows = list(csv.DictReader(exported))
+        assert len(rows) == 1 and rows[0]["event_type"] == "security_event"
+        assert rows[0]["chain_hash"] == result["final_chain_hash"]
+
+        audit.close()
+        print("✓ Streaming audit export works")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_streaming_anomaly_detection():
+    """Sliding-window rules fire from the live audit feed."""
+    print("\nTesting streaming anomaly detection...")
+
+    counter = SlidingWindowCounter(60, bucket_count=6)
+    for second in range(0, 60, 5):
+        counter.add(second)
+    assert counter.count(59) == 12
+    assert counter.count(95) == 4, "Expired buckets must not be counted"
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        now = [1000.0]
+        anomalies = []
+        detector = AuditAnomalyDetector(audit, on_anomaly=anomalies.append, clock=lambda: now[0])
+        detector.start()
+
+        for _ in range(4):
+            audit.log_authentication("alice", "alice", "password", "password", success=False)
+        assert audit.flush()
+        assert not anomalies, "Four failures should stay under the threshold"
+
+        # The next failure, 90s later, starts a fresh window
+        now[0] += 90
+        audit.log_authentication("alice", "alice", "password", "password", success=False)
+        assert audit.flush()
+        assert not anomalies
+
+        for _ in range(4):
+            audit.log_authentication("alice", "alice", "password", "password", success=False)
+        audit.log_authentication("bob", "bob", "password", "password", success=False)
+        assert audit.flush()
+        assert [a["rule"] for a in anomalies] == ["repeated_login_failures"]
+        assert anomalies[0]["user_id"] == "alice" and anomalies[0]["count"] == 5
+
+        # Cooldown suppresses repeats inside the same window
+        audit.log_authentication("alice", "alice", "password", "password", success=False)
+        assert audit.flush() and audit.flush()
+        assert len(anomalies) == 1
+
+        events = audit.get_security_events()
+        assert any(e["event_type"] == "repeated_login_failures" for e in events)
+        assert detector.get_status()["anomalies_raised"] == 1
+
+        detector.stop()
+        audit.close()
+        print("✓ Streaming anomaly detection works")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_clipboard_copies_are_not_exports():
+    """Everyday password copies don't raise the export alert."""
+    print("\nTesting clipboard copies against the export rule...")
+
+    tmp_dir, db = _make_vault()
+    try:
+        audit = AuditLogger(db)
+        now = [1000.0]
+        anomalies = []
+        detector = AuditAnomalyDetector(audit, on_anomaly=anomalies.append, clock=lambda: now[0])
+        detector.start()
+
+        for index in range(25):
+            now[0] += 60
+            audit.log_password_access("user", index, "example.com", "copy", copy_to_clipboard=True)
+        assert audit.flush()
+        assert not anomalies, f"Clipboard copies raised {[a['rule'] for a in anomalies]}"
+
+        for index in range(20):
+            audit.log_password_access("user", index, "example.com", "export", export_action=True)
+        assert audit.flush()
+        assert "password_export_burst" in [a["rule"] for a in anomalies]
+
+        detector.stop()
+        audit.close()
+        print("✓ Clipboard copies are not counted as exports")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    """Run all audit logging tests."""
+    print("SilentLock Audit Logging - Test Suite")
+    print("=" * 50)
+
+    test_audit_database_is_separate()
+    test_legacy_audit_migration()
+    test_legacy_migration_keeps_colliding_ids()
+    test_paginated_audit_query()
+    test_live_audit_subscription()
+    test_streaming_audit_export()
+    test_streaming_anomaly_detection()
+    test_clipboard_copies_are_not_exports()
+
+    print("\n" + "=" * 50)
+    print("🎉 All audit logging tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,16 @@ Verifies core functionality without GUI.
 import sys
 import os
 import tempfile
+import json
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.security import SecurityManager
 from src.database import DatabaseManager
+from src.autofill_index import AutofillIndex
+from src.login_signatures import LoginSignatureCache, title_pattern
+from src.secure_buffer import SecureFieldBuffer
 
 
 def test_encryption():
@@ -75,7 +79,7 @@ def test_database():
         results = db.search_credentials("Test", master_password)
         assert len(results) == 1, f"Search failed: {len(results)} results"
         print("✓ Search functionality works")
-        
+    
     finally:
         # Clean up
         try:
@@ -86,6 +90,120 @@ def test_database():
     print("✓ Database tests passed!")
 
 
+def test_autofill_index():
+    """Test the autofill index follows the database without decrypting."""
+    print("\nTesting autofill index...")
+    
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    
+    try:
+        db = DatabaseManager(db_path)
+        master_password = "test_master_password_123"
+        db.store_credential("Example", "https://www.example.com/login", "alice", "pw1", master_password)
+        db.store_credential("Mail", "https://mail.example.com", "bob", "pw2", master_password)
+        db.store_credential("Intranet", "intranet", "carol", "pw3", master_password)
+        
+        index = AutofillIndex()
+        index.attach(db)
+        assert len(index) == 3
+        
+        # Subdomains match credentials saved for the parent domain
+        users = [entry['username'] for entry in index.lookup("https://accounts.example.com/signin")]
+        assert users == ['alice'], f"Unexpected matches: {users}"
+        users = [entry['username'] for entry in index.lookup("mail.example.com")]
+        assert users == ['alice', 'bob'], f"Unexpected matches: {users}"
+        assert index.lookup("example.org") == []
+        assert index.lookup("com") == []
+        assert [e['username'] for e in index.lookup("", "INTRANET")] == ['carol']
+        assert all('password' not in entry for entry in index.lookup("mail.example.com"))
+        print("✓ Domain lookups work")
+        
+        # Store and delete notifications keep the index current
+        db.store_credential("Example", "https://www.example.com/login", "alice", "pw1b", master_password)
+        db.store_credential("Shop", "shop.example.net", "dave", "pw4", master_password)
+        db.delete_credential("https://mail.example.com", "bob")
+        assert len(index) == 3
+        assert [e['username'] for e in index.lookup("mail.example.com")] == ['alice']
+        assert [e['username'] for e in index.lookup("https://shop.example.net")] == ['dave']
+        
+        entry = index.lookup("example.com")[0]
+        assert db.get_credential(entry['site_url'], entry['username'], master_password)['password'] == "pw1b"
+        print("✓ Index follows credential changes")
+        
+        index.detach()
+        db.store_credential("Late", "late.example.com", "erin", "pw5", master_password)
+        assert len(index) == 0
+    
+    finally:
+        try:
+            os.unlink(db_path)
+        except:
+            pass
+    
+    print("✓ Autofill index tests passed!")
+
+
+def test_login_signatures():
+    """Test learned login title transitions persist and match repeat logins."""
+    print("\nTesting login signatures...")
+    
+    assert "alice" not in title_pattern("Inbox (3) - alice@example.com - Gmail")
+    assert "smith" not in title_pattern("John Smith - Dashboard")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'login_signatures.json')
+        cache = LoginSignatureCache(path)
+        assert not cache.knows("mail.google.com", "Sign in - Google Accounts")
+        
+        cache.learn("mail.google.com", "Sign in - Google Accounts", "Inbox (3) - alice@example.com - Gmail")
+        
+        reloaded = LoginSignatureCache(path)
+        assert reloaded.knows("mail.google.com", "Sign in - Google Accounts")
+        assert reloaded.match("mail.google.com", "Sign in - Google Accounts", "Inbox (12) - bob@example.com - Gmail")
+        assert not reloaded.match("mail.google.com", "Sign in - Google Accounts", "2-Step Verification")
+        assert not reloaded.match("example.com", "Sign in - Google Accounts", "Inbox (1) - a@b.c - Gmail")
+        assert reloaded.get_stats()['signatures'] == 1
+        
+        # The file names no sites and keeps no site or personal words
+        with open(path, 'r', encoding='utf-8') as f:
+            stored = f.read().lower()
+        for secret in ("google", "gmail", "alice", "example"):
+            assert secret not in stored, f"{secret!r} stored in plaintext"
+        
+        reloaded.forget("mail.google.com")
+        assert not LoginSignatureCache(path).knows("mail.google.com", "Sign in - Google Accounts")
+        
+        # Older plaintext files are discarded on load
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'sites': {'bank.example': [{'login': 'x', 'success': 'y'}]}}, f)
+        assert LoginSignatureCache(path).get_stats()['sites'] == 0
+        with open(path, 'r', encoding='utf-8') as f:
+            assert 'bank.example' not in f.read()
+    
+    print("✓ Login signature tests passed!")
+
+
+def test_secure_field_buffer():
+    """Test the bounded field buffer used for typed credentials."""
+    print("\nTesting secure field buffer...")
+    
+    buffer = SecureFieldBuffer(capacity=8)
+    for char in "pa55wörd":
+        assert buffer.append(char)
+    assert not buffer.append("!") and buffer.overflows == 1
+    buffer.pop()
+    assert buffer.to_str() == "pa55wör" and buffer.tail(3) == "wör"
+    assert "5" in buffer and "x" not in buffer and len(buffer) == 7
+    assert "pa55" not in repr(buffer) and "pa55" not in str(buffer)
+    
+    buffer.wipe()
+    assert not buffer and buffer.to_str() == ""
+    assert not any(buffer._chars), "Wiped buffer still holds characters"
+    
+    print("✓ Secure field buffer tests passed!")
+
+
 def test_imports():
     """Test all module imports."""
     print("\nTesting imports...")
@@ -106,7 +224,7 @@ def test_imports():
             print("✓ GUI module imported")
         except Exception as e:
             print(f"⚠ GUI module import failed (expected on headless systems): {e}")
-        
+    
     except Exception as e:
         print(f"✗ Import failed: {e}")
         raise
@@ -121,12 +239,15 @@ def main():
         test_imports()
         test_encryption()
         test_database()
+        test_autofill_index()
+        test_login_signatures()
+        test_secure_field_buffer()
         
         print("\n" + "=" * 50)
         print("🎉 All tests passed! SilentLock is ready to use.")
         print("\nTo start the application:")
         print("  python main.py")
-        
+    
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
         import traceback
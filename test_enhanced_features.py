@@ -75,5 +75,127 @@ def test_enhanced_components():
         return False
 
 
+def _verification_detector(saved):
+    """Enhanced detector on the in-memory window backend with one pending capture."""
+    from src.enhanced_login_detector import EnhancedLoginFormDetector
+    from src.window_events import FakeWindowSource
+    
+    source = FakeWindowSource()
+    detector = EnhancedLoginFormDetector(on_login_detected=lambda cred: saved.append(cred) or True,
+                                         window_list=source)
+    base = detector.base_detector
+    base.process_cache.process_factory = source.get_process
+    base.is_monitoring = True
+    base._start_window_source()
+    
+    login = source.add_window("Sign in - Example - Google Chrome", pid=42, process_name="chrome.exe")
+    source.set_foreground(login)
+    base.event_processor.process_pending()
+    base.potential_username = "alice@example.com"
+    base.potential_password = "hunter2!"
+    detector._queue_for_success_verification()
+    assert len(detector.get_pending_verifications()) == 1, "Capture should wait for verification"
+    return detector, source, login
+
+
+def _wait_for_save(saved, timeout=2.0):
+    import time
+    deadline = time.time() + timeout
+    while not saved and time.time() < deadline:
+        time.sleep(0.01)
+    return saved
+
+
+def test_login_verification_success():
+    """A success title on the captured window saves the credential."""
+    print("\nTesting login verification (success)...")
+    
+    saved = []
+    detector, source, login = _verification_detector(saved)
+    source.set_title(login, "Inbox - Example - Google Chrome")
+    detector.base_detector.event_processor.process_pending()
+    
+    assert _wait_for_save(saved), "Verified login was not saved"
+    assert saved[0]['username'] == "alice@example.com"
+    assert not detector.captures_by_window and not detector.get_pending_verifications()
+    detector.base_detector.window_source.stop()
+    
+    print("✓ Login verification success path works")
+
+
+def test_login_verification_failure():
+    """A failure title drops the capture without saving."""
+    print("\nTesting login verification (failure)...")
+    
+    saved = []
+    detector, source, login = _verification_detector(saved)
+    source.set_title(login, "Login failed - Example - Google Chrome")
+    detector.base_detector.event_processor.process_pending()
+    
+    assert not detector.get_pending_verifications() and not detector.captures_by_window
+    assert not detector.verification_calls, "Timeout should be cancelled once decided"
+    assert not _wait_for_save(saved, timeout=0.2), "Failed login must not be saved"
+    detector.base_detector.window_source.stop()
+    
+    print("✓ Login verification failure path works")
+
+
+def test_login_verification_timeout():
+    """Without a title event the scheduled check reads the window directly."""
+    print("\nTesting login verification (timeout)...")
+    import time
+    
+    saved = []
+    detector, source, login = _verification_detector(saved)
+    # Title changes while the window is in the background: no event arrives
+    other = source.add_window("Notes", pid=7, process_name="notepad.exe")
+    source.set_foreground(other)
+    source.set_title(login, "Dashboard - Example - Google Chrome")
+    
+    detector.base_detector.scheduler.run_due(time.time() + detector.login_verification_timeout + 1)
+    assert _wait_for_save(saved), "Timed-out verification should read the new title and save"
+    assert not detector.get_pending_verifications()
+    detector.base_detector.window_source.stop()
+    
+    print("✓ Login verification timeout path works")
+
+
+def test_autofill_outcome_reported():
+    """The login that follows an autofill is fed back to the engine's pacing."""
+    print("\nTesting autofill outcome feedback...")
+    from src.autofill_engine import FakeKeyboard
+    from src.enhanced_login_detector import EnhancedLoginFormDetector
+    from src.window_events import FakeWindowSource
+    
+    source = FakeWindowSource()
+    detector = EnhancedLoginFormDetector(window_list=source)
+    base = detector.base_detector
+    base.process_cache.process_factory = source.get_process
+    base.autofill_engine.keyboard = FakeKeyboard()
+    base._show_notification = lambda *args, **kwargs: None
+    base.is_monitoring = True
+    base._start_window_source()
+    
+    login = source.add_window("Sign in - Example - Google Chrome", pid=42, process_name="chrome.exe")
+    source.set_foreground(login)
+    base.event_processor.process_pending()
+    
+    base._perform_autofill({'site_name': 'Example', 'username': 'alice', 'password': 'hunter2!'})
+    profile = base.autofill_engine.get_profile("chrome.exe")
+    assert base.last_autofill and profile.successes == 0, "Typing alone must not count as success"
+    
+    source.set_title(login, "Inbox - Example - Google Chrome")
+    base.event_processor.process_pending()
+    assert profile.successes == 1 and profile.settle_delay < 0.1
+    assert base.last_autofill is None
+    base.window_source.stop()
+    
+    print("✓ Autofill outcome feedback works")
+
+
 if __name__ == "__main__":
-    test_enhanced_components()
\ No newline at end of file
+    test_enhanced_components()
+    test_login_verification_success()
+    test_login_verification_failure()
+    test_login_verification_timeout()
+    test_autofill_outcome_reported()
\ No newline at end of file
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Test the form detector's event processing pipeline.
+Covers de-duplication without needing the Windows input hooks.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import json
+import logging
+import threading
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.event_processing import (
+    ThreadSafeEventProcessor, PriorityEventQueue, KeystrokeRingBuffer,
+    TTLFingerprintSet, event_fingerprint
+)
+from src.detector_metrics import DetectorMetrics, SnapshotWriter, STAGE_KEY_QUEUE
+from src.autofill_index import AutofillIndex
+from src.database import DatabaseManager
+from src.detector_process import DetectorProcessProxy
+from src.detector_scheduler import DetectorScheduler
+from src.detector_replay import DetectorRecorder, VirtualClock, load_recording
+from src.logging_config import RateLimitedLogger, configure_logging, get_logger, shutdown_logging
+
+
+def test_ttl_fingerprint_set():
+    """Fingerprints expire after the TTL and the set stays bounded."""
+    print("Testing TTL fingerprint set...")
+    
+    seen = TTLFingerprintSet(ttl=5.0, capacity=3)
+    seen.add('a', now=100.0)
+    assert seen.contains('a', now=104.9)
+    assert not seen.contains('a', now=105.0), "Fingerprint should expire after the TTL"
+    
+    # Refreshing keeps the newer expiry
+    seen.add('b', now=200.0)
+    seen.add('b', now=203.0)
+    assert seen.contains('b', now=206.0)
+    
+    for index, fingerprint in enumerate('cdefg'):
+        seen.add(fingerprint, now=300.0 + index * 0.1)
+    assert len(seen._ring) <= 3 and len(seen) <= 3, "Capacity must bound memory"
+    assert seen.contains('g', now=300.5) and not seen.contains('c', now=300.5)
+    
+    print("✓ TTL fingerprint set works")
+
+
+def test_event_deduplication():
+    """Repeated autofill checks are blocked, repeated keystrokes are not."""
+    print("\nTesting event de-duplication...")
+    
+    first = event_fingerprint('autofill_check', {'site_url': 'a.com', 'site_name': 'A', 'timestamp': 1.0})
+    second = event_fingerprint('autofill_check', {'site_url': 'a.com', 'site_name': 'A', 'timestamp': 2.0})
+    assert first == second, "Fingerprints must ignore timestamps"
+    assert event_fingerprint('key_press', {'key': 'a'}) is None
+    assert event_fingerprint('window_change', {'window_handle': 42}) is None
+    
+    handled = []
+    done = threading.Event()
+    processor = ThreadSafeEventProcessor()
+    
+    def handle(event_type, event_data):
+        handled.append(event_type)
+        if len(handled) == 3:
+            done.set()
+    
+    processor._handle_event = handle
+    processor.start_processing()
+    try:
+        check = {'site_url': 'a.com', 'site_name': 'A'}
+        assert processor.add_event('autofill_check', dict(check, timestamp=time.time()))
+        assert processor.add_event('key_press', {'key': 'a', 'timestamp': time.time()})
+        assert processor.add_event('key_press', {'key': 'a', 'timestamp': time.time()})
+        assert done.wait(2.0), "Events were not processed"
+        
+        assert not processor.add_event('autofill_check', dict(check, timestamp=time.time()))
+        assert processor.add_event('autofill_check', {'site_url': 'b.com', 'site_name': 'B', 'timestamp': time.time()})
+    finally:
+        processor.stop_processing()
+    
+    print("✓ Event de-duplication works")
+
+
+def test_window_switch_back_not_deduplicated():
+    """Switching A -> B -> A within the dedup window hands A over twice."""
+    print("\nTesting window switch-back handling...")
+    
+    handled = []
+    processor = ThreadSafeEventProcessor()
+    processor._handle_event = lambda event_type, event_data: handled.append(event_data['window_handle'])
+    
+    for hwnd, title in ((1, 'Sign in - A'), (2, 'Inbox - B'), (1, 'Sign in - A')):
+        assert processor.add_event('window_change', {'window_handle': hwnd, 'title': title,
+                                                     'timestamp': time.time(), 'is_foreground': True})
+        processor.process_pending()
+    
+    assert handled == [1, 2, 1], f"Switch back to A was dropped: {handled}"
+    
+    print("✓ Window switch-back handling works")
+
+
+def test_priority_coalescing_queue():
+    """Urgent events go first, repeats merge and scans yield their slots."""
+    print("\nTesting priority and coalescing queue...")
+    
+    events = PriorityEventQueue(maxsize=4)
+    assert events.put('background_scan', {'timestamp': 1}, priority=2) == 'queued'
+    assert events.put('window_change', {'window_handle': 7, 'timestamp': 1}) == 'queued'
+    assert events.put('window_change', {'window_handle': 7, 'timestamp': 2}) == 'coalesced'
+    assert events.put('background_scan', {'timestamp': 2}, priority=2) == 'coalesced'
+    assert events.put('key_press', {'key': 'a'}, priority=0) == 'queued'
+    assert events.put('key_press', {'key': 'b'}, priority=0) == 'queued'
+    
+    # Full: a keystroke evicts the pending scan, another scan is dropped
+    assert events.put('key_press', {'key': 'c'}, priority=0) == 'queued'
+    assert events.put('browser_tab_scan', {'timestamp': 3}, priority=2) == 'dropped'
+    
+    order = [events.get(timeout=0.1) for _ in range(events.qsize())]
+    assert [(e[1], e[2].get('key')) for e in order] == [
+        ('key_press', 'a'), ('key_press', 'b'), ('key_press', 'c'), ('window_change', None)
+    ]
+    assert order[-1][2]['timestamp'] == 2, "Coalesced event should carry the newest data"
+    
+    stats = events.get_stats()
+    assert stats['window_change']['coalesced'] == 1
+    assert stats['background_scan']['evicted'] == 1
+    assert stats['browser_tab_scan']['dropped'] == 1
+    assert stats['key_press']['dispatched'] == 3 and stats['key_press']['depth'] == 0
+    
+    # A key that left the queue no longer coalesces
+    assert events.put('window_change', {'window_handle': 7, 'timestamp': 4}) == 'queued'
+    
+    print("✓ Priority and coalescing queue works")
+
+
+def test_keystroke_channel():
+    """Keystrokes keep their order and lost input is reported as a gap."""
+    print("\nTesting keystroke ring buffer...")
+    
+    ring = KeystrokeRingBuffer(capacity=3)
+    assert [ring.push('key_press', c, window=5) for c in 'abcd'] == [0, 1, 2, None]
+    assert ring.overflows == 1
+    assert [event[2] for event in ring.drain(max_items=2)] == ['a', 'b']
+    assert ring.push('key_press', 'e', window=6) == 4
+    assert [(event[0], event[2], event[3]) for event in ring.drain()] == [(2, 'c', 5), (4, 'e', 6)]
+    
+    handled = []
+    done = threading.Event()
+    processor = ThreadSafeEventProcessor(max_queue_size=2, keystroke_capacity=64)
+    
+    def handle(event_type, event_data):
+        handled.append((event_type, event_data.get('key'), event_data.get('missed')))
+        if event_data.get('key') == 'z':
+            done.set()
+    
+    processor._handle_event = handle
+    
+    # A full general queue must not affect keyboard input
+    processor.add_event('background_scan', {'timestamp': time.time()}, priority=2)
+    processor.add_event('browser_tab_scan', {'timestamp': time.time()}, priority=2)
+    for char in 'secret':
+        assert processor.add_keystroke('key_press', char, window=9)
+    processor.keystrokes._next_sequence += 2  # Simulate two keys lost at the hook
+    processor.add_keystroke('key_press', 'z', window=9)
+    
+    processor.start_processing()
+    try:
+        assert done.wait(2.0), "Keystrokes were not processed"
+    finally:
+        processor.stop_processing()
+    
+    keys = [key for event_type, key, _ in handled if event_type == 'key_press']
+    assert keys == list('secret') + ['z'], f"Unexpected key order: {keys}"
+    assert ('keystroke_gap', None, 2) in handled
+    assert handled.index(('keystroke_gap', None, 2)) == len('secret')
+    
+    print("✓ Keystroke ring buffer works")
+
+
+def test_record_and_replay_support():
+    """Recordings are sanitized and replay runs on a virtual clock."""
+    print("\nTesting record and replay support...")
+    
+    class FakeKey:
+        def __init__(self, char=None, name=None):
+            self.char = char
+            self.name = name
+    
+    ticks = iter([0.0, 0.5, 1.25, 2.0, 2.5])
+    fd, path = tempfile.mkstemp(suffix='.jsonl.gz')
+    os.close(fd)
+    try:
+        recorder = DetectorRecorder(path, clock=lambda: next(ticks))
+        recorder.record_window(7, 'foreground', "Sign in - Google Chrome", "chrome.exe", 42)
+        recorder.record_key('key_press', FakeKey(char='S'))
+        recorder.record_key('key_press', FakeKey(name='tab'))
+        recorder.record_click('left', True)
+        recorder.close()
+        
+        events = load_recording(path)
+    finally:
+        os.remove(path)
+    
+    assert [event['e'] for event in events] == ['w', 'kp', 'kp', 'c']
+    assert events[0]['ti'] == "Sign in - Google Chrome" and events[0]['p'] == "chrome.exe"
+    assert events[1] == {'t': 1.25, 'e': 'kp', 'ch': 'A'}, "Typed characters must not be recorded"
+    assert events[2]['k'] == 'tab' and events[3] == {'t': 2.5, 'e': 'c', 'b': 'left', 'p': 1}
+    
+    # Sleeping threads wake only when the replay advances past their deadline
+    clock = VirtualClock(start=100.0)
+    woke_at = []
+    sleeper = threading.Thread(target=lambda: (clock.sleep(2.0), woke_at.append(clock.time())))
+    sleeper.start()
+    time.sleep(0.05)
+    clock.advance(101.0)
+    assert not woke_at
+    clock.advance(103.0)
+    assert woke_at == [103.0]
+    clock.sleep(1.5)  # The replay thread just moves time forward
+    assert clock.time() == 104.5
+    
+    # Queued events can be drained synchronously
+    handled = []
+    processor = ThreadSafeEventProcessor()
+    processor._handle_event = lambda event_type, event_data: handled.append(event_type)
+    processor.add_event('window_change', {'window_handle': 1})
+    processor.add_keystroke('key_press', 'a', window=1)
+    assert processor.process_pending() == 1
+    assert handled == ['key_press', 'window_change']
+    assert processor.process_pending() == 0
+    
+    print("✓ Record and replay support works")
+
+
+def test_detector_scheduler():
+    """Delayed callbacks run in deadline order and can be cancelled."""
+    print("\nTesting detector scheduler...")
+    
+    scheduler = DetectorScheduler()
+    ran = []
+    scheduler.call_later(2.0, ran.append, 'late')
+    early = scheduler.call_later(1.0, ran.append, 'early')
+    cancelled = scheduler.call_later(0.5, ran.append, 'cancelled')
+    cancelled.cancel()
+    assert not cancelled.active and early.active and len(scheduler) == 2
+    
+    now = time.monotonic()
+    assert scheduler.run_due(now) == 0
+    assert scheduler.run_due(now + 5.0) == 2
+    assert ran == ['early', 'late'] and not early.active
+    
+    # Mass cancellation compacts the heap
+    calls = [scheduler.call_later(60.0, ran.append, i) for i in range(200)]
+    for call in calls:
+        call.cancel()
+    assert len(scheduler._heap) < 200 and len(scheduler) == 0
+    
+    # The scheduler thread fires due calls and drops pending ones on stop
+    fired = threading.Event()
+    scheduler.start()
+    scheduler.call_later(0.01, fired.set)
+    scheduler.call_later(60.0, ran.append, 'never')
+    assert fired.wait(2.0)
+    scheduler.stop()
+    stats = scheduler.get_stats()
+    assert stats['pending'] == 0 and not stats['running'] and stats['fired'] == 3
+    
+    print("✓ Detector scheduler works")
+
+
+class _PipeTestDetector:
+    """Stand-in detector for the process test: captures one login on start."""
+    
+    def __init__(self, on_login_detected, credential_db):
+        self.on_login_detected = on_login_detected
+        self.monitor_all_apps = True
+        self.saved = None
+        self.autofill_index = AutofillIndex()
+        if credential_db is not None:
+            self.autofill_index.attach(credential_db)
+    
+    def start_monitoring(self):
+        def capture():
+            self.saved = self.on_login_detected({'site_name': 'example.com', 'username': 'alice'})
+        threading.Thread(target=capture, daemon=True).start()
+    
+    def stop_monitoring(self):
+        pass
+    
+    def get_monitoring_status(self):
+        return {'is_monitoring': True, 'saved': self.saved, 'monitor_all_apps': self.monitor_all_apps,
+                'indexed': sorted(entry['username'] for entry in self.autofill_index.lookup('example.com'))}
+
+
+def _pipe_test_detector_factory(on_login_detected, credential_db, master_password, enhanced):
+    return _PipeTestDetector(on_login_detected, credential_db)
+
+
+def test_detector_process():
+    """A detector in a child process reports captures through the proxy."""
+    print("\nTesting detector process...")
+    
+    captured = threading.Event()
+    captures = []
+    
+    def on_login_detected(credential_data):
+        captures.append(credential_data)
+        captured.set()
+        return True
+    
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    db = DatabaseManager(db_path)
+    db.set_master_password("MasterPass123!")
+    db.store_credential("Example", "example.com", "alice", "pw1", "MasterPass123!")
+    
+    proxy = DetectorProcessProxy(on_login_detected=on_login_detected, credential_db=db,
+                                 detector_factory=_pipe_test_detector_factory)
+    proxy.start_monitoring()
+    try:
+        assert proxy.child_pid and proxy.child_pid != os.getpid()
+        assert captured.wait(10.0)
+        assert captures == [{'site_name': 'example.com', 'username': 'alice'}]
+        
+        # The save result travels back to the child
+        deadline = time.time() + 5.0
+        while proxy.get_monitoring_status().get('saved') is not True and time.time() < deadline:
+            time.sleep(0.05)
+        
+        proxy.monitor_all_apps = False
+        status = proxy.get_monitoring_status()
+        assert status['saved'] is True and status['monitor_all_apps'] is False
+        assert status['detector_pid'] == proxy.child_pid
+        assert status['indexed'] == ['alice']
+        
+        # Saves and deletes in the GUI's database reach the child's index
+        db.store_credential("Example", "example.com", "bob", "pw2", "MasterPass123!")
+        db.delete_credential("example.com", "alice")
+        deadline = time.time() + 5.0
+        while proxy.get_monitoring_status().get('indexed') != ['bob'] and time.time() < deadline:
+            time.sleep(0.05)
+        assert proxy.get_monitoring_status()['indexed'] == ['bob']
+    finally:
+        proxy.stop_monitoring()
+        db.close_connection()
+        try:
+            os.unlink(db_path)
+        except OSError:
+            pass
+    
+    assert proxy.process is None and not proxy.is_monitoring
+    assert not db._change_listeners, "Proxy should stop following the database"
+    print("✓ Detector process works")
+
+
+def test_logging_facade():
+    """Rate-limited key logging and the asynchronous log file."""
+    print("\nTesting logging facade...")
+    
+    class ListHandler(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.messages = []
+        
+        def emit(self, record):
+            self.messages.append(record.getMessage())
+    
+    assert get_logger('src.form_detector').name == 'silentlock.form_detector'
+    
+    fd, path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+    try:
+        configure_logging(level='INFO', module_levels={'test_keys': 'DEBUG'},
+                          log_file=path, console=False)
+        
+        # Disabled levels are dropped before any formatting or rate limiting
+        quiet = RateLimitedLogger(get_logger('test_quiet'), rate=0.0, burst=1)
+        for _ in range(5):
+            quiet.debug("never shown %s", 1)
+        assert quiet._suppressed == 0
+        
+        keys_logger = get_logger('test_keys')
+        keys_logger.propagate = False
+        handler = ListHandler()
+        keys_logger.addHandler(handler)
+        keys = RateLimitedLogger(keys_logger, rate=0.0, burst=2)
+        for i in range(5):
+            keys.debug("key %s", i)
+        keys._tokens = 1.0
+        keys.debug("key %s", 5)
+        assert handler.messages == ["key 0", "key 1", "key 5 (3 similar messages suppressed)"]
+        
+        get_logger('event_processing').info("written by the listener thread")
+        shutdown_logging()
+        with open(path, encoding='utf-8') as log_file:
+            assert "silentlock.event_processing" in log_file.read()
+    finally:
+        shutdown_logging()
+        os.remove(path)
+    
+    print("✓ Logging facade works")
+
+
+def test_detector_metrics():
+    """Stage histograms, keystroke queue latency and snapshot files."""
+    print("\nTesting detector metrics...")
+    
+    metrics = DetectorMetrics()
+    for ms in (0.3, 0.4, 3, 40):
+        metrics.record('title_parse', ms / 1000)
+    with metrics.timed('window_analysis'):
+        pass
+    stats = metrics.get_stats()
+    title = stats['title_parse']
+    assert title['count'] == 4
+    assert title['p50_ms'] == 0.5 and title['p99_ms'] == 50
+    assert title['max_ms'] == 40 and title['buckets'] == {'<=0.5': 2, '<=5': 1, '<=50': 1}
+    assert stats['window_analysis']['count'] == 1
+    
+    # Keystrokes record enqueue -> dequeue time when the processor has metrics
+    processor = ThreadSafeEventProcessor(metrics=metrics)
+    processor._handle_event = lambda event_type, event_data: None
+    processor.add_keystroke('key_press', 'a')
+    processor._process_keystrokes()
+    assert metrics.get_stats()[STAGE_KEY_QUEUE]['count'] == 1
+    
+    scheduler = DetectorScheduler()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'metrics', 'detector_metrics.json')
+    writer = SnapshotWriter(scheduler, lambda: {'performance': metrics.get_stats()}, path, interval=10)
+    writer.start()
+    assert len(scheduler) == 1
+    scheduler.run_due(now=time.monotonic() + 11)
+    assert writer.writes == 1 and len(scheduler) == 1  # rescheduled
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['performance']['title_parse']['count'] == 4
+    writer.stop()
+    assert len(scheduler) == 0
+    os.remove(path)
+    
+    print("✓ Detector metrics work")
+
+
+def main():
+    """Run all event processing tests."""
+    print("SilentLock Event Processing - Test Suite")
+    print("=" * 50)
+    
+    test_ttl_fingerprint_set()
+    test_event_deduplication()
+    test_window_switch_back_not_deduplicated()
+    test_priority_coalescing_queue()
+    test_keystroke_channel()
+    test_record_and_replay_support()
+    test_detector_scheduler()
+    test_logging_facade()
+    test_detector_metrics()
+    test_detector_process()
+    
+    print("\n" + "=" * 50)
+    print("🎉 All event processing tests passed!")
+
+
+if __name__ == "__main__":
+    main()